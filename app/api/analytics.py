@@ -0,0 +1,523 @@
+from flask import Blueprint, request, jsonify
+from datetime import datetime
+import numpy as np
+from app.services.analytics import (load_trade_arrays, performance, heatmap, rolling_stats, downsample_indices,
+                                    drawdown_anchor_indices, sequence_stats, MAX_STREAK, MAX_NTH_TRADE,
+                                    REVENGE_MINUTES, daily_pnl_matrix, correlation_matrix)
+from app.services.monte_carlo import simulate
+from app.services.quantile_sketch import load_digest, distribution, METRICS
+from app.services.exposure import load_trade_intervals, exposure_by_account
+from app.services.economic_events import get_event_index, event_stats
+from app.services.pnl_cache import cached_account_response
+from app.services.trade_cube import query_cube, FILTER_DIMENSIONS
+
+analytics_bp = Blueprint('analytics', __name__)
+
+DEFAULT_MAX_POINTS = 500
+
+def _parse_day(value: str = None):
+    return datetime.strptime(value, '%Y-%m-%d').date() if value else None
+
+def _load_trades(acc_id: str = None):
+    """Trade arrays for the request's symbol / start_date / end_date filters (ValueError on a bad date)."""
+    return load_trade_arrays(acc_id, request.args.get('symbol'),
+                             _parse_day(request.args.get('start_date')), _parse_day(request.args.get('end_date')))
+
+def _series(days, *columns):
+    """Zip a day array and value arrays into JSON rows (values rounded to cents)."""
+    names = [name for name, _ in columns]
+    return [
+        dict(zip(['date', *names], [str(day), *(round(float(value), 2) for value in values)]))
+        for day, *values in zip(days, *(values for _, values in columns))
+    ]
+
+@analytics_bp.route('/api/analytics/performance', methods = ['GET'])
+def get_performance():
+    """
+    Equity curve, drawdown and summary statistics (profit factor, expectancy,
+    max drawdown and duration, Sharpe/Sortino on daily PnL), computed in one
+    vectorized pass and cached per account and data version.
+
+    Query params:
+        acc_id: only this account (default all)
+        symbol: only this symbol
+        start_date / end_date: YYYY-MM-DD trading days
+        granularity: 'day' (default) or 'trade' for the equity curve points
+        capital: account size; Sharpe/Sortino use daily PnL / capital as returns
+        max_points: LTTB-downsample the curve to about this many points
+                    (default 500, 0 = all); drawdown extremes are always kept
+    """
+    try:
+        acc_id = request.args.get('acc_id')
+        return cached_account_response(acc_id, lambda: _performance(acc_id))
+    except Exception as e:
+        return jsonify({'error': f'Failed to calculate performance: {str(e)}'}), 500
+
+def _performance(acc_id: str = None):
+    granularity = request.args.get('granularity', 'day')
+    if granularity not in ('day', 'trade'):
+        return jsonify({'error': "granularity must be 'day' or 'trade'"}), 400
+    try:
+        trades = _load_trades(acc_id)
+    except ValueError as e:
+        return jsonify({'error': f'Invalid parameter: {str(e)}'}), 400
+
+    capital = request.args.get('capital', type=float)
+    max_points = request.args.get('max_points', DEFAULT_MAX_POINTS, type=int)
+    result = performance(trades, capital=capital)
+
+    if granularity == 'trade' and len(trades):
+        days, pnl, equity, drawdown = trades.trading_days, trades.pnl, result['equity'], result['drawdown']
+        x = None
+    else:
+        days, pnl, equity, drawdown = result['days'], result['daily_pnl'], result['daily_equity'], result['daily_drawdown']
+        x = days.astype(np.int64)
+
+    # LTTB keeps the curve's shape; the max drawdown's peak, trough and recovery are always kept
+    keep = downsample_indices([equity, drawdown], max_points, x=x, keep=drawdown_anchor_indices(drawdown))
+    curve = _series(days[keep], ('pnl', pnl[keep]), ('equity', equity[keep]), ('drawdown', drawdown[keep]))
+    if granularity == 'trade':
+        for point, k in zip(curve, keep.tolist()):
+            point['id'] = trades.ids[k]
+            point['exit_time'] = trades.exit_times[k].item().isoformat()
+
+    return jsonify({
+        'acc_id': acc_id,
+        'granularity': granularity,
+        'summary': result['summary'],
+        'points': len(curve),
+        'total_points': len(equity),
+        'equity_curve': curve
+    })
+
+@analytics_bp.route('/api/analytics/heatmap', methods = ['GET'])
+def get_heatmap():
+    """
+    PnL, trade count and win rate per (weekday, entry hour) cell, plus a
+    holding-duration breakdown, cached per account and data version.
+
+    Query params:
+        acc_id / symbol / start_date / end_date: as for /api/analytics/performance
+    """
+    try:
+        acc_id = request.args.get('acc_id')
+        return cached_account_response(acc_id, lambda: _heatmap(acc_id))
+    except Exception as e:
+        return jsonify({'error': f'Failed to calculate heatmap: {str(e)}'}), 500
+
+def _heatmap(acc_id: str = None):
+    try:
+        trades = _load_trades(acc_id)
+    except ValueError as e:
+        return jsonify({'error': f'Invalid parameter: {str(e)}'}), 400
+
+    return jsonify({
+        'acc_id': acc_id,
+        'trade_count': len(trades),
+        **heatmap(trades)
+    })
+
+@analytics_bp.route('/api/analytics/sequence', methods = ['GET'])
+def get_sequence():
+    """
+    Sequence statistics in one pass over the trades in exit order: longest and
+    current streaks, PnL after N consecutive wins/losses, nth-trade-of-day
+    and first-vs-later stats, and revenge-trade indicators. Cached per account
+    and data version.
+
+    Query params:
+        max_streak: longest streak bucket, reported as "N or more" (default 4)
+        max_nth: last nth-trade-of-day bucket, "N or later" (default 5)
+        revenge_minutes: re-entry window after a loss that counts as revenge (default 5)
+        acc_id / symbol / start_date / end_date: as for /api/analytics/performance
+    """
+    try:
+        acc_id = request.args.get('acc_id')
+        return cached_account_response(acc_id, lambda: _sequence(acc_id))
+    except Exception as e:
+        return jsonify({'error': f'Failed to calculate sequence statistics: {str(e)}'}), 500
+
+def _sequence(acc_id: str = None):
+    max_streak = request.args.get('max_streak', MAX_STREAK, type=int)
+    max_nth = request.args.get('max_nth', MAX_NTH_TRADE, type=int)
+    revenge_minutes = request.args.get('revenge_minutes', REVENGE_MINUTES, type=float)
+    if not 1 <= max_streak <= 20 or not 1 <= max_nth <= 20:
+        return jsonify({'error': 'max_streak and max_nth must be between 1 and 20'}), 400
+    if revenge_minutes < 0:
+        return jsonify({'error': 'revenge_minutes must not be negative'}), 400
+    try:
+        trades = _load_trades(acc_id)
+    except ValueError as e:
+        return jsonify({'error': f'Invalid parameter: {str(e)}'}), 400
+
+    return jsonify({
+        'acc_id': acc_id,
+        'trade_count': len(trades),
+        **sequence_stats(trades, max_streak=max_streak, max_nth=max_nth, revenge_minutes=revenge_minutes)
+    })
+
+DEFAULT_PERCENTILES = [1, 5, 10, 25, 50, 75, 90, 95, 99]
+MAX_HISTOGRAM_BINS = 200
+
+@analytics_bp.route('/api/analytics/distribution', methods = ['GET'])
+def get_distribution():
+    """
+    Percentiles and histogram of trade PnL and holding time, merged from the
+    per (account, symbol, month) quantile sketches (see
+    app/services/quantile_sketch.py) - no scan of trades. Values are t-digest
+    estimates; count, mean, min and max are exact.
+
+    Query params:
+        metric: 'pnl', 'holding_minutes' or omitted for both
+        percentiles: comma-separated, e.g. 5,50,95 (default 1,5,10,25,50,75,90,95,99)
+        bins: histogram bins (default 20)
+        acc_id / symbol: as for /api/analytics/performance
+        start_date / end_date: YYYY-MM-DD; widened to whole trading months
+    """
+    try:
+        acc_id = request.args.get('acc_id')
+        return cached_account_response(acc_id, lambda: _distribution(acc_id))
+    except Exception as e:
+        return jsonify({'error': f'Failed to calculate distribution: {str(e)}'}), 500
+
+def _distribution(acc_id: str = None):
+    metric = request.args.get('metric')
+    if metric is not None and metric not in METRICS:
+        return jsonify({'error': f"metric must be one of: {', '.join(METRICS)}"}), 400
+    bins = request.args.get('bins', 20, type=int)
+    if not 1 <= bins <= MAX_HISTOGRAM_BINS:
+        return jsonify({'error': f'bins must be between 1 and {MAX_HISTOGRAM_BINS}'}), 400
+    try:
+        percentiles = [float(p) for p in request.args['percentiles'].split(',') if p.strip()] \
+            if request.args.get('percentiles') else DEFAULT_PERCENTILES
+        if any(not 0 <= p <= 100 for p in percentiles):
+            raise ValueError('percentiles must be between 0 and 100')
+        start_day = _parse_day(request.args.get('start_date'))
+        end_day = _parse_day(request.args.get('end_date'))
+    except ValueError as e:
+        return jsonify({'error': f'Invalid parameter: {str(e)}'}), 400
+
+    symbol = request.args.get('symbol')
+    return jsonify({
+        'acc_id': acc_id,
+        'symbol': symbol,
+        **{
+            name: distribution(load_digest(name, acc_id, symbol, start_day, end_day), percentiles, bins)
+            for name in ([metric] if metric else METRICS)
+        }
+    })
+
+@analytics_bp.route('/api/analytics/cube', methods = ['GET'])
+def get_cube():
+    """
+    Aggregates for any combination of group-by dimensions, rolled up from the
+    trading-day cube (see app/services/trade_cube.py) rather than from trades.
+
+    Query params:
+        group_by: comma-separated dimensions - account, symbol, root, direction,
+                  strategy, trade_type, tag, day, week, month, year
+        acc_id: only this account
+        symbol / root / direction / strategy / trade_type / tag: only these
+                  values (comma-separated or repeated)
+        start_date / end_date: YYYY-MM-DD trading days
+
+    Example: PnL by strategy for MNQ shorts in Q1
+        /api/analytics/cube?group_by=strategy&root=MNQ&direction=short&start_date=2026-01-01&end_date=2026-03-31
+    """
+    try:
+        acc_id = request.args.get('acc_id')
+        return cached_account_response(acc_id, lambda: _cube(acc_id))
+    except Exception as e:
+        return jsonify({'error': f'Failed to calculate cube: {str(e)}'}), 500
+
+def _cube(acc_id: str = None):
+    group_by = [dim.strip() for dim in request.args.get('group_by', '').split(',') if dim.strip()]
+    filters = {
+        dim: [value.strip() for arg in request.args.getlist(dim) for value in arg.split(',') if value.strip()]
+        for dim in FILTER_DIMENSIONS if dim != 'account'
+    }
+    if acc_id:
+        filters['account'] = [acc_id]
+
+    try:
+        rows = query_cube(group_by, filters,
+                          _parse_day(request.args.get('start_date')), _parse_day(request.args.get('end_date')))
+    except ValueError as e:
+        return jsonify({'error': f'Invalid parameter: {str(e)}'}), 400
+
+    return jsonify({
+        'group_by': group_by,
+        'filters': {dim: values for dim, values in filters.items() if values},
+        'count': len(rows),
+        'data': rows
+    })
+
+@analytics_bp.route('/api/analytics/exposure', methods = ['GET'])
+def get_exposure():
+    """
+    Concurrent exposure from overlapping trades (see app/services/exposure.py):
+    open contracts, net contracts and notional over time for the selected
+    accounts combined, with peak / time-at-peak stats for the combination and
+    each account, and optional risk-limit checks. Cached per account and data
+    version.
+
+    Query params:
+        acc_id: one account (default: all accounts)
+        max_contracts / max_notional: limits to check (per account and combined)
+        max_points: cap on returned series points (default 500, 0 = all); peaks are kept
+        symbol / start_date / end_date: as for /api/analytics/performance
+    """
+    try:
+        acc_id = request.args.get('acc_id')
+        return cached_account_response(acc_id, lambda: _exposure(acc_id))
+    except Exception as e:
+        return jsonify({'error': f'Failed to calculate exposure: {str(e)}'}), 500
+
+def _exposure(acc_id: str = None):
+    max_contracts = request.args.get('max_contracts', type=int)
+    max_notional = request.args.get('max_notional', type=float)
+    max_points = request.args.get('max_points', DEFAULT_MAX_POINTS, type=int)
+    try:
+        intervals = load_trade_intervals(acc_id, request.args.get('symbol'),
+                                         _parse_day(request.args.get('start_date')),
+                                         _parse_day(request.args.get('end_date')))
+    except ValueError as e:
+        return jsonify({'error': f'Invalid parameter: {str(e)}'}), 400
+
+    result = exposure_by_account(intervals, max_contracts, max_notional)
+    series = result['series']
+    keep = downsample_indices([series['contracts'], series['notional']], max_points, x=series['times'])
+    return jsonify({
+        'acc_id': acc_id,
+        'trade_count': len(intervals),
+        'combined': result['combined'],
+        'accounts': result['accounts'],
+        'points': len(keep),
+        'total_points': len(series['times']),
+        'series': [
+            {
+                'time': str(series['times'][k].astype('datetime64[s]')),
+                'contracts': int(series['contracts'][k]),
+                'net_contracts': int(series['net_contracts'][k]),
+                'notional': round(float(series['notional'][k]), 2),
+            }
+            for k in keep.tolist()
+        ]
+    })
+
+@analytics_bp.route('/api/analytics/events', methods = ['GET'])
+def get_events():
+    """
+    Performance of trades overlapping economic-event windows (see
+    app/services/economic_events.py): per event tag, against trades near no
+    event, and per recent event occurrence. Cached per account, data version
+    and events file.
+
+    Query params:
+        limit: event occurrences listed, newest first (default 100)
+        acc_id / symbol / start_date / end_date: as for /api/analytics/performance
+    """
+    try:
+        acc_id = request.args.get('acc_id')
+        index = get_event_index()
+        return cached_account_response(acc_id, lambda: _events(acc_id, index), extra_version=index.version)
+    except Exception as e:
+        return jsonify({'error': f'Failed to calculate event statistics: {str(e)}'}), 500
+
+def _events(acc_id, index):
+    limit = request.args.get('limit', 100, type=int)
+    if limit < 0:
+        return jsonify({'error': 'limit must not be negative'}), 400
+    try:
+        trades = _load_trades(acc_id)
+    except ValueError as e:
+        return jsonify({'error': f'Invalid parameter: {str(e)}'}), 400
+
+    return jsonify({
+        'acc_id': acc_id,
+        'trade_count': len(trades),
+        **event_stats(index, trades, limit)
+    })
+
+MAX_CORRELATED_PAIRS = 10
+
+@analytics_bp.route('/api/analytics/correlation', methods = ['GET'])
+def get_correlation():
+    """
+    Correlation matrix of trading-day PnL across root symbols, accounts or
+    contracts, from the daily_pnl rollup (days a group didn't trade count as
+    0) - e.g. whether copy-traded accounts actually diversify. Cached per
+    data version.
+
+    Query params:
+        by: 'account' (default), 'root' or 'symbol'
+        acc_id: one account, or accounts: comma-separated account ids (default: all)
+        min_days: leave out groups that traded on fewer days (default 1)
+        start_date / end_date: YYYY-MM-DD trading days
+    """
+    try:
+        accounts = [a.strip() for a in (request.args.get('accounts') or request.args.get('acc_id') or '').split(',')
+                    if a.strip()]
+        # a single account's responses only depend on that account's data
+        acc_id = accounts[0] if len(accounts) == 1 else None
+        return cached_account_response(acc_id, lambda: _correlation(accounts))
+    except Exception as e:
+        return jsonify({'error': f'Failed to calculate correlation: {str(e)}'}), 500
+
+def _correlation(accounts):
+    by = request.args.get('by', 'account')
+    min_days = request.args.get('min_days', 1, type=int)
+    try:
+        labels, days, matrix = daily_pnl_matrix(by, accounts or None, _parse_day(request.args.get('start_date')),
+                                                _parse_day(request.args.get('end_date')), min_days)
+    except ValueError as e:
+        return jsonify({'error': f'Invalid parameter: {str(e)}'}), 400
+
+    active_days = (matrix != 0).sum(axis=0)
+    correlation = correlation_matrix(matrix)
+
+    pairs = []
+    if len(labels) > 1:
+        upper_i, upper_j = np.triu_indices(len(labels), k=1)
+        values = correlation[upper_i, upper_j]
+        valid = ~np.isnan(values)
+        ranked = np.argsort(-values[valid], kind='stable')[:MAX_CORRELATED_PAIRS]
+        pairs = [
+            {'a': labels[i], 'b': labels[j], 'correlation': round(float(v), 4)}
+            for i, j, v in zip(upper_i[valid][ranked].tolist(), upper_j[valid][ranked].tolist(), values[valid][ranked])
+        ]
+        average = round(float(values[valid].mean()), 4) if valid.any() else None
+    else:
+        average = None
+
+    return jsonify({
+        'by': by,
+        'labels': labels,
+        'days': len(days),
+        'start_date': str(days[0]) if len(days) else None,
+        'end_date': str(days[-1]) if len(days) else None,
+        'matrix': [[None if v != v else v for v in row] for row in np.round(correlation, 4).tolist()],  # NaN -> null
+        'groups': [
+            {'label': label, 'pnl': round(float(total), 2), 'active_days': int(count)}
+            for label, total, count in zip(labels, matrix.sum(axis=0), active_days)
+        ],
+        'average_correlation': average,
+        'most_correlated': pairs
+    })
+
+MAX_ROLLING_WINDOW = 1000
+
+@analytics_bp.route('/api/analytics/rolling', methods = ['GET'])
+def get_rolling():
+    """
+    Rolling win rate, average win/loss, expectancy and profit factor over the
+    last `window` trades, one point per trade (LTTB-downsampled to max_points),
+    cached per account and data version.
+
+    Query params:
+        window: trades per window (default 20)
+        max_points: cap on returned points (default 500, 0 = all)
+        acc_id / symbol / start_date / end_date: as for /api/analytics/performance
+    """
+    try:
+        acc_id = request.args.get('acc_id')
+        return cached_account_response(acc_id, lambda: _rolling(acc_id))
+    except Exception as e:
+        return jsonify({'error': f'Failed to calculate rolling statistics: {str(e)}'}), 500
+
+def _rolling(acc_id: str = None):
+    window = request.args.get('window', 20, type=int)
+    max_points = request.args.get('max_points', DEFAULT_MAX_POINTS, type=int)
+    if not 1 <= window <= MAX_ROLLING_WINDOW:
+        return jsonify({'error': f'window must be between 1 and {MAX_ROLLING_WINDOW}'}), 400
+    try:
+        trades = _load_trades(acc_id)
+    except ValueError as e:
+        return jsonify({'error': f'Invalid parameter: {str(e)}'}), 400
+
+    stats = rolling_stats(trades.pnl, window)
+    points = []
+    # empty ratios (NaN) count as 0 when picking points, so they can't poison LTTB's areas
+    for k in downsample_indices([np.nan_to_num(values) for values in stats.values()], max_points).tolist():
+        last = k + window - 1  # window's last trade
+        point = {
+            'trade_number': last + 1,
+            'id': trades.ids[last],
+            'date': str(trades.trading_days[last]),
+        }
+        for name, values in stats.items():
+            point[name] = round(float(values[k]), 2) if not np.isnan(values[k]) else None
+        points.append(point)
+
+    return jsonify({
+        'acc_id': acc_id,
+        'window': window,
+        'trade_count': len(trades),
+        'points': len(points),
+        'data': points
+    })
+
+MAX_SIMULATION_PATHS = 200000
+MAX_SIMULATION_HORIZON = 10000
+
+@analytics_bp.route('/api/analytics/monte-carlo', methods = ['GET'])
+def get_monte_carlo():
+    """
+    Risk of ruin from resampling the account's historical trade PnLs into
+    synthetic equity paths (see app/services/monte_carlo.py). Results are
+    seeded, so they're cached per account and data version like the rest.
+
+    Query params:
+        paths: number of simulated paths (default 10000)
+        horizon: trades per path (default: number of historical trades)
+        method: 'bootstrap' (default) or 'block' (block bootstrap)
+        block_size: trades per block for method=block (default 5)
+        trailing_drawdown: trailing drawdown limit in dollars, e.g. 2000
+        lock_at_start: true to stop trailing once the limit reaches the starting balance
+        target: profit target in dollars
+        seed: random seed (default 0)
+        acc_id / symbol / start_date / end_date: which trades to resample
+    """
+    try:
+        acc_id = request.args.get('acc_id')
+        return cached_account_response(acc_id, lambda: _monte_carlo(acc_id))
+    except Exception as e:
+        return jsonify({'error': f'Failed to run Monte Carlo simulation: {str(e)}'}), 500
+
+def _monte_carlo(acc_id: str = None):
+    method = request.args.get('method', 'bootstrap')
+    if method not in ('bootstrap', 'block'):
+        return jsonify({'error': "method must be 'bootstrap' or 'block'"}), 400
+    paths = request.args.get('paths', 10000, type=int)
+    horizon = request.args.get('horizon', type=int)
+    block_size = request.args.get('block_size', 5, type=int) if method == 'block' else 1
+    if not 1 <= paths <= MAX_SIMULATION_PATHS:
+        return jsonify({'error': f'paths must be between 1 and {MAX_SIMULATION_PATHS}'}), 400
+    if horizon is not None and not 1 <= horizon <= MAX_SIMULATION_HORIZON:
+        return jsonify({'error': f'horizon must be between 1 and {MAX_SIMULATION_HORIZON}'}), 400
+    if block_size < 1:
+        return jsonify({'error': 'block_size must be at least 1'}), 400
+    try:
+        trades = _load_trades(acc_id)
+    except ValueError as e:
+        return jsonify({'error': f'Invalid parameter: {str(e)}'}), 400
+    if len(trades) < 2:
+        return jsonify({'error': 'Need at least 2 trades to simulate'}), 400
+
+    result = simulate(
+        trades.pnl,
+        paths=paths,
+        horizon=min(horizon or len(trades), MAX_SIMULATION_HORIZON),
+        block_size=block_size,
+        trailing_drawdown=request.args.get('trailing_drawdown', type=float),
+        lock_at_start=request.args.get('lock_at_start', 'false').lower() == 'true',
+        target=request.args.get('target', type=float),
+        seed=request.args.get('seed', 0, type=int)
+    )
+    trading_days = len(np.unique(trades.trading_days))
+    return jsonify({
+        'acc_id': acc_id,
+        'history_trades': len(trades),
+        'trades_per_day': round(len(trades) / trading_days, 2),
+        **result
+    })
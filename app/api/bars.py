@@ -0,0 +1,43 @@
+from flask import Blueprint, request, jsonify
+from datetime import datetime
+from app.services.bar_store import get_bar_store
+
+bars_bp = Blueprint('bars', __name__)
+
+@bars_bp.route('/api/bars', methods = ['GET'])
+def get_bar_symbols():
+    """Contracts with bars in the local bar store."""
+    try:
+        return jsonify({'symbols': get_bar_store().symbols()})
+    except Exception as e:
+        return jsonify({'error': f'Failed to list bar symbols: {str(e)}'}), 500
+
+@bars_bp.route('/api/bars/<symbol>', methods = ['GET'])
+def get_bars(symbol):
+    """
+    1-minute bars of a contract from the memory-mapped bar store (no database).
+
+    Query params:
+        trading_day: YYYY-MM-DD, that session on the contract's exchange calendar
+        start / end: ISO datetimes (naive LA time), bars opening in [start, end)
+    """
+    try:
+        store = get_bar_store()
+        trading_day = request.args.get('trading_day')
+        try:
+            if trading_day:
+                bars = store.trading_day(symbol, datetime.strptime(trading_day, '%Y-%m-%d').date())
+            else:
+                start, end = request.args.get('start'), request.args.get('end')
+                bars = store.window(symbol, datetime.fromisoformat(start) if start else None,
+                                    datetime.fromisoformat(end) if end else None)
+        except ValueError as e:
+            return jsonify({'error': f'Invalid parameter: {str(e)}'}), 400
+
+        return jsonify({
+            'symbol': symbol.upper(),
+            'count': len(bars.time),
+            'bars': bars.to_dict()
+        })
+    except Exception as e:
+        return jsonify({'error': f'Failed to load bars: {str(e)}'}), 500
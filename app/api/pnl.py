@@ -1,7 +1,9 @@
 from flask import Blueprint, request, jsonify
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import pytz
-from app.db.models import db, Trade
+from app.db.models import db, Trade, DailyPnl
+from app.services.pnl_cache import cached_period_response
+from app.services.session_calendar import daily_calendar
 
 pnl_bp = Blueprint('pnl', __name__)
 
@@ -29,37 +31,15 @@ def get_trading_day(dt: datetime, market_close_hour: int = 15, timezone: str = '
     Returns:
         ISO date string (YYYY-MM-DD) representing the trading day
     """
-    # Convert to PST timezone
-    pst = pytz.timezone(timezone)
-    
     # If datetime is naive (no timezone), assume it's already in the target timezone
-    if dt.tzinfo is None:
-        dt = pst.localize(dt)
-    else:
+    if dt.tzinfo is not None:
         # Convert from UTC (or other timezone) to PST
-        dt = dt.astimezone(pst)
+        dt = dt.astimezone(pytz.timezone(timezone)).replace(tzinfo=None)
     
-    # Create market close time for comparison (3:00pm on the same date)
-    market_close_time = dt.replace(hour=market_close_hour, minute=0, second=0, microsecond=0)
-    
-    # Trading day logic:
+    # Precomputed market closes, bisect lookup (see app/services/session_calendar.py):
     # - If time <= 3:00pm: belongs to current calendar day's trading day
     # - If time > 3:00pm: belongs to next calendar day's trading day
-    # 
-    # Example for trading day "2026-01-15":
-    # - 2026-01-14 3:00:00pm → Trading day 2026-01-14 (not 2026-01-15)
-    # - 2026-01-14 3:00:01pm → Trading day 2026-01-15 (included)
-    # - 2026-01-15 3:00:00pm → Trading day 2026-01-15 (included)
-    # - 2026-01-15 3:00:01pm → Trading day 2026-01-16 (not included)
-    
-    if dt <= market_close_time:
-        # At or before market close: use current calendar date
-        trading_date = dt.date()
-    else:
-        # After market close: use next calendar date
-        trading_date = (dt + timedelta(days=1)).date()
-    
-    return trading_date.isoformat()
+    return daily_calendar(market_close_hour, timezone).trading_day(dt).isoformat()
 
 def get_trading_day_range(trading_day_str: str, market_close_hour: int = 15, timezone: str = 'America/Los_Angeles'):
     """
@@ -83,36 +63,82 @@ def get_trading_day_range(trading_day_str: str, market_close_hour: int = 15, tim
     Returns:
         Tuple of (start_datetime, end_datetime) as naive datetime for database queries
     """
-    pst = pytz.timezone(timezone)
-    
     # Parse the trading day
     trading_date = datetime.strptime(trading_day_str, '%Y-%m-%d').date()
     
-    # Trading day starts: previous day at market close + 1 microsecond
-    # This ensures trades at exactly 3:00:00pm belong to previous trading day
-    # Example: Trading day 2026-01-15 starts at 2026-01-14 3:00:00.000001pm PST
-    start_date = trading_date - timedelta(days=1)
-    start_dt = pst.localize(
-        datetime.combine(start_date, datetime.min.time().replace(hour=market_close_hour, minute=0, second=0, microsecond=0))
-    ) + timedelta(microseconds=1)  # Add 1 microsecond to exclude exactly 3:00:00.000000pm
-    
-    # Trading day ends: current day at market close (inclusive)
-    # Example: Trading day 2026-01-15 ends at 2026-01-15 3:00:00pm PST (inclusive)
-    end_dt = pst.localize(
-        datetime.combine(trading_date, datetime.min.time().replace(hour=market_close_hour, minute=0, second=0))
-    )
+    # Previous day's market close (exclusive) to this day's market close (inclusive),
+    # from the precomputed calendar. Add 1 microsecond to exclude exactly 3:00:00.000000pm
+    start_naive, end_naive = daily_calendar(market_close_hour, timezone).bounds(trading_date, trading_date)
+    start_naive += timedelta(microseconds=1)
     
     # Convert to UTC then back to naive for database (if your DB stores naive datetimes)
+    pst = pytz.timezone(timezone)
     utc = pytz.UTC
-    start_utc = start_dt.astimezone(utc)
-    end_utc = end_dt.astimezone(utc)
+    start_utc = pst.localize(start_naive).astimezone(utc)
+    end_utc = pst.localize(end_naive).astimezone(utc)
     
     # Return as naive datetime (SQLAlchemy typically works with naive datetimes)
     return start_utc.replace(tzinfo=None), end_utc.replace(tzinfo=None)
 
+def _exit_time_filters(start_date: str = None, end_date: str = None) -> list:
+    """
+    Calendar-day (not trading day) bounds on exit_time.
+
+    Args:
+        start_date: YYYY-MM-DD (start of that day) or full ISO datetime
+        end_date: YYYY-MM-DD (end of that day) or full ISO datetime
+    """
+    filters = []
+    if start_date:
+        # Simple date filtering - use calendar date, not trading day
+        if 'T' not in start_date:
+            # It's a date string (YYYY-MM-DD), use it as calendar date
+            start = datetime.strptime(start_date, '%Y-%m-%d')
+        else:
+            # It's a full datetime, use as-is
+            start = datetime.fromisoformat(start_date)
+        filters.append(Trade.exit_time >= start)
+    if end_date:
+        # Simple date filtering - use calendar date, not trading day
+        if 'T' not in end_date:
+            # It's a date string (YYYY-MM-DD), use end of that day
+            end = datetime.strptime(end_date, '%Y-%m-%d')
+            end = end.replace(hour=23, minute=59, second=59)
+        else:
+            # It's a full datetime, use as-is
+            end = datetime.fromisoformat(end_date)
+        filters.append(Trade.exit_time <= end)
+    return filters
+
+def _is_date_only(value: str = None) -> bool:
+    return not value or 'T' not in value
+
+def _parse_day(value: str = None):
+    return datetime.strptime(value, '%Y-%m-%d').date() if value else None
+
 @pnl_bp.route('/api/pnl/daily', methods = ['GET'])
 def get_daily_pnl():
-    """Calculate daily Pnl Aggregation"""
+    """
+    Calculate daily Pnl Aggregation.
+
+    start_date/end_date as YYYY-MM-DD select trading days (3pm PST cutoff) and
+    are answered from the daily_pnl rollup, with an ETag and a versioned cache
+    (see app/services/pnl_cache.py). Full ISO datetimes bound exit_time
+    exactly and are aggregated from trades in SQL. Pass summary=true (or
+    include_trades=false) to return only the per-day aggregates; a day's trades
+    can then be fetched from /api/pnl/daily/<date>/trades when it's opened.
+    """
+    start_date = request.args.get('start_date')
+    end_date = request.args.get('end_date')
+    if not (_is_date_only(start_date) and _is_date_only(end_date)):
+        return _daily_pnl()
+
+    try:
+        return cached_period_response(_parse_day(start_date), _parse_day(end_date), _daily_pnl)
+    except Exception as e:
+        return jsonify({'error': f'Failed to calculate daily PnL: {str(e)}'}), 500
+
+def _daily_pnl():
     try:
         # parameters to filter the aggregations by
         # start date
@@ -121,67 +147,70 @@ def get_daily_pnl():
         end_date = request.args.get('end_date')
         # symbol
         symbol = request.args.get('symbol')
+        include_trades = request.args.get('include_trades', 'true').lower() != 'false'
+        if request.args.get('summary', 'false').lower() == 'true':
+            include_trades = False
 
-        # get all trades
-        query = Trade.query
+        if _is_date_only(start_date) and _is_date_only(end_date):
+            # trading-day range: read the rollup
+            rollup_filters = []
+            trade_filters = []
+            if start_date:
+                start_day = datetime.strptime(start_date, '%Y-%m-%d').date()
+                rollup_filters.append(DailyPnl.trading_day >= start_day)
+                trade_filters.append(Trade.trading_day >= start_day)
+            if end_date:
+                end_day = datetime.strptime(end_date, '%Y-%m-%d').date()
+                rollup_filters.append(DailyPnl.trading_day <= end_day)
+                trade_filters.append(Trade.trading_day <= end_day)
+            if symbol:
+                rollup_filters.append(DailyPnl.symbol == symbol)
+                trade_filters.append(Trade.symbol == symbol)
 
-        # apply filters
-        if symbol:
-            query = query.filter_by(symbol=symbol)
-        if start_date:
-            # Simple date filtering - use calendar date, not trading day
-            if 'T' not in start_date:
-                # It's a date string (YYYY-MM-DD), use it as calendar date
-                start = datetime.strptime(start_date, '%Y-%m-%d')
-                query = query.filter(Trade.exit_time >= start)
-            else:
-                # It's a full datetime, use as-is
-                start = datetime.fromisoformat(start_date)
-                query = query.filter(Trade.exit_time >= start)
-        if end_date:
-            # Simple date filtering - use calendar date, not trading day
-            if 'T' not in end_date:
-                # It's a date string (YYYY-MM-DD), use end of that day
-                end = datetime.strptime(end_date, '%Y-%m-%d')
-                end = end.replace(hour=23, minute=59, second=59)
-                query = query.filter(Trade.exit_time <= end)
-            else:
-                # It's a full datetime, use as-is
-                end = datetime.fromisoformat(end_date)
-                query = query.filter(Trade.exit_time <= end)
-        
-        trades = query.all()
+            rows = db.session.query(
+                DailyPnl.trading_day.label('trading_day'),
+                db.func.sum(DailyPnl.pnl).label('pnl'),
+                db.func.sum(DailyPnl.trade_count).label('trade_count'),
+                db.func.sum(DailyPnl.wins).label('winning_trades'),
+                db.func.sum(DailyPnl.losses).label('losing_trades')
+            ).filter(*rollup_filters).group_by(DailyPnl.trading_day).order_by(DailyPnl.trading_day).all()
+        else:
+            # exact datetime bounds: aggregate trades directly
+            trade_filters = _exit_time_filters(start_date, end_date)
+            if symbol:
+                trade_filters.append(Trade.symbol == symbol)
+
+            rows = db.session.query(
+                Trade.trading_day,
+                db.func.sum(Trade.pnl).label('pnl'),
+                db.func.count(Trade.id).label('trade_count'),
+                db.func.sum(db.case((Trade.pnl > 0, 1), else_=0)).label('winning_trades'),
+                db.func.sum(db.case((Trade.pnl < 0, 1), else_=0)).label('losing_trades')
+            ).filter(*trade_filters).group_by(Trade.trading_day).order_by(Trade.trading_day).all()
 
         daily_pnl = {}
+        for row in rows:
+            trade_date = row.trading_day.isoformat()
+            daily_pnl[trade_date] = {
+                'date': trade_date,
+                'pnl': float(row.pnl or 0),
+                'trade_count': int(row.trade_count),
+                'winning_trades': int(row.winning_trades or 0),
+                'losing_trades': int(row.losing_trades or 0)
+            }
+            if include_trades:
+                daily_pnl[trade_date]['trades'] = []  # Include trades array for frontend
 
-        for trade in trades:
-            # Use trading day (3pm PST cutoff) instead of calendar day
-            trade_date = get_trading_day(trade.exit_time, market_close_hour=15, timezone='America/Los_Angeles')
-
-            # Initialize date entry if not exists
-            if trade_date not in daily_pnl:
-                daily_pnl[trade_date] = {
-                    'date': trade_date,
-                    'pnl': 0.0,
-                    'trade_count': 0,
-                    'winning_trades': 0,
-                    'losing_trades': 0,
-                    'trades': []  # Include trades array for frontend
-                }
-
-            trade_pnl = float(trade.pnl)
-            daily_pnl[trade_date]['pnl'] += trade_pnl
-            daily_pnl[trade_date]['trade_count'] += 1
-            daily_pnl[trade_date]['trades'].append(trade.to_dict())  # Add trade to array
-
-            # track wins and losses
-            if trade_pnl > 0 :
-                daily_pnl[trade_date]['winning_trades'] += 1
-            elif trade_pnl < 0 :
-                daily_pnl[trade_date]['losing_trades'] += 1
-
-        # convert to list and sort by date
-        daily_data = sorted(daily_pnl.values(), key=lambda x: x['date'])
+        if include_trades and daily_pnl:
+            # one ordered query, bucketed by the stored trading day
+            trades = Trade.query.filter(*trade_filters).order_by(Trade.exit_time).all()
+            for trade in trades:
+                day = trade.trading_day.isoformat() if trade.trading_day else None
+                if day in daily_pnl:
+                    daily_pnl[day]['trades'].append(trade.to_dict())
+
+        # already sorted by date
+        daily_data = list(daily_pnl.values())
         # totals
         total_pnl = sum(day['pnl'] for day in daily_data)
         total_trades = sum(day['trade_count'] for day in daily_data)
@@ -196,51 +225,188 @@ def get_daily_pnl():
     except Exception as e:
         return jsonify({'error': f'Failed to calculate daily PnL: {str(e)}'}), 500
 
+def _month_days(year: int = None, month: int = None):
+    """First and last trading day of a month, or (None, None) without year/month."""
+    if not (year and month):
+        return None, None
+    start_day = date(year, month, 1)
+    if month == 12:
+        end_day = date(year + 1, 1, 1) - timedelta(days=1)
+    else:
+        end_day = date(year, month + 1, 1) - timedelta(days=1)
+    return start_day, end_day
+
 @pnl_bp.route('/api/trades/calendar', methods=['GET'])
 def get_calendar_trades():
     """
     Get trades grouped by date for calendar display.
     Only returns matched trades (from trades table).
+
+    Day totals come from the daily_pnl rollup; year/month select the trading
+    days of that month (3pm PST cutoff). summary=true skips embedding trades.
+    Responses carry an ETag and closed months are served from cache.
     """
-    from app.db.models import Trade
-    from datetime import datetime
-    
-    year = request.args.get('year', type=int)
-    month = request.args.get('month', type=int)
-    
-    # Query trades (not orders)
-    query = Trade.query
+    start_day, end_day = _month_days(request.args.get('year', type=int), request.args.get('month', type=int))
+    return cached_period_response(start_day, end_day, _calendar_trades)
+
+def _calendar_trades():
+    start_day, end_day = _month_days(request.args.get('year', type=int), request.args.get('month', type=int))
+    summary = request.args.get('summary', 'false').lower() == 'true'
     
-    if year and month:
-        start_date = datetime(year, month, 1)
-        if month == 12:
-            end_date = datetime(year + 1, 1, 1)
-        else:
-            end_date = datetime(year, month + 1, 1)
-        
-        # Filter by exit_time (trades are closed on exit date)
-        query = query.filter(
-            Trade.exit_time >= start_date,
-            Trade.exit_time < end_date
-        )
+    rollup_filters = []
+    trade_filters = []
+    if start_day:
+        rollup_filters = [DailyPnl.trading_day >= start_day, DailyPnl.trading_day <= end_day]
+        # trades are closed on their exit's trading day
+        trade_filters = [Trade.trading_day >= start_day, Trade.trading_day <= end_day]
     
-    trades = query.order_by(Trade.exit_time).all()
+    rows = db.session.query(
+        DailyPnl.trading_day,
+        db.func.sum(DailyPnl.pnl),
+        db.func.sum(DailyPnl.trade_count),
+        db.func.sum(DailyPnl.wins),
+        db.func.sum(DailyPnl.losses)
+    ).filter(*rollup_filters).group_by(DailyPnl.trading_day).order_by(DailyPnl.trading_day).all()
     
     # Group by trading day (3pm PST cutoff)
     daily_data = {}
-    for trade in trades:
-        date_str = get_trading_day(trade.exit_time, market_close_hour=15, timezone='America/Los_Angeles')
-        
-        if date_str not in daily_data:
-            daily_data[date_str] = {
-                'date': date_str,
-                'pnl': 0.0,
-                'trades': []
-            }
-        
-        daily_data[date_str]['pnl'] += float(trade.pnl)
-        daily_data[date_str]['trades'].append(trade.to_dict())
+    for trading_day, pnl, trade_count, wins, losses in rows:
+        date_str = trading_day.isoformat()
+        daily_data[date_str] = {
+            'date': date_str,
+            'pnl': float(pnl or 0),
+            'trade_count': int(trade_count or 0),
+            'winning_trades': int(wins or 0),
+            'losing_trades': int(losses or 0)
+        }
+        if not summary:
+            daily_data[date_str]['trades'] = []
+    
+    if daily_data and not summary:
+        trades = Trade.query.filter(*trade_filters).order_by(Trade.exit_time).all()
+        for trade in trades:
+            day = trade.trading_day.isoformat() if trade.trading_day else None
+            if day in daily_data:
+                daily_data[day]['trades'].append(trade.to_dict())
     
     return jsonify({
         'data': list(daily_data.values())
-    })
\ No newline at end of file
+    })
+
+
+@pnl_bp.route('/api/pnl/daily/<trading_day>/trades', methods=['GET'])
+def get_trading_day_trades(trading_day):
+    """
+    One trading day's trades (3pm PST cutoff), paginated, in exit_time order.
+    Used to load a day lazily after the calendar was drawn in summary mode.
+
+    Query params:
+        page: 1-based page number (default 1)
+        per_page: trades per page (default 50, max 500)
+        symbol: only this symbol
+    """
+    try:
+        day = datetime.strptime(trading_day, '%Y-%m-%d').date()
+    except ValueError:
+        return jsonify({'error': 'trading_day must be YYYY-MM-DD'}), 400
+
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', 50, type=int), 1), 500)
+    symbol = request.args.get('symbol')
+
+    try:
+        query = Trade.query.filter(Trade.trading_day == day)
+        if symbol:
+            query = query.filter(Trade.symbol == symbol)
+
+        total = query.count()
+        trades = query.order_by(Trade.exit_time, Trade.id).offset((page - 1) * per_page).limit(per_page).all()
+
+        return jsonify({
+            'date': day.isoformat(),
+            'page': page,
+            'per_page': per_page,
+            'total': total,
+            'pages': (total + per_page - 1) // per_page,
+            'trades': [trade.to_dict() for trade in trades]
+        }), 200
+
+    except Exception as e:
+        return jsonify({'error': f'Failed to fetch trades for {trading_day}: {str(e)}'}), 500
+
+PERIOD_GRAINS = {'weekly': 'week', 'monthly': 'month', 'yearly': 'year'}
+
+def _period_bounds(period: str, start: date):
+    """(label, last day) of the week/month/year starting at start. Weeks are ISO (Monday start)."""
+    if period == 'weekly':
+        iso_year, iso_week, _ = start.isocalendar()
+        return f'{iso_year}-W{iso_week:02d}', start + timedelta(days=6)
+    if period == 'monthly':
+        return start.strftime('%Y-%m'), _month_days(start.year, start.month)[1]
+    return str(start.year), date(start.year, 12, 31)
+
+@pnl_bp.route('/api/pnl/weekly', methods=['GET'], defaults={'period': 'weekly'})
+@pnl_bp.route('/api/pnl/monthly', methods=['GET'], defaults={'period': 'monthly'})
+@pnl_bp.route('/api/pnl/yearly', methods=['GET'], defaults={'period': 'yearly'})
+def get_period_pnl(period):
+    """
+    Weekly (ISO), monthly or yearly PnL, rolled up from the daily_pnl rows
+    rather than from trades, so long histories cost one row per trading day.
+
+    Query params:
+        start_date / end_date: YYYY-MM-DD trading days (3pm PST cutoff)
+        symbol: only this symbol
+    """
+    try:
+        start_day = _parse_day(request.args.get('start_date'))
+        end_day = _parse_day(request.args.get('end_date'))
+        return cached_period_response(start_day, end_day, lambda: _period_pnl(period, start_day, end_day))
+    except Exception as e:
+        return jsonify({'error': f'Failed to calculate {period} PnL: {str(e)}'}), 500
+
+def _period_pnl(period: str, start_day: date = None, end_day: date = None):
+    symbol = request.args.get('symbol')
+
+    filters = []
+    if start_day:
+        filters.append(DailyPnl.trading_day >= start_day)
+    if end_day:
+        filters.append(DailyPnl.trading_day <= end_day)
+    if symbol:
+        filters.append(DailyPnl.symbol == symbol)
+
+    # date_trunc('week') is Monday-based, matching ISO weeks
+    period_start = db.cast(db.func.date_trunc(PERIOD_GRAINS[period], DailyPnl.trading_day), db.Date).label('period_start')
+    rows = db.session.query(
+        period_start,
+        db.func.sum(DailyPnl.pnl).label('pnl'),
+        db.func.sum(DailyPnl.trade_count).label('trade_count'),
+        db.func.sum(DailyPnl.wins).label('winning_trades'),
+        db.func.sum(DailyPnl.losses).label('losing_trades'),
+        db.func.sum(DailyPnl.gross_win).label('gross_win'),
+        db.func.sum(DailyPnl.gross_loss).label('gross_loss'),
+        db.func.count(db.distinct(DailyPnl.trading_day)).label('trading_days')
+    ).filter(*filters).group_by(period_start).order_by(period_start).all()
+
+    data = []
+    for row in rows:
+        label, last_day = _period_bounds(period, row.period_start)
+        data.append({
+            'period': label,
+            'start_date': row.period_start.isoformat(),
+            'end_date': last_day.isoformat(),
+            'pnl': float(row.pnl or 0),
+            'trade_count': int(row.trade_count or 0),
+            'winning_trades': int(row.winning_trades or 0),
+            'losing_trades': int(row.losing_trades or 0),
+            'gross_win': float(row.gross_win or 0),
+            'gross_loss': float(row.gross_loss or 0),
+            'trading_days': int(row.trading_days)
+        })
+
+    return jsonify({
+        'period': period,
+        'total_pnl': round(sum(p['pnl'] for p in data), 2),
+        'total_trades': sum(p['trade_count'] for p in data),
+        'data': data
+    }), 200
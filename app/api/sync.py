@@ -0,0 +1,55 @@
+from flask import Blueprint, request, jsonify, Response
+from app.db.models import db, LinkedAccount
+
+sync_bp = Blueprint('sync', __name__)
+
+@sync_bp.route('/api/sync/accounts', methods=['GET'])
+def get_linked_accounts():
+    """list accounts registered with the sync scheduler"""
+    try:
+        accounts = LinkedAccount.query.order_by(LinkedAccount.account).all()
+        return jsonify({
+            'count': len(accounts),
+            'accounts': [a.to_dict() for a in accounts]
+        }), 200
+    except Exception as e:
+        return jsonify({'error': f'Failed to retrieve linked accounts: {str(e)}'}), 500
+
+@sync_bp.route('/api/sync/accounts', methods=['POST'])
+def link_account():
+    """register an account for scheduled sync, or enable/disable/rename an existing one"""
+    try:
+        data = request.get_json() or {}
+        account_id = data.get('account')
+        if not account_id:
+            return jsonify({'error': 'Missing required field: account'}), 400
+
+        account = db.session.get(LinkedAccount, str(account_id))
+        created = account is None
+        if created:
+            account = LinkedAccount(account=str(account_id), enabled=True, consecutive_idle=0,
+                                    sync_count=0, error_count=0)
+            db.session.add(account)
+
+        if 'enabled' in data:
+            account.enabled = bool(data['enabled'])
+        if 'name' in data:
+            account.name = data['name']
+
+        db.session.commit()
+
+        return jsonify({
+            'message': f"Account {account.account} {'linked' if created else 'updated'}",
+            'account': account.to_dict()
+        }), 201 if created else 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'Failed to link account: {str(e)}'}), 500
+
+@sync_bp.route('/api/sync/metrics', methods=['GET'])
+def get_sync_metrics():
+    """per-account sync latency and lag, Prometheus text format"""
+    from app.ingestion.scheduler import render_metrics
+
+    accounts = LinkedAccount.query.order_by(LinkedAccount.account).all()
+    return Response(render_metrics(accounts), mimetype='text/plain; version=0.0.4')
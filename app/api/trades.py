@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify
 from datetime import datetime
 from app.db.models import db, Trade
 from app.services.metrics import detect_trade_type
+from app.services.daily_pnl import refresh_daily_pnl_for_trades, bump_trade_months
 from app.utils.csv_parser import parse_and_validate_csv
 
 # create blueprint
@@ -50,6 +51,7 @@ def insert_trade():
         )
 
         db.session.add(trade)
+        refresh_daily_pnl_for_trades([trade])
         db.session.commit()
 
         return jsonify({'message': 'Trade inserted successfully', 'trade':trade.to_dict()}), 201
@@ -58,6 +60,8 @@ def insert_trade():
         db.session.rollback()
         return jsonify({'error': f'Failed to insert trade: {str(e)}'}), 500
 
+SORTABLE_COLUMNS = ['pnl', 'mae', 'mfe', 'entry_efficiency', 'exit_efficiency']
+
 @trade_bp.route('/api/trades', methods = ['GET'])
 
 # get all trades and filter optionally
@@ -74,6 +78,24 @@ def get_trades():
             query = query.filter_by(symbol = symbol)
         if id:
             query = query.filter_by(id = id)
+        # trades near any of the given economic events, e.g. ?event=CPI,FOMC (GIN-indexed overlap)
+        if request.args.get('event'):
+            events = [tag.strip() for tag in request.args['event'].split(',') if tag.strip()]
+            query = query.filter(Trade.event_tags.overlap(events))
+
+        # range filters and sorting on the numeric columns, e.g. ?min_mae=100&sort=-mfe
+        for name in SORTABLE_COLUMNS:
+            column = getattr(Trade, name)
+            if request.args.get(f'min_{name}') is not None:
+                query = query.filter(column >= request.args.get(f'min_{name}', type=float))
+            if request.args.get(f'max_{name}') is not None:
+                query = query.filter(column <= request.args.get(f'max_{name}', type=float))
+        sort = request.args.get('sort')
+        if sort:
+            if sort.lstrip('-') not in SORTABLE_COLUMNS:
+                return jsonify({'error': f'sort must be one of {SORTABLE_COLUMNS} (prefix - for descending)'}), 400
+            column = getattr(Trade, sort.lstrip('-'))
+            query = query.order_by(column.desc().nulls_last() if sort.startswith('-') else column.asc().nulls_last())
         
         trades = query.all()
 
@@ -114,6 +136,13 @@ def update_trade(trade_id):
         # update notes if provided
         if 'notes' in data:
             trade.notes = data['notes']
+
+        # trade_type and tags are analytics cube dimensions
+        if 'trade_type' in data or 'tags' in data:
+            refresh_daily_pnl_for_trades([trade])
+        elif 'notes' in data:
+            # notes are in cached trade payloads, but not in the rollup
+            bump_trade_months([trade])
             
         db.session.commit()
 
@@ -126,6 +155,25 @@ def update_trade(trade_id):
         db.session.rollback()
         return jsonify({'error': f'Failed to update trade: {str(e)}'}), 500
 
+@trade_bp.route('/api/trades/<trade_id>/brackets', methods=['GET'])
+def get_trade_brackets(trade_id):
+    """stop/target orders attached to a trade's entry, from the persisted order graph"""
+    try:
+        trade = Trade.query.filter_by(id=trade_id).first()
+
+        if not trade:
+            return jsonify({'error': f'Trade {trade_id} not found'}), 404
+
+        from app.services.order_graph import get_trade_bracket_context
+        context = get_trade_bracket_context(trade)
+
+        return jsonify({
+            'trade_id': trade.id,
+            **context
+        }), 200
+    except Exception as e:
+        return jsonify({'error': f'Failed to get trade brackets: {str(e)}'}), 500
+
 @trade_bp.route('/api/trades/import', methods=['POST'])
 def import_trades_csv():
     """
@@ -339,7 +387,9 @@ def import_tradovate():
         # Step 2: Fetch fills from Tradovate
         print(f"\n📥 DEBUG: Step 2 - Fetching fills from Tradovate...", file=sys.stderr)
         fills = get_fills()
-        
+        if fills is None:
+            return jsonify({'error': 'Failed to fetch fills from Tradovate'}), 502
+
         # Ensure fills is a list
         if not isinstance(fills, list):
             fills = [] if not fills else [fills] if isinstance(fills, dict) else []
@@ -365,7 +415,9 @@ def import_tradovate():
         print(f"\n📦 DEBUG: Step 3 - Saving fills to database...", file=sys.stderr)
         from app.utils.tradovate_parser import save_tradovate_fills_to_db
         
-        saved_orders, errors = save_tradovate_fills_to_db(fills, account=account)
+        # Optionally collapse partial fills of one order into a single VWAP order row
+        coalesce_fills = request.get_json().get('coalesce_fills', False) if request.is_json else False
+        saved_orders, errors = save_tradovate_fills_to_db(fills, account=account, coalesce=coalesce_fills)
         
         print(f"📦 DEBUG: Saved {len(saved_orders)} orders", file=sys.stderr)
         print(f"📦 DEBUG: Encountered {len(errors)} errors/warnings", file=sys.stderr)
@@ -382,6 +434,21 @@ def import_tradovate():
                 'trades_created': 0
             }), 400
         
+        # Step 3b: Sync bracket/OCO structure (parentId, linkedId, ocoId) into order_links
+        print(f"\n🔗 DEBUG: Step 3b - Syncing bracket/OCO order graph...", file=sys.stderr)
+        from app.ingestion.tradovate import get_orders_list
+        from app.services.order_graph import upsert_order_links
+        
+        order_links = {'inserted': 0, 'updated': 0}
+        try:
+            order_links = upsert_order_links(get_orders_list() or [])
+            db.session.commit()
+            print(f"🔗 DEBUG: Order graph: {order_links['inserted']} new, {order_links['updated']} updated", file=sys.stderr)
+        except Exception as e:
+            # bracket context is optional - don't fail the import over it
+            db.session.rollback()
+            errors.append(f"Failed to sync order graph: {str(e)}")
+        
         # Step 4: Match filled orders into trades (position-based matching)
         auto_match = request.get_json().get('auto_match', True) if request.is_json else True
         print(f"\n🔄 DEBUG: Step 4 - Matching orders to trades (auto_match={auto_match})...", file=sys.stderr)
@@ -428,7 +495,9 @@ def import_tradovate():
                 'filled_orders_count': filled_count,
                 'account_used': account,
                 'auto_match_enabled': auto_match,
-                'fills_fetched': len(fills)
+                'fills_fetched': len(fills),
+                'coalesce_fills': coalesce_fills,
+                'order_links': order_links
             }
         }
         
@@ -1,12 +1,20 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.orm import validates
+from sqlalchemy.dialects.postgresql import ARRAY
 from datetime import datetime
+from app.services.session_calendar import trading_day_calendar
 
 db = SQLAlchemy()
 
 
 class Trade(db.Model):
     __tablename__ = 'trades'
-    __table_args__ = {'schema': 'trade'}
+    __table_args__ = (
+        db.Index('ix_trades_acc_id_trading_day', 'acc_id', 'trading_day'),
+        db.Index('ix_trades_trading_day', 'trading_day'),
+        db.Index('ix_trades_event_tags', 'event_tags', postgresql_using='gin'),
+        {'schema': 'trade'}
+    )
 
     id = db.Column(db.String(50), primary_key = True)
     acc_id = db.Column(db.String(20), nullable = False)
@@ -27,6 +35,22 @@ class Trade(db.Model):
     fills = db.Column(db.JSON)  # All orders (entry + exit) in this trade as list of dicts
     tags = db.Column(db.JSON)
     notes = db.Column(db.Text)
+    trading_day = db.Column(db.Date)  # exit_time's trading day (3pm PST cutoff), set with exit_time
+    # price excursions from local bar data (app/services/excursions.py); NULL until bars cover the trade
+    mae = db.Column(db.Numeric(10,2))  # max adverse excursion, dollars (>= 0)
+    mfe = db.Column(db.Numeric(10,2))  # max favorable excursion, dollars (>= 0)
+    entry_efficiency = db.Column(db.Float)  # 0-1, 1 = entered at the best price of the trade's range
+    exit_efficiency = db.Column(db.Float)   # 0-1, 1 = exited at the best price of the trade's range
+    # economic events whose window overlaps the trade (app/services/economic_events.py)
+    event_tags = db.Column(ARRAY(db.String(50)))
+    # protective stop / profit target of the entry order's bracket (app/services/order_graph.py)
+    stop_price = db.Column(db.Numeric(10,2))
+    target_price = db.Column(db.Numeric(10,2))
+
+    @validates('exit_time')
+    def _set_trading_day(self, key, exit_time):
+        self.trading_day = trading_day_calendar().trading_day(exit_time) if exit_time else None
+        return exit_time
 
     # convert trade object to dict
     def to_dict(self):
@@ -37,6 +61,7 @@ class Trade(db.Model):
             'direction': self.direction,
             'entry_time': self.entry_time.isoformat() if self.entry_time else None, 
             'exit_time': self.exit_time.isoformat() if self.exit_time else None,
+            'trading_day': self.trading_day.isoformat() if self.trading_day else None,
             'entry_price': float(self.entry_price),
             'exit_price': float(self.exit_price),
             'quantity': int(self.quantity),
@@ -45,12 +70,23 @@ class Trade(db.Model):
             'trade_type': self.trade_type,
             'fills': self.fills if self.fills else [],  # List of order dicts
             'tags': self.tags if self.tags else [],  # Array of tag strings
-            'notes': self.notes if self.notes else None  # Free-form notes text
+            'notes': self.notes if self.notes else None,  # Free-form notes text
+            'mae': float(self.mae) if self.mae is not None else None,
+            'mfe': float(self.mfe) if self.mfe is not None else None,
+            'entry_efficiency': self.entry_efficiency,
+            'exit_efficiency': self.exit_efficiency,
+            'event_tags': self.event_tags or [],
+            'stop_price': float(self.stop_price) if self.stop_price is not None else None,
+            'target_price': float(self.target_price) if self.target_price is not None else None
         }
 
 class Order(db.Model):
     __tablename__ = 'orders'
-    __table_args__ = {'schema': 'trade'}
+    __table_args__ = (
+        # one row per broker order per account - CSV and Tradovate imports upsert against this
+        db.Index('uq_orders_account_order_id', 'account', 'order_id', unique=True),
+        {'schema': 'trade'}
+    )
 
     # primary key
     id = db.Column(db.String(50), primary_key=True)
@@ -59,7 +95,7 @@ class Order(db.Model):
     b_s = db.Column(db.String(10))        # B/S column (Buy/Sell)
     contract = db.Column(db.String(20))  # Contract column (MGCG6, etc.)
     product = db.Column(db.String(50))    # Product column
-    avg_price = db.Column(db.Numeric(10,2))  # avgPrice or Avg Fill Price
+    avg_price = db.Column(db.Numeric(14,6))  # avgPrice or Avg Fill Price (a coalesced order's VWAP, unrounded)
     filled_qty = db.Column(db.Integer)   # filledQty or Filled Qty
     fill_time = db.Column(db.DateTime)   # Fill Time column
     status = db.Column(db.String(20))    # Status column (Filled, Canceled, etc.)
@@ -97,4 +133,237 @@ class Order(db.Model):
             'is_buy': self.is_buy,
             'is_sell': self.is_sell,
             'is_matched': self.is_matched
-        }
\ No newline at end of file
+        }
+
+class OrderFill(db.Model):
+    """
+    Child fills of a coalesced order - one row per broker fill, kept compact.
+
+    When partial fills are coalesced, the parent Order row holds the summed qty
+    and VWAP price; these rows keep the individual executions.
+    """
+    __tablename__ = 'order_fills'
+    __table_args__ = (
+        db.Index('ix_order_fills_account_order_id', 'account', 'order_id'),
+        {'schema': 'trade'}
+    )
+
+    fill_id = db.Column(db.String(50), primary_key=True)  # Tradovate fill id
+    order_pk = db.Column(db.String(50), index=True)       # Order.id of the coalesced order
+    order_id = db.Column(db.String(50))                   # broker order id
+    account = db.Column(db.String(50))
+    qty = db.Column(db.Integer)
+    price = db.Column(db.Numeric(14,6))
+    fill_time = db.Column(db.DateTime)
+
+    def to_dict(self):
+        return {
+            'fill_id': self.fill_id,
+            'order_id': self.order_id,
+            'qty': self.qty,
+            'price': float(self.price) if self.price is not None else None,
+            'fill_time': self.fill_time.isoformat() if self.fill_time else None
+        }
+
+class OrderLink(db.Model):
+    """
+    Bracket/OCO structure of broker orders (Tradovate order/list), one row per order.
+
+    Indexed on parent_id and oco_id so the children or OCO siblings of any order
+    are a single index lookup instead of regrouping the whole order list.
+    """
+    __tablename__ = 'order_links'
+    __table_args__ = (
+        db.Index('ix_order_links_parent_id', 'parent_id'),
+        db.Index('ix_order_links_oco_id', 'oco_id'),
+        db.Index('ix_order_links_linked_id', 'linked_id'),
+        {'schema': 'trade'}
+    )
+
+    order_id = db.Column(db.String(50), primary_key=True)  # broker order id (Order.order_id)
+    account = db.Column(db.String(50))
+    contract_id = db.Column(db.String(50))
+    action = db.Column(db.String(10))       # Buy / Sell
+    order_type = db.Column(db.String(20))   # Market, Limit, Stop, ...
+    ord_status = db.Column(db.String(20))   # Filled, Canceled, Working, ...
+    price = db.Column(db.Numeric(10,2))
+    stop_price = db.Column(db.Numeric(10,2))
+    parent_id = db.Column(db.String(50))    # bracket parent (entry order)
+    linked_id = db.Column(db.String(50))
+    oco_id = db.Column(db.String(50))       # one-cancels-other group
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'order_id': self.order_id,
+            'account': self.account,
+            'contract_id': self.contract_id,
+            'action': self.action,
+            'order_type': self.order_type,
+            'ord_status': self.ord_status,
+            'price': float(self.price) if self.price is not None else None,
+            'stop_price': float(self.stop_price) if self.stop_price is not None else None,
+            'parent_id': self.parent_id,
+            'linked_id': self.linked_id,
+            'oco_id': self.oco_id
+        }
+
+
+class LinkedAccount(db.Model):
+    """Broker accounts the sync scheduler keeps up to date, with their last sync state"""
+    __tablename__ = 'linked_accounts'
+    __table_args__ = {'schema': 'trade'}
+
+    account = db.Column(db.String(50), primary_key=True)  # Tradovate accountId
+    name = db.Column(db.String(100))
+    enabled = db.Column(db.Boolean, default=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # sync state, written by the scheduler after every attempt
+    last_sync_at = db.Column(db.DateTime)
+    last_success_at = db.Column(db.DateTime)
+    last_fill_at = db.Column(db.DateTime)       # newest fill seen for this account
+    last_sync_duration_ms = db.Column(db.Integer)
+    last_error = db.Column(db.Text)
+    consecutive_idle = db.Column(db.Integer, default=0)  # syncs in a row with no new fills
+    sync_count = db.Column(db.Integer, default=0)
+    error_count = db.Column(db.Integer, default=0)
+
+    def to_dict(self):
+        return {
+            'account': self.account,
+            'name': self.name,
+            'enabled': self.enabled,
+            'last_sync_at': self.last_sync_at.isoformat() if self.last_sync_at else None,
+            'last_success_at': self.last_success_at.isoformat() if self.last_success_at else None,
+            'last_fill_at': self.last_fill_at.isoformat() if self.last_fill_at else None,
+            'last_sync_duration_ms': self.last_sync_duration_ms,
+            'last_error': self.last_error,
+            'consecutive_idle': self.consecutive_idle,
+            'sync_count': self.sync_count,
+            'error_count': self.error_count
+        }
+
+
+class DailyPnl(db.Model):
+    """
+    Per (account, symbol, trading day) PnL rollup of the trades table.
+
+    Maintained in the same transaction as the trade writes that affect it
+    (see app/services/daily_pnl.py), so daily/calendar reads never touch trades.
+    """
+    __tablename__ = 'daily_pnl'
+    __table_args__ = (
+        db.Index('ix_daily_pnl_trading_day', 'trading_day'),
+        {'schema': 'trade'}
+    )
+
+    acc_id = db.Column(db.String(20), primary_key=True)
+    symbol = db.Column(db.String(10), primary_key=True)
+    trading_day = db.Column(db.Date, primary_key=True)  # 3pm PST cutoff, see get_trading_day
+    pnl = db.Column(db.Numeric(12,2), nullable=False, default=0)
+    trade_count = db.Column(db.Integer, nullable=False, default=0)
+    wins = db.Column(db.Integer, nullable=False, default=0)
+    losses = db.Column(db.Integer, nullable=False, default=0)
+    gross_win = db.Column(db.Numeric(12,2), nullable=False, default=0)
+    gross_loss = db.Column(db.Numeric(12,2), nullable=False, default=0)  # negative (sum of losing pnl)
+
+    def to_dict(self):
+        return {
+            'acc_id': self.acc_id,
+            'symbol': self.symbol,
+            'trading_day': self.trading_day.isoformat(),
+            'pnl': float(self.pnl),
+            'trade_count': self.trade_count,
+            'wins': self.wins,
+            'losses': self.losses,
+            'gross_win': float(self.gross_win),
+            'gross_loss': float(self.gross_loss)
+        }
+
+
+class PnlVersion(db.Model):
+    """
+    Per (account, trading month) change counter for cached PnL responses.
+
+    Bumped in the same transaction as every daily_pnl refresh, so a cached
+    calendar/daily response is valid exactly as long as the versions of the
+    months it covers are unchanged (see app/services/pnl_cache.py).
+    """
+    __tablename__ = 'pnl_versions'
+    __table_args__ = {'schema': 'trade'}
+
+    acc_id = db.Column(db.String(20), primary_key=True)
+    month = db.Column(db.Date, primary_key=True)  # first day of the trading-day month
+    version = db.Column(db.BigInteger, nullable=False, default=1)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class _CubeColumns:
+    """Shared dimensions and measures of the analytics cube tables."""
+
+    acc_id = db.Column(db.String(20), primary_key=True)
+    symbol = db.Column(db.String(10), primary_key=True)
+    trading_day = db.Column(db.Date, primary_key=True)
+    direction = db.Column(db.String(10), primary_key=True)
+    strategy = db.Column(db.String(50), primary_key=True, default='')    # '' = none
+    trade_type = db.Column(db.String(20), primary_key=True, default='')  # '' = none
+    pnl = db.Column(db.Numeric(12,2), nullable=False, default=0)
+    trade_count = db.Column(db.Integer, nullable=False, default=0)
+    wins = db.Column(db.Integer, nullable=False, default=0)
+    losses = db.Column(db.Integer, nullable=False, default=0)
+    gross_win = db.Column(db.Numeric(12,2), nullable=False, default=0)
+    gross_loss = db.Column(db.Numeric(12,2), nullable=False, default=0)
+    quantity = db.Column(db.Integer, nullable=False, default=0)
+
+
+class DailyCube(_CubeColumns, db.Model):
+    """
+    Trades aggregated per (account, symbol, trading day, direction, strategy,
+    trade_type) - the partial aggregates group-by analytics roll up from.
+    Maintained together with daily_pnl (see app/services/trade_cube.py).
+    """
+    __tablename__ = 'daily_cube'
+    __table_args__ = (
+        db.Index('ix_daily_cube_trading_day', 'trading_day'),
+        {'schema': 'trade'}
+    )
+
+
+class DailyTagCube(_CubeColumns, db.Model):
+    """
+    DailyCube additionally split by tag: a trade counts once under each of its
+    tags, and untagged trades under tag ''. Only read when grouping or
+    filtering by tag, since summing across tags would double count.
+    """
+    __tablename__ = 'daily_tag_cube'
+    __table_args__ = (
+        db.Index('ix_daily_tag_cube_trading_day', 'trading_day'),
+        {'schema': 'trade'}
+    )
+
+    tag = db.Column(db.Text, primary_key=True, default='')
+
+
+class TradeSketch(db.Model):
+    """
+    Mergeable quantile sketch (t-digest) of one trade metric per (account,
+    symbol, trading month). Distribution queries merge the sketches of the
+    months they cover instead of sorting trades. Maintained together with
+    daily_pnl (see app/services/quantile_sketch.py).
+    """
+    __tablename__ = 'trade_sketches'
+    __table_args__ = (
+        db.Index('ix_trade_sketches_month', 'month'),
+        {'schema': 'trade'}
+    )
+
+    acc_id = db.Column(db.String(20), primary_key=True)
+    symbol = db.Column(db.String(10), primary_key=True)
+    month = db.Column(db.Date, primary_key=True)        # first day of the trading-day month
+    metric = db.Column(db.String(20), primary_key=True)  # 'pnl' or 'holding_minutes'
+    count = db.Column(db.Integer, nullable=False)
+    total = db.Column(db.Float, nullable=False)
+    min_value = db.Column(db.Float, nullable=False)
+    max_value = db.Column(db.Float, nullable=False)
+    centroids = db.Column(db.LargeBinary, nullable=False)  # float64 means then float64 weights
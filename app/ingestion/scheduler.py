@@ -0,0 +1,355 @@
+"""
+Multi-account Tradovate sync scheduler.
+
+Keeps every enabled account in the linked_accounts registry in sync without a
+manual import call per account:
+
+- each account is synced on its own jittered interval, so accounts don't all
+  hit the API in the same second
+- at most max_workers accounts sync at once, and every API call draws from one
+  shared token bucket (tradovate.rate_limiter)
+- accounts with fresh fills are polled often during market hours; idle
+  accounts back off exponentially up to max_interval
+- sync duration, lag and counters are written back to linked_accounts and
+  exported in Prometheus text format by GET /api/sync/metrics
+
+Usage:
+    python -m app.ingestion.scheduler --workers 4 --rate 2
+"""
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pytz
+
+from app.db.models import db, LinkedAccount
+from app.ingestion import tradovate
+
+MARKET_TIMEZONE = 'America/Los_Angeles'
+
+
+class RateLimiter:
+    """Thread-safe token bucket: rate tokens/second, holding at most burst tokens."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class _SharedFetch:
+    """
+    Cache one API list call for ttl seconds.
+
+    fill/list and order/list return every account under the login, so accounts
+    syncing in the same cycle share one call instead of each spending budget on it.
+    A failed call (fetch returning None or raising) raises and is not cached, so
+    an outage fails every account's sync instead of passing for an idle one.
+    """
+
+    def __init__(self, fetch, ttl: float, name: str = None):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.name = name or getattr(fetch, '__name__', 'fetch')
+        self._value = None
+        self._fetched_at = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        with self._lock:
+            now = time.monotonic()
+            if self._fetched_at is None or now - self._fetched_at > self.ttl:
+                value = self.fetch()
+                if value is None:
+                    raise RuntimeError(f"Tradovate {self.name} failed")
+                self._value = value
+                self._fetched_at = now
+            return self._value
+
+
+def is_market_hours(now: datetime = None) -> bool:
+    """
+    CME Globex hours: Sunday 3pm PT to Friday 2pm PT, with a daily
+    2pm-3pm PT maintenance break.
+
+    Args:
+        now: timezone-aware datetime (default: current time)
+    """
+    tz = pytz.timezone(MARKET_TIMEZONE)
+    now = now.astimezone(tz) if now else datetime.now(tz)
+    weekday, hour = now.weekday(), now.hour  # Monday = 0
+
+    if weekday == 5:  # Saturday
+        return False
+    if weekday == 6:  # Sunday - opens at 3pm
+        return hour >= 15
+    if weekday == 4:  # Friday - closes at 2pm
+        return hour < 14
+    return hour != 14  # maintenance break
+
+
+def sync_account(account: str, fills: list, get_orders=None, coalesce: bool = False) -> dict:
+    """
+    Save, link and match one account's fills. Must run inside an app context.
+
+    Args:
+        account: Tradovate accountId
+        fills: fill/list results (all accounts - filtered here)
+        get_orders: returns order/list results (all accounts - filtered here);
+                    only called when the account has fills. Bracket context is
+                    optional, so a failure is a warning and the fills are still
+                    saved and matched
+        coalesce: collapse partial fills into one VWAP order per orderId
+
+    Returns:
+        dict with fills, orders_saved, newest_fill, trades_created, errors
+        (failures) and warnings (positions still open)
+    """
+    from app.utils.tradovate_parser import save_tradovate_fills_to_db, _parse_timestamp
+    from app.services.order_graph import upsert_order_links
+    from app.utils.csv_parser import process_filled_orders_to_trades
+
+    account_fills = [f for f in fills if str(f.get('accountId')) == account]
+    result = {'fills': len(account_fills), 'orders_saved': 0, 'newest_fill': None,
+              'trades_created': 0, 'errors': [], 'warnings': []}
+    if not account_fills:
+        return result
+
+    saved_orders, errors = save_tradovate_fills_to_db(account_fills, account=account, coalesce=coalesce)
+    result['orders_saved'] = len(saved_orders)
+    result['errors'].extend(errors)
+
+    fill_times = [t for t in (_parse_timestamp(f.get('timestamp')) for f in account_fills) if t]
+    result['newest_fill'] = max(fill_times) if fill_times else None
+
+    if get_orders is not None:
+        try:
+            orders = get_orders()
+            upsert_order_links([o for o in orders if str(o.get('accountId')) == account])
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            result['warnings'].append(f"Failed to sync order graph: {str(e)}")
+            print(f"⚠️  Scheduler: {account}: order graph not synced: {str(e)}", file=sys.stderr)
+
+    match_result = process_filled_orders_to_trades(account=account)
+    result['trades_created'] = match_result.get('trades_created', 0)
+    warnings = match_result.get('warnings', [])
+    result['errors'].extend(e for e in match_result.get('errors', []) if e not in warnings)
+    result['warnings'].extend(warnings)
+    return result
+
+
+class SyncScheduler:
+    """
+    Args:
+        app: Flask app (each sync runs in its own app context / DB session)
+        max_workers: accounts synced concurrently
+        requests_per_sec / burst: shared Tradovate API budget
+        active_interval: seconds between syncs for an account with new fills, market open
+        idle_interval: first backoff step for an account with no new fills
+        max_interval: cap for idle backoff
+        closed_interval: seconds between syncs while the market is closed
+        jitter: +/- fraction applied to every interval
+        token_refresh: seconds between re-authentications (tokens last ~80 minutes)
+        coalesce_fills: store partial fills of one order as a single VWAP order row
+    """
+
+    def __init__(self, app, max_workers: int = 4, requests_per_sec: float = 2.0, burst: int = 5,
+                 active_interval: float = 30, idle_interval: float = 120, max_interval: float = 1800,
+                 closed_interval: float = 1800, jitter: float = 0.2, token_refresh: float = 3600,
+                 coalesce_fills: bool = False):
+        self.app = app
+        self.max_workers = max_workers
+        self.active_interval = active_interval
+        self.idle_interval = idle_interval
+        self.max_interval = max_interval
+        self.closed_interval = closed_interval
+        self.jitter = jitter
+        self.token_refresh = token_refresh
+        self.coalesce_fills = coalesce_fills
+
+        self.rate_limiter = RateLimiter(requests_per_sec, burst)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='tradovate-sync')
+        self._fills = _SharedFetch(tradovate.get_fills, ttl=active_interval / 2, name='fill/list')
+        self._orders = _SharedFetch(tradovate.get_orders_list, ttl=active_interval / 2, name='order/list')
+        self._next_due = {}    # account -> monotonic time of next sync
+        self._in_flight = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._authenticated_at = None
+
+    def next_interval(self, account: LinkedAccount, now: datetime = None) -> float:
+        """Seconds until the account's next sync, with jitter."""
+        if not is_market_hours(now):
+            interval = self.closed_interval
+        elif not account.consecutive_idle:
+            interval = self.active_interval
+        else:
+            interval = min(self.idle_interval * 2 ** (account.consecutive_idle - 1), self.max_interval)
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _ensure_authenticated(self) -> bool:
+        now = time.monotonic()
+        if self._authenticated_at is not None and now - self._authenticated_at < self.token_refresh:
+            return True
+        if tradovate.authenticate():
+            self._authenticated_at = now
+            return True
+        print("❌ Scheduler: Tradovate authentication failed, retrying next tick", file=sys.stderr)
+        return False
+
+    def run_once(self) -> list:
+        """Submit every due account that isn't already syncing. Returns the futures."""
+        # every API call on every path (auth, list fetches) draws from the shared budget
+        tradovate.rate_limiter = self.rate_limiter
+        if not self._ensure_authenticated():
+            return []
+
+        with self.app.app_context():
+            accounts = [a.account for a in LinkedAccount.query.filter_by(enabled=True).all()]
+
+        now = time.monotonic()
+        futures = []
+        with self._lock:
+            for account in accounts:
+                if account in self._in_flight or self._next_due.get(account, 0) > now:
+                    continue
+                self._in_flight.add(account)
+                futures.append(self._executor.submit(self._sync, account))
+        return futures
+
+    def _sync(self, account: str):
+        started = time.monotonic()
+        try:
+            with self.app.app_context():
+                state = db.session.get(LinkedAccount, account)
+                if state is None:
+                    return None
+
+                error = None
+                result = None
+                try:
+                    result = sync_account(account, self._fills.get(), self._orders.get, self.coalesce_fills)
+                    if result['errors']:
+                        error = f"{len(result['errors'])} error(s): " + '; '.join(result['errors'][:5])
+                except Exception as e:
+                    db.session.rollback()
+                    error = str(e)
+
+                now = datetime.utcnow()
+                state.last_sync_at = now
+                state.last_sync_duration_ms = int((time.monotonic() - started) * 1000)
+                state.sync_count = (state.sync_count or 0) + 1
+
+                if error:
+                    # a failed sync says nothing about new fills - no idle backoff, no success
+                    state.last_error = error[:1000]
+                    state.error_count = (state.error_count or 0) + 1
+                else:
+                    newest = result['newest_fill']
+                    has_new_fills = newest is not None and (state.last_fill_at is None or newest > state.last_fill_at)
+                    state.consecutive_idle = 0 if has_new_fills else (state.consecutive_idle or 0) + 1
+                    if has_new_fills:
+                        state.last_fill_at = newest
+                    state.last_success_at = now
+                    state.last_error = None
+
+                interval = self.next_interval(state, now.replace(tzinfo=pytz.UTC))
+                db.session.commit()
+
+            with self._lock:
+                self._next_due[account] = time.monotonic() + interval
+            return result
+        finally:
+            with self._lock:
+                self._in_flight.discard(account)
+
+    def run_forever(self, tick: float = 1.0):
+        print(f"🕒 Sync scheduler started ({self.max_workers} workers)", file=sys.stderr)
+        try:
+            while not self._stop.is_set():
+                try:
+                    self.run_once()
+                except Exception as e:
+                    print(f"❌ Scheduler tick failed: {str(e)}", file=sys.stderr)
+                self._stop.wait(tick)
+        finally:
+            self._executor.shutdown(wait=True)
+
+    def stop(self):
+        self._stop.set()
+
+
+def render_metrics(accounts, now: datetime = None) -> str:
+    """Prometheus text exposition of per-account sync state."""
+    now = now or datetime.utcnow()
+    metrics = [
+        ('tradovate_sync_duration_seconds', 'gauge', 'Duration of the last sync',
+         lambda a: a.last_sync_duration_ms / 1000.0 if a.last_sync_duration_ms is not None else None),
+        ('tradovate_sync_lag_seconds', 'gauge', 'Seconds since the last successful sync',
+         lambda a: (now - a.last_success_at).total_seconds() if a.last_success_at else None),
+        ('tradovate_fill_lag_seconds', 'gauge', 'Seconds since the newest synced fill',
+         lambda a: (now - a.last_fill_at).total_seconds() if a.last_fill_at else None),
+        ('tradovate_sync_idle_streak', 'gauge', 'Consecutive syncs without new fills',
+         lambda a: a.consecutive_idle or 0),
+        ('tradovate_sync_total', 'counter', 'Sync attempts', lambda a: a.sync_count or 0),
+        ('tradovate_sync_errors_total', 'counter', 'Failed sync attempts', lambda a: a.error_count or 0),
+    ]
+
+    lines = []
+    for name, metric_type, help_text, value_of in metrics:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        for account in accounts:
+            value = value_of(account)
+            if value is not None:
+                lines.append(f'{name}{{account="{account.account}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+
+if __name__ == '__main__':
+    import argparse
+    from app.main import app
+
+    parser = argparse.ArgumentParser(description='Tradovate multi-account sync scheduler')
+    parser.add_argument('--workers', type=int, default=4, help='accounts synced concurrently')
+    parser.add_argument('--rate', type=float, default=2.0, help='shared API requests per second')
+    parser.add_argument('--burst', type=int, default=5)
+    parser.add_argument('--active-interval', type=float, default=30)
+    parser.add_argument('--idle-interval', type=float, default=120)
+    parser.add_argument('--max-interval', type=float, default=1800)
+    parser.add_argument('--closed-interval', type=float, default=1800)
+    parser.add_argument('--coalesce-fills', action='store_true', help='one VWAP order row per orderId')
+    args = parser.parse_args()
+
+    with app.app_context():
+        db.create_all()
+
+    scheduler = SyncScheduler(
+        app, max_workers=args.workers, requests_per_sec=args.rate, burst=args.burst,
+        active_interval=args.active_interval, idle_interval=args.idle_interval,
+        max_interval=args.max_interval, closed_interval=args.closed_interval,
+        coalesce_fills=args.coalesce_fills
+    )
+    try:
+        scheduler.run_forever()
+    except KeyboardInterrupt:
+        scheduler.stop()
@@ -1,15 +1,26 @@
+import os
 import requests
 import uuid
 
 access_token = None
 
+# point at a local stub (app/tests/tradovate_stub.py) for offline runs and benchmarks
+BASE_URL = os.environ.get('TRADOVATE_BASE_URL', 'https://demo.tradovateapi.com/v1')
+
+# optional shared request budget (e.g. scheduler.RateLimiter) - every API call takes a token
+rate_limiter = None
+
+def _throttle():
+    if rate_limiter is not None:
+        rate_limiter.acquire()
+
 def authenticate():
     global access_token
 
     username = "Google:115790771135467284232"
     password = "Djm0nd!23"  
 
-    url = "https://demo.tradovateapi.com/v1/auth/accesstokenrequest"
+    url = f"{BASE_URL}/auth/accesstokenrequest"
 
     body = {
     "name": username,
@@ -27,6 +38,7 @@ def authenticate():
     }
 
     print("Authenticating...")
+    _throttle()
     response = requests.post(url, json=body, headers = headers)
 
     if response.status_code == 200:
@@ -52,17 +64,19 @@ def get_fills():
     Get all fills from Tradovate API.
     
     Returns:
-        List of fill dictionaries, or empty list if error
+        List of fill dictionaries ([] when the account has none), or None if the
+        request failed (not authenticated, HTTP error, rate limit, timeout)
     """
     try:
         headers = get_headers()
     except Exception as e:
         print(f"❌ Error getting headers (not authenticated?): {str(e)}")
-        return []
+        return None
     
-    url = 'https://demo.tradovateapi.com/v1/fill/list'
+    url = f'{BASE_URL}/fill/list'
 
     try:
+        _throttle()
         response = requests.get(url, headers=headers, timeout=10)
         
         if response.status_code == 200:
@@ -80,17 +94,17 @@ def get_fills():
             return fills if isinstance(fills, list) else []  # Return the entire list
         else:
             print(f"❌ Error fetching fills: Status {response.status_code}, {response.text}")
-            return []
+            return None
     except Exception as e:
         print(f"❌ Exception fetching fills: {str(e)}")
-        return []
+        return None
 
 def get_fill_dependents(order_id: int):
     """call filldependents for one order ID"""
 
     headers = get_headers()
     
-    url = 'https://demo.tradovateapi.com/v1/fill/deps'
+    url = f'{BASE_URL}/fill/deps'
 
     params = {
         "masterid": order_id
@@ -98,6 +112,7 @@ def get_fill_dependents(order_id: int):
 
     print(f"Calling fillDependents for {order_id}")
 
+    _throttle()
     response = requests.get(url, headers=headers, params=params)
     print("Status:", response.status_code)
 
@@ -118,21 +133,22 @@ def get_orders_list(ord_status = None):
     """
 
     headers = get_headers()
-    url = 'https://demo.tradovateapi.com/v1/order/list'
+    url = f'{BASE_URL}/order/list'
 
     params = {}
     if ord_status:
         params["ordStatus"] = ord_status
 
+    _throttle()
     response = requests.get(url, headers=headers, params=params)
 
     if response.status_code != 200:
         print("Error:", response.text)
         return None
  
-    import json
     data = response.json()
-    print(json.dumps(data[-3:]))
+    print(f"✅ Success: Got {len(data)} orders from Tradovate API")
+    return data if isinstance(data, list) else []
 
 def get_contract_info(contract_id: int):
     """
@@ -145,9 +161,10 @@ def get_contract_info(contract_id: int):
         return None
     print(contract_id)
     headers = get_headers()
-    url = f'https://demo.tradovateapi.com/v1/contract/item/{contract_id}'
+    url = f'{BASE_URL}/contract/item/{contract_id}'
     
     try:
+        _throttle()
         response = requests.get(url, headers=headers, timeout=5)
         if response.status_code == 200:
             data = response.json()
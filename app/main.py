@@ -2,6 +2,9 @@ from flask import Flask, request, jsonify
 from app.db.models import db
 from app.api.trades import trade_bp
 from app.api.pnl import pnl_bp
+from app.api.sync import sync_bp
+from app.api.analytics import analytics_bp
+from app.api.bars import bars_bp
 from flask_cors import CORS
 
 app = Flask(__name__)
@@ -19,6 +22,9 @@ db.init_app(app)
 # register blueprints
 app.register_blueprint(trade_bp)
 app.register_blueprint(pnl_bp)
+app.register_blueprint(sync_bp)
+app.register_blueprint(analytics_bp)
+app.register_blueprint(bars_bp)
 
 @app.route('/')
 def home():
@@ -27,7 +33,18 @@ def home():
         'endpoints': [
             'POST /api/trades',
             'GET /api/trades',
-            'GET /api/pnl/daily'
+            'GET /api/pnl/daily',
+            'GET /api/analytics/performance',
+            'GET /api/analytics/heatmap',
+            'GET /api/analytics/sequence',
+            'GET /api/analytics/distribution',
+            'GET /api/analytics/cube',
+            'GET /api/analytics/rolling',
+            'GET /api/analytics/monte-carlo',
+            'GET /api/analytics/exposure',
+            'GET /api/analytics/events',
+            'GET /api/analytics/correlation',
+            'GET /api/bars/<symbol>'
             ]
         })
 
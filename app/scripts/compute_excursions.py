@@ -0,0 +1,40 @@
+"""
+Fill trades' MAE / MFE and entry/exit efficiency from the local bar store.
+
+New trades get them when they're matched; run this after importing bars
+(python -m app.scripts.import_bars) to fill in trades the bars now cover.
+Pass --recompute to recompute every covered trade, e.g. after replacing
+bar files.
+
+Usage:
+    python -m app.scripts.compute_excursions [--recompute]
+"""
+
+from app.main import app
+from app.db.models import db, Trade
+from app.services.excursions import backfill_excursions
+
+
+def main(recompute=False):
+    print("Computing trade excursions from bar data")
+
+    with app.app_context():
+        try:
+            updated = backfill_excursions(recompute=recompute)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error computing trade excursions: {str(e)}")
+            return False
+
+        print(f"\n📊 Summary:")
+        print(f"   ✅ Trades updated: {updated}")
+        print(f"   ⏳ Trades without bar coverage: {Trade.query.filter(Trade.mae.is_(None)).count()}")
+
+    print("\n✨ Done!")
+    return True
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(0 if main(recompute='--recompute' in sys.argv) else 1)
@@ -0,0 +1,45 @@
+"""
+Import 1-minute OHLCV CSV files into the local bar store (app/services/bar_store.py).
+
+The contract is taken from --symbol, or else from the file name up to the first
+'_' or '.' (MNQH6_1m.csv -> MNQH6). Bars already in the store are skipped, so
+overlapping files can be re-imported safely. Afterwards, fill in the MAE/MFE
+of trades the new bars cover with python -m app.scripts.compute_excursions.
+
+Usage:
+    python -m app.scripts.import_bars MNQH6_1m.csv MGCG6_1m.csv [--timezone UTC] [--symbol MNQH6]
+"""
+import argparse
+import os
+import re
+import sys
+
+from app.services.bar_store import get_bar_store
+
+
+def main(paths, symbol=None, timezone='UTC', root=None):
+    store = get_bar_store(root)
+    print(f"Importing bars into {store.root}")
+
+    ok = True
+    for path in paths:
+        contract = symbol or re.split(r'[_.]', os.path.basename(path))[0]
+        try:
+            appended = store.import_csv(contract, path, timezone=timezone)
+            print(f"   ✅ {contract}: {appended} bars from {path} (last bar {store.last_time(contract)})")
+        except Exception as e:
+            ok = False
+            print(f"   ❌ {path}: {str(e)}", file=sys.stderr)
+
+    print("\n✨ Done!")
+    return ok
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Import 1-minute OHLCV CSV files into the bar store')
+    parser.add_argument('paths', nargs='+')
+    parser.add_argument('--symbol', help='contract for every file (default: from the file name)')
+    parser.add_argument('--timezone', default='UTC', help="timezone of the files' timestamps")
+    parser.add_argument('--root', help='bar store directory (default BAR_STORE_DIR)')
+    args = parser.parse_args()
+    sys.exit(0 if main(args.paths, args.symbol, args.timezone, args.root) else 1)
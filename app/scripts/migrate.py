@@ -0,0 +1,189 @@
+"""
+Apply schema changes that db.create_all() can't make on existing tables.
+
+create_all only creates missing tables - it never adds indexes or columns to a
+table that already exists. Each step here is idempotent (a SQL statement, or a
+function for data backfills), so the script is safe to re-run after pulling
+new changes.
+
+Usage:
+    python -m app.scripts.migrate
+"""
+
+from app.main import app
+from app.db.models import db, DailyCube, TradeSketch
+from app.services.daily_pnl import backfill_trading_days
+from app.services.trade_cube import rebuild_cube
+from app.services.excursions import backfill_excursions
+from app.services.quantile_sketch import rebuild_sketches
+from app.services.economic_events import backfill_event_tags
+from app.services.order_graph import backfill_bracket_context
+
+
+def _populate_cube():
+    """Fill the analytics cube tables the first time they exist (they're maintained on write after that)."""
+    if DailyCube.query.first() is not None:
+        return 0
+    rebuild_cube()
+    return DailyCube.query.count()
+
+def _populate_sketches():
+    """Build the quantile sketches the first time the table exists (maintained on write after that)."""
+    if TradeSketch.query.first() is not None:
+        return 0
+    return rebuild_sketches()
+
+def _dedupe_order_ids():
+    """
+    Clear the (account, order_id) collisions older imports left behind, so the
+    unique index can be built: spreadsheet-mangled ids (3.72955E+11) are lossy
+    and become NULL (the raw value stays in raw_csv_data), and when the same
+    order was saved more than once - e.g. re-exported with a new status under a
+    new row id - one row is kept: the matched one if a trade was built from it
+    (trade ids hash the order rows they came from), else the newest. Removed
+    rows are copied to trade.orders_duplicates first.
+
+    Orders matched more than once can't be merged without rebuilding their
+    trades, so they abort the migration and are listed instead.
+    """
+    mangled = db.session.execute(db.text(
+        "UPDATE trade.orders SET order_id = NULL WHERE upper(order_id) LIKE '%E+%'"
+    )).rowcount
+    collisions = db.session.execute(db.text(
+        "SELECT account, order_id, string_agg(id || ' -> ' || matched_trade_id, ', ' ORDER BY id) "
+        'FROM trade.orders WHERE order_id IS NOT NULL AND is_matched '
+        'GROUP BY account, order_id HAVING count(*) > 1 ORDER BY account, order_id'
+    )).all()
+    if collisions:
+        listed = '; '.join(f"{account}/{order_id}: {rows}" for account, order_id, rows in collisions)
+        raise RuntimeError(f"orders matched to more than one trade, rebuild those trades first: {listed}")
+
+    db.session.execute(db.text(
+        'CREATE TABLE IF NOT EXISTS trade.orders_duplicates (LIKE trade.orders)'
+    ))
+    duplicates = db.session.execute(db.text(
+        'WITH removed AS ('
+        '  DELETE FROM trade.orders WHERE id IN ('
+        '    SELECT id FROM ('
+        '      SELECT id, row_number() OVER ('
+        '        PARTITION BY account, order_id'
+        '        ORDER BY is_matched IS TRUE DESC, csv_import_date DESC NULLS LAST,'
+        '                 fill_time DESC NULLS LAST, id DESC'
+        '      ) AS keep_rank'
+        '      FROM trade.orders WHERE order_id IS NOT NULL'
+        '    ) ranked WHERE keep_rank > 1'
+        '  ) RETURNING *'
+        ') '
+        'INSERT INTO trade.orders_duplicates SELECT * FROM removed'
+    )).rowcount
+    return mangled + duplicates
+
+MIGRATIONS = [
+    (
+        'trading_day column on trades',
+        'ALTER TABLE trade.trades ADD COLUMN IF NOT EXISTS trading_day DATE'
+    ),
+    (
+        'backfill trades.trading_day',
+        backfill_trading_days
+    ),
+    (
+        'index (acc_id, trading_day) on trades',
+        'CREATE INDEX IF NOT EXISTS ix_trades_acc_id_trading_day '
+        'ON trade.trades (acc_id, trading_day)'
+    ),
+    (
+        'index (trading_day) on trades',
+        'CREATE INDEX IF NOT EXISTS ix_trades_trading_day ON trade.trades (trading_day)'
+    ),
+    (
+        'populate daily_cube / daily_tag_cube',
+        _populate_cube
+    ),
+    (
+        'excursion columns on trades',
+        'ALTER TABLE trade.trades ADD COLUMN IF NOT EXISTS mae NUMERIC(10,2), '
+        'ADD COLUMN IF NOT EXISTS mfe NUMERIC(10,2), '
+        'ADD COLUMN IF NOT EXISTS entry_efficiency DOUBLE PRECISION, '
+        'ADD COLUMN IF NOT EXISTS exit_efficiency DOUBLE PRECISION'
+    ),
+    (
+        'backfill trade excursions from the bar store',
+        backfill_excursions
+    ),
+    (
+        'populate trade_sketches',
+        _populate_sketches
+    ),
+    (
+        'event_tags column on trades',
+        'ALTER TABLE trade.trades ADD COLUMN IF NOT EXISTS event_tags VARCHAR(50)[]'
+    ),
+    (
+        'GIN index (event_tags) on trades',
+        'CREATE INDEX IF NOT EXISTS ix_trades_event_tags ON trade.trades USING gin (event_tags)'
+    ),
+    (
+        'tag trades near economic events',
+        backfill_event_tags
+    ),
+    (
+        'stop/target columns on trades',
+        'ALTER TABLE trade.trades ADD COLUMN IF NOT EXISTS stop_price NUMERIC(10,2), '
+        'ADD COLUMN IF NOT EXISTS target_price NUMERIC(10,2)'
+    ),
+    (
+        'backfill trade stop/target from order_links',
+        backfill_bracket_context
+    ),
+    (
+        'unrounded order prices (coalesced VWAPs)',
+        'ALTER TABLE trade.orders ALTER COLUMN avg_price TYPE NUMERIC(14,6)'
+    ),
+    (
+        'unrounded child fill prices',
+        'ALTER TABLE trade.order_fills ALTER COLUMN price TYPE NUMERIC(14,6)'
+    ),
+    # after the additive steps, so a database whose orders can't be deduped
+    # still gets every column the models map
+    (
+        'clear mangled and duplicate order ids',
+        _dedupe_order_ids
+    ),
+    (
+        'unique (account, order_id) on orders',
+        'CREATE UNIQUE INDEX IF NOT EXISTS uq_orders_account_order_id '
+        'ON trade.orders (account, order_id)'
+    ),
+]
+
+
+def run_migrations():
+    print("Running migrations")
+
+    with app.app_context():
+        # new tables first, then changes to existing ones
+        db.create_all()
+
+        for name, statement in MIGRATIONS:
+            try:
+                if callable(statement):
+                    rows = statement()
+                    db.session.commit()
+                    print(f"   ✅ {name} ({rows} rows)")
+                    continue
+                db.session.execute(db.text(statement))
+                db.session.commit()
+                print(f"   ✅ {name}")
+            except Exception as e:
+                db.session.rollback()
+                print(f"   ❌ {name}: {str(e)}")
+                return False
+
+    print("\n✨ Done! Schema is up to date.")
+    return True
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(0 if run_migrations() else 1)
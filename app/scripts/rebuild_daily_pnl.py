@@ -0,0 +1,46 @@
+"""
+Rebuild the daily_pnl rollup (and the analytics cube and quantile sketches) from the trades table.
+
+Run after backfills, bulk deletes, or anything else that wrote trades without
+going through the matcher / trade API.
+
+Pass --recompute-trading-days after changing TRADING_DAY_CALENDAR to
+recompute trades.trading_day first.
+
+Usage:
+    python -m app.scripts.rebuild_daily_pnl [--recompute-trading-days]
+"""
+
+from app.main import app
+from app.db.models import db, Trade, DailyCube, TradeSketch
+from app.services.daily_pnl import rebuild_daily_pnl, backfill_trading_days
+
+
+def main(recompute_trading_days=False):
+    print("Rebuilding daily PnL rollup")
+
+    with app.app_context():
+        db.create_all()
+        try:
+            if recompute_trading_days:
+                print(f"   📅 Recomputed trading_day for {backfill_trading_days(recompute=True)} trades")
+            rows = rebuild_daily_pnl()
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error rebuilding daily PnL rollup: {str(e)}")
+            return False
+
+        print(f"\n📊 Summary:")
+        print(f"   📈 Trades: {Trade.query.count()}")
+        print(f"   ✅ Rollup rows (account, symbol, trading day): {rows}")
+        print(f"   🧊 Cube rows: {DailyCube.query.count()}")
+        print(f"   📐 Quantile sketches: {TradeSketch.query.count()}")
+
+    print("\n✨ Done!")
+    return True
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(0 if main(recompute_trading_days='--recompute-trading-days' in sys.argv) else 1)
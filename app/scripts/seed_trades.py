@@ -1,5 +1,6 @@
 from app.main import app
 from app.db.models import db, Trade
+from app.services.daily_pnl import refresh_daily_pnl_for_trades, rebuild_daily_pnl
 from datetime import datetime
 
 TEST_TRADES = [
@@ -75,6 +76,7 @@ def clear_database():
 
     try:
         Trade.query.delete()
+        rebuild_daily_pnl()  # empties the rollup and invalidates cached PnL responses
         db.session.commit()
         print("Database cleared")
         return True
@@ -114,6 +116,7 @@ def ingest_trades():
             )
 
             db.session.add(trade)
+            refresh_daily_pnl_for_trades([trade])
             db.session.commit()
             print(f"Inserted trade {trade_data['id']}: {trade_data['symbol']} {trade_data['direction']} {trade_data['pnl']} ")
             inserted_count += 1
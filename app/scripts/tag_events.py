@@ -0,0 +1,43 @@
+"""
+Re-tag trades with the economic events their windows overlap.
+
+New trades are tagged when they're matched; run this after editing the
+events file (ECONOMIC_EVENTS_FILE) or changing EVENT_WINDOW_MINUTES. See
+app/services/economic_events.py for the file format.
+
+Usage:
+    python -m app.scripts.tag_events
+"""
+
+from app.main import app
+from app.db.models import db, Trade
+from app.services.economic_events import backfill_event_tags, get_event_index, ECONOMIC_EVENTS_FILE
+
+
+def main():
+    print(f"Tagging trades with economic events from {ECONOMIC_EVENTS_FILE}")
+
+    with app.app_context():
+        index = get_event_index()
+        if not len(index):
+            print("   ⚠️  No events loaded - is the events file there?")
+        try:
+            updated = backfill_event_tags(index=index)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error tagging trades: {str(e)}")
+            return False
+
+        print(f"\n📊 Summary:")
+        print(f"   📅 Events: {len(index)}")
+        print(f"   ✅ Trades updated: {updated}")
+        print(f"   🏷️  Trades near an event: {Trade.query.filter(db.func.cardinality(Trade.event_tags) > 0).count()}")
+
+    print("\n✨ Done!")
+    return True
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,533 @@
+"""
+Vectorized trade analytics.
+
+Trades are loaded once into numpy arrays (exit time, trading day, pnl) ordered
+by exit time, and every metric is a whole-array pass - cumulative sums, running
+maxima, bincounts - instead of per-trade Python loops. Callers cache results
+per account and data version (see cached_account_response).
+"""
+from datetime import date
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.db.models import db, Trade, DailyPnl
+from app.services.session_calendar import product_root
+
+TRADING_DAYS_PER_YEAR = 252
+
+
+class TradeArrays:
+    """Column arrays of a trade set, in exit_time order."""
+
+    def __init__(self, ids, entry_times, exit_times, trading_days, pnl, acc_ids, symbols, quantities=None):
+        self.ids = ids
+        self.entry_times = entry_times        # datetime64[us], naive LA wall clock
+        self.exit_times = exit_times          # datetime64[us]
+        self.trading_days = trading_days      # datetime64[D]
+        self.pnl = pnl                        # float64
+        self.acc_ids = acc_ids
+        self.symbols = symbols
+        self.quantities = quantities if quantities is not None else np.ones(len(pnl), dtype=np.int64)
+
+    def __len__(self):
+        return len(self.pnl)
+
+
+def trade_filters(acc_id: str = None, symbol: str = None, start_day: date = None, end_day: date = None) -> list:
+    """Filters on trades by account, symbol and trading-day range (all optional)."""
+    filters = [Trade.trading_day.isnot(None)]
+    if acc_id:
+        filters.append(Trade.acc_id == acc_id)
+    if symbol:
+        filters.append(Trade.symbol == symbol)
+    if start_day:
+        filters.append(Trade.trading_day >= start_day)
+    if end_day:
+        filters.append(Trade.trading_day <= end_day)
+    return filters
+
+
+def load_trade_arrays(acc_id: str = None, symbol: str = None, start_day: date = None,
+                      end_day: date = None) -> TradeArrays:
+    """One narrow query (no JSON columns) straight into arrays."""
+    rows = db.session.query(
+        Trade.id, Trade.entry_time, Trade.exit_time, Trade.trading_day, Trade.pnl, Trade.acc_id, Trade.symbol,
+        Trade.quantity
+    ).filter(*trade_filters(acc_id, symbol, start_day, end_day)).order_by(Trade.exit_time, Trade.id).all()
+
+    ids, entry_times, exit_times, days, pnl, accounts, symbols, quantities = zip(*rows) if rows else ((),) * 8
+    return TradeArrays(
+        ids=list(ids),
+        entry_times=np.array(entry_times, dtype='datetime64[us]'),
+        exit_times=np.array(exit_times, dtype='datetime64[us]'),
+        trading_days=np.array(days, dtype='datetime64[D]'),
+        pnl=np.array([float(p) for p in pnl], dtype=np.float64),
+        acc_ids=np.array(accounts, dtype=object),
+        symbols=np.array(symbols, dtype=object),
+        quantities=np.array([q or 0 for q in quantities], dtype=np.int64),
+    )
+
+
+def daily_totals(trades: TradeArrays):
+    """(unique trading days, pnl per day, trades per day) via one bincount."""
+    days, inverse = np.unique(trades.trading_days, return_inverse=True)
+    return days, np.bincount(inverse, weights=trades.pnl), np.bincount(inverse)
+
+
+def drawdown_series(equity: np.ndarray):
+    """
+    Running peak and drawdown (<= 0) of an equity curve that starts from 0,
+    so losses before the first new high count as drawdown.
+    """
+    peak = np.maximum.accumulate(np.maximum(equity, 0.0))
+    return peak, equity - peak
+
+
+def _longest_underwater(drawdown: np.ndarray):
+    """(start, end) indices of the longest run with drawdown < 0, end exclusive; None if never underwater."""
+    underwater = np.concatenate(([0], (drawdown < 0).astype(np.int8), [0]))
+    edges = np.flatnonzero(np.diff(underwater))
+    if not len(edges):
+        return None
+    starts, ends = edges[::2], edges[1::2]
+    longest = np.argmax(ends - starts)
+    return int(starts[longest]), int(ends[longest])
+
+
+def _ratio(numerator: float, denominator: float) -> Optional[float]:
+    return float(numerator / denominator) if denominator else None
+
+
+def _round(value: Optional[float], digits: int = 2) -> Optional[float]:
+    return round(float(value), digits) if value is not None else None
+
+
+def performance(trades: TradeArrays, capital: float = None,
+                periods_per_year: int = TRADING_DAYS_PER_YEAR) -> Dict:
+    """
+    Summary metrics, plus the daily equity/drawdown series used to derive them.
+
+    Sharpe and Sortino are annualized from daily returns over trading days with
+    trades; returns are daily PnL / capital when capital is given, else daily
+    PnL in dollars (the ratios are the same for a fixed capital).
+    """
+    pnl = trades.pnl
+    n = len(pnl)
+    if not n:
+        return {'summary': {'trade_count': 0, 'total_pnl': 0.0}, 'days': np.array([], dtype='datetime64[D]'),
+                'daily_pnl': np.array([]), 'daily_equity': np.array([]), 'daily_drawdown': np.array([])}
+
+    wins, losses = pnl > 0, pnl < 0
+    gross_win = pnl[wins].sum()
+    gross_loss = pnl[losses].sum()
+    win_count, loss_count = int(wins.sum()), int(losses.sum())
+
+    equity = np.cumsum(pnl)
+    _, drawdown = drawdown_series(equity)
+    trough = int(np.argmin(drawdown))
+    trade_run = _longest_underwater(drawdown)
+
+    days, daily_pnl, _ = daily_totals(trades)
+    daily_equity = np.cumsum(daily_pnl)
+    _, daily_drawdown = drawdown_series(daily_equity)
+    day_run = _longest_underwater(daily_drawdown)
+
+    returns = daily_pnl / capital if capital else daily_pnl
+    std = returns.std(ddof=1) if len(returns) > 1 else 0.0
+    downside = np.sqrt(np.mean(np.minimum(returns, 0.0) ** 2))
+    annualize = np.sqrt(periods_per_year)
+
+    # the drawdown's peak is the last new high before the trough, recovery the first close back at it
+    max_drawdown = float(drawdown[trough])
+    at_peak = np.flatnonzero(drawdown[:trough + 1] == 0)
+    peak_index = int(at_peak[-1]) if len(at_peak) else None
+    recovered = np.flatnonzero(drawdown[trough:] == 0)
+    recovery_index = trough + int(recovered[0]) if len(recovered) else None
+
+    def day_of(index):
+        return str(trades.trading_days[index]) if index is not None else None
+
+    summary = {
+        'trade_count': n,
+        'total_pnl': round(float(equity[-1]), 2),
+        'winning_trades': win_count,
+        'losing_trades': loss_count,
+        'breakeven_trades': n - win_count - loss_count,
+        'win_rate': round(win_count / n * 100, 2),
+        'gross_win': round(float(gross_win), 2),
+        'gross_loss': round(float(gross_loss), 2),
+        'profit_factor': _round(_ratio(gross_win, -gross_loss)),
+        'avg_win': _round(_ratio(gross_win, win_count)),
+        'avg_loss': _round(_ratio(gross_loss, loss_count)),
+        'largest_win': round(float(pnl.max()), 2) if win_count else 0.0,
+        'largest_loss': round(float(pnl.min()), 2) if loss_count else 0.0,
+        'expectancy': round(float(equity[-1] / n), 2),
+        'max_drawdown': round(max_drawdown, 2),
+        'max_drawdown_peak': day_of(peak_index) if max_drawdown < 0 else None,
+        'max_drawdown_trough': day_of(trough) if max_drawdown < 0 else None,
+        'max_drawdown_recovery': day_of(recovery_index) if max_drawdown < 0 else None,
+        'max_drawdown_duration_trades': trade_run[1] - trade_run[0] if trade_run else 0,
+        'max_drawdown_duration_days': day_run[1] - day_run[0] if day_run else 0,
+        'trading_days': len(days),
+        'sharpe': _round(_ratio(returns.mean(), std) * annualize if std else None, 3),
+        'sortino': _round(_ratio(returns.mean(), downside) * annualize if downside else None, 3),
+    }
+    return {
+        'summary': summary,
+        'days': days,
+        'daily_pnl': daily_pnl,
+        'daily_equity': daily_equity,
+        'daily_drawdown': daily_drawdown,
+        'equity': equity,
+        'drawdown': drawdown,
+    }
+
+
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+# holding-time buckets: (label, upper bound in minutes, exclusive)
+DURATION_BUCKETS = [
+    ('<1m', 1), ('1-5m', 5), ('5-15m', 15), ('15-30m', 30),
+    ('30-60m', 60), ('1-4h', 240), ('4h+', np.inf),
+]
+
+
+def _bucket_stats(index: np.ndarray, pnl: np.ndarray, size: int):
+    """(pnl, trades, wins) per bucket index 0..size-1, one bincount each."""
+    return (np.bincount(index, weights=pnl, minlength=size),
+            np.bincount(index, minlength=size),
+            np.bincount(index, weights=(pnl > 0), minlength=size))
+
+
+def _bucket_row(pnl: float, count: int, wins: float) -> Dict:
+    return {
+        'pnl': round(float(pnl), 2),
+        'trade_count': int(count),
+        'winning_trades': int(wins),
+        'win_rate': round(wins / count * 100, 2) if count else 0.0,
+        'avg_pnl': round(float(pnl / count), 2) if count else 0.0,
+    }
+
+
+def heatmap(trades: TradeArrays) -> Dict:
+    """
+    PnL, count and win rate per (trading-day weekday, entry hour) cell and per
+    holding-duration bucket. Weekdays are Monday=0 of the trade's trading day;
+    hours are the entry time's hour in market (LA) time. Empty cells are omitted.
+    """
+    pnl = trades.pnl
+    # 1970-01-01 was a Thursday
+    weekday = (trades.trading_days.astype(np.int64) + 3) % 7
+    hour = (trades.entry_times - trades.entry_times.astype('datetime64[D]')).astype('timedelta64[h]').astype(np.int64)
+    cells = _bucket_stats(weekday * 24 + hour, pnl, 7 * 24)
+
+    minutes = (trades.exit_times - trades.entry_times) / np.timedelta64(1, 'm')
+    bounds = np.array([upper for _, upper in DURATION_BUCKETS])
+    durations = _bucket_stats(np.searchsorted(bounds, minutes, side='right'), pnl, len(bounds))
+
+    return {
+        'cells': [
+            {'weekday': cell // 24, 'day': WEEKDAYS[cell // 24], 'hour': cell % 24,
+             **_bucket_row(*(stat[cell] for stat in cells))}
+            for cell in np.flatnonzero(cells[1]).tolist()
+        ],
+        'durations': [
+            {'bucket': label, **_bucket_row(*(stat[i] for stat in durations))}
+            for i, (label, _) in enumerate(DURATION_BUCKETS)
+        ],
+    }
+
+
+MAX_STREAK = 4
+MAX_NTH_TRADE = 5
+REVENGE_MINUTES = 5.0
+
+
+def _streak_lengths(sign: np.ndarray) -> np.ndarray:
+    """Length of the run of equal nonzero signs ending at each trade (0 at breakeven trades)."""
+    index = np.arange(len(sign))
+    run_start = np.maximum.accumulate(np.where(np.diff(sign, prepend=0) != 0, index, 0))
+    return np.where(sign != 0, index - run_start + 1, 0)
+
+
+def _longest_streak(trades: TradeArrays, streak: np.ndarray, mask: np.ndarray) -> Dict:
+    if not mask.any():
+        return {'length': 0, 'pnl': 0.0, 'start_date': None, 'end_date': None}
+    end = int(np.argmax(np.where(mask, streak, 0)))
+    start = end - int(streak[end]) + 1
+    return {
+        'length': int(streak[end]),
+        'pnl': round(float(trades.pnl[start:end + 1].sum()), 2),
+        'start_date': str(trades.trading_days[start]),
+        'end_date': str(trades.trading_days[end]),
+    }
+
+
+def _after_streaks(prior: np.ndarray, pnl: np.ndarray, max_streak: int) -> list:
+    """Trades following at least N consecutive wins (or losses), N = 1..max_streak, from one bincount."""
+    stats = _bucket_stats(np.minimum(prior, max_streak), pnl, max_streak + 1)
+    # reversed cumulative sums turn exact prior streak lengths into "at least N"
+    at_least = [np.cumsum(stat[::-1])[::-1] for stat in stats]
+    return [{'streak': n, 'at_least': n == max_streak, **_bucket_row(*(stat[n] for stat in at_least))}
+            for n in range(1, max_streak + 1)]
+
+
+def sequence_stats(trades: TradeArrays, max_streak: int = MAX_STREAK, max_nth: int = MAX_NTH_TRADE,
+                   revenge_minutes: float = REVENGE_MINUTES) -> Dict:
+    """
+    Behavioural statistics of the trade sequence (exit_time order), all from
+    shifted comparisons and bincounts over the arrays:
+
+    - longest and current win / loss streaks (breakeven trades end a streak)
+    - PnL of the trade after N consecutive wins / losses, N = 1..max_streak
+      (the last bucket is max_streak or more)
+    - stats by position within the (account, trading day) - the nth trade of
+      the day, the last bucket being max_nth or later - and first vs later trades
+    - revenge trades: a trade following a loss on the same account and trading
+      day that is entered within revenge_minutes of the loss's exit, or with a
+      larger size than the losing trade
+
+    Streaks span trading days, as the sequence is continuous for the trader.
+    """
+    n = len(trades)
+    cents = np.rint(trades.pnl * 100).astype(np.int64)
+    sign = np.sign(cents)
+    streak = _streak_lengths(sign)
+    pnl = trades.pnl
+
+    # streak ending at the previous trade
+    prior, prior_sign = np.zeros_like(streak), np.zeros_like(sign)
+    prior[1:], prior_sign[1:] = streak[:-1], sign[:-1]
+
+    # position within each (account, trading day), keeping exit order inside a group
+    _, account = np.unique(trades.acc_ids.astype(str), return_inverse=True)
+    _, group = np.unique(account.reshape(-1) * 1_000_000 + trades.trading_days.astype(np.int64), return_inverse=True)
+    group = group.reshape(-1)
+    order = np.argsort(group, kind='stable')
+    sorted_group = group[order]
+    group_start = np.maximum.accumulate(np.where(np.diff(sorted_group, prepend=-1) != 0, np.arange(n), 0))
+    nth = np.empty(n, dtype=np.int64)
+    nth[order] = np.arange(n) - group_start
+
+    previous = np.full(n, -1)
+    previous[order[1:]] = np.where(sorted_group[1:] == sorted_group[:-1], order[:-1], -1)
+    has_previous = previous >= 0
+    after_loss = has_previous & (sign[previous] < 0)
+    after_win = has_previous & (sign[previous] > 0)
+    gap = (trades.entry_times - trades.exit_times[previous]) / np.timedelta64(1, 'm')
+    quick = after_loss & (gap <= revenge_minutes)
+    sized_up = after_loss & (trades.quantities > trades.quantities[previous])
+    revenge = quick | sized_up
+
+    positions = _bucket_stats(np.minimum(nth, max_nth - 1), pnl, max_nth)
+    first = nth == 0
+
+    def row(mask):
+        return _bucket_row(pnl[mask].sum(), int(mask.sum()), (pnl[mask] > 0).sum())
+
+    def median_gap(mask):
+        return round(float(np.median(np.maximum(gap[mask], 0))), 2) if mask.any() else None
+
+    last = n - 1
+    return {
+        'streaks': {
+            'longest_win': _longest_streak(trades, streak, sign > 0),
+            'longest_loss': _longest_streak(trades, streak, sign < 0),
+            'current': {'type': ('win' if sign[last] > 0 else 'loss' if sign[last] < 0 else None) if n else None,
+                        'length': int(streak[last]) if n else 0},
+            'after_wins': _after_streaks(np.where(prior_sign > 0, prior, 0), pnl, max_streak),
+            'after_losses': _after_streaks(np.where(prior_sign < 0, prior, 0), pnl, max_streak),
+        },
+        'nth_trade_of_day': [
+            {'nth': k + 1, 'or_later': k == max_nth - 1, **_bucket_row(*(stat[k] for stat in positions))}
+            for k in range(max_nth)
+        ],
+        'first_trade_of_day': row(first),
+        'later_trades_of_day': row(~first),
+        'revenge': {
+            'window_minutes': revenge_minutes,
+            'trades': row(revenge),
+            'quick_reentries': int(quick.sum()),
+            'sized_up': int(sized_up.sum()),
+            'other_after_loss': row(after_loss & ~revenge),
+            'after_win': row(after_win),
+            'median_gap_after_loss_minutes': median_gap(after_loss),
+            'median_gap_after_win_minutes': median_gap(after_win),
+        },
+    }
+
+
+CORRELATION_GROUPS = ['root', 'account', 'symbol']
+
+
+def daily_pnl_matrix(by: str, acc_ids: List[str] = None, start_day: date = None, end_day: date = None,
+                     min_days: int = 1):
+    """
+    (labels, days, matrix) from the daily_pnl rollup: matrix[d, g] is group
+    g's PnL on trading day d, with days any selected group traded and 0 where
+    a group didn't trade that day. Groups are root symbols, accounts or
+    contracts; groups active on fewer than min_days days are left out, along
+    with the days only they traded.
+
+    Postgres returns one row per account (or contract) with its "day pnl"
+    pairs as space-separated text, which numpy parses in C - hundreds of
+    thousands of rollup rows never become Python objects.
+    """
+    if by not in CORRELATION_GROUPS:
+        raise ValueError(f"by must be one of: {', '.join(CORRELATION_GROUPS)}")
+    key = DailyPnl.acc_id if by == 'account' else DailyPnl.symbol
+    day_number = db.cast(DailyPnl.trading_day - db.cast(db.literal('1970-01-01'), db.Date), db.Integer)
+    # one aggregate of pairs: a day can't end up next to another day's PnL
+    query = db.session.query(
+        key, db.func.count(),
+        db.func.string_agg(db.cast(day_number, db.Text) + ' ' + db.cast(DailyPnl.pnl, db.Text), ' ')
+    )
+    if acc_ids:
+        query = query.filter(DailyPnl.acc_id.in_(acc_ids))
+    if start_day:
+        query = query.filter(DailyPnl.trading_day >= start_day)
+    if end_day:
+        query = query.filter(DailyPnl.trading_day <= end_day)
+    rows = query.group_by(key).all()
+    if not rows:
+        return [], np.array([], dtype='datetime64[D]'), np.zeros((0, 0))
+
+    keys, counts, pair_text = zip(*rows)
+    pairs = np.fromstring(' '.join(pair_text), dtype=np.float64, sep=' ').reshape(-1, 2)
+    days, pnl = pairs[:, 0].astype(np.int64), pairs[:, 1]
+    if by == 'root':
+        keys = [product_root(symbol) for symbol in keys]
+    labels, group_of_key = np.unique(np.array(keys, dtype=str), return_inverse=True)
+    group = np.repeat(group_of_key.reshape(-1), counts)
+    day_values, day = np.unique(days, return_inverse=True)
+    # one bincount over flattened (day, group) cells; contracts of one root add up
+    matrix = np.bincount(day.reshape(-1) * len(labels) + group, weights=pnl,
+                         minlength=len(day_values) * len(labels)).reshape(len(day_values), len(labels))
+    active = matrix != 0
+    keep = active.sum(axis=0) >= min_days
+    traded = active[:, keep].any(axis=1)
+    return labels[keep].tolist(), day_values[traded].astype('datetime64[D]'), matrix[np.ix_(traded, keep)]
+
+
+def correlation_matrix(matrix: np.ndarray) -> np.ndarray:
+    """
+    Pearson correlation between the columns of a (days, groups) matrix, from
+    one matrix product of the centred columns. Groups with zero variance get
+    NaN rows/columns.
+    """
+    if not len(matrix):
+        return np.full((matrix.shape[1], matrix.shape[1]), np.nan)
+    centred = matrix - matrix.mean(axis=0)
+    covariance = centred.T @ centred
+    scale = np.sqrt(np.diag(covariance))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        correlation = covariance / np.outer(scale, scale)
+    np.fill_diagonal(correlation, np.where(scale > 0, 1.0, np.nan))
+    return np.clip(correlation, -1.0, 1.0)
+
+
+def _window_sums(values: np.ndarray, window: int) -> np.ndarray:
+    """Sum of each trailing window of length window (len(values) - window + 1 sums) from one cumsum."""
+    totals = np.concatenate(([0], np.cumsum(values)))
+    return totals[window:] - totals[:-window]
+
+
+def rolling_stats(pnl: np.ndarray, window: int) -> Dict[str, np.ndarray]:
+    """
+    Win rate, average win/loss, expectancy and profit factor over every
+    trailing window of trades, O(n) via differences of cumulative sums.
+
+    Sums run on integer cents so they stay exact over long histories. Element
+    k covers trades k .. k + window - 1; ratios with an empty denominator
+    (no wins, no losses) are NaN.
+    """
+    if window < 1 or len(pnl) < window:
+        empty = np.array([], dtype=np.float64)
+        return {'win_rate': empty, 'avg_win': empty, 'avg_loss': empty, 'expectancy': empty, 'profit_factor': empty}
+
+    cents = np.rint(pnl * 100).astype(np.int64)
+    wins = _window_sums(cents > 0, window)
+    losses = _window_sums(cents < 0, window)
+    win_cents = _window_sums(np.where(cents > 0, cents, 0), window)
+    loss_cents = _window_sums(np.where(cents < 0, cents, 0), window)
+    total_cents = _window_sums(cents, window)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return {
+            'win_rate': wins / window * 100,
+            'avg_win': np.where(wins > 0, win_cents / 100 / wins, np.nan),
+            'avg_loss': np.where(losses > 0, loss_cents / 100 / losses, np.nan),
+            'expectancy': total_cents / 100 / window,
+            'profit_factor': np.where(loss_cents < 0, win_cents / -loss_cents, np.nan),
+        }
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: indices of n_out points that keep the
+    visual shape of (x, y). The first and last points are always kept; each
+    bucket in between keeps the point forming the largest triangle with the
+    point kept from the previous bucket and the mean of the next bucket.
+
+    The buckets are chained (each pick depends on the previous one), so this
+    loops over buckets with vectorized area computations inside each.
+    """
+    n = len(y)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1], dtype=np.int64)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)  # n_out - 2 buckets over points 1..n-2
+    picked = np.empty(n_out, dtype=np.int64)
+    picked[0], picked[-1] = 0, n - 1
+    anchor = 0
+    for b in range(n_out - 2):
+        start, end = edges[b], edges[b + 1]
+        next_end = edges[b + 2] if b + 2 < len(edges) else n
+        next_x, next_y = x[end:next_end].mean(), y[end:next_end].mean()
+        area = np.abs((x[anchor] - next_x) * (y[start:end] - y[anchor])
+                      - (x[anchor] - x[start:end]) * (next_y - y[anchor]))
+        anchor = start + int(np.argmax(area))
+        picked[b + 1] = anchor
+    return picked
+
+
+def drawdown_anchor_indices(drawdown: np.ndarray) -> list:
+    """Peak, trough and recovery indices of the max drawdown (those that exist)."""
+    if not len(drawdown) or drawdown.min() >= 0:
+        return []
+    trough = int(np.argmin(drawdown))
+    anchors = [trough]
+    at_peak = np.flatnonzero(drawdown[:trough] == 0)
+    if len(at_peak):
+        anchors.append(int(at_peak[-1]))
+    recovered = np.flatnonzero(drawdown[trough:] == 0)
+    if len(recovered):
+        anchors.append(trough + int(recovered[0]))
+    return anchors
+
+
+def downsample_indices(series, max_points: int, x: np.ndarray = None, keep=()) -> np.ndarray:
+    """
+    Sorted indices of at most about max_points points for charting one or more
+    aligned series: the union of an LTTB pick per series (max_points split
+    between them), each series' global min and max, and any `keep` indices
+    (e.g. drawdown_anchor_indices), so extremes are never dropped.
+
+    Args:
+        series: list of equal-length arrays
+        max_points: target size; 0 (or a series no longer than it) keeps everything
+        x: x positions (default 0..n-1), e.g. day ordinals so gaps count
+    """
+    n = len(series[0]) if len(series) else 0
+    if max_points <= 0 or n <= max_points:
+        return np.arange(n)
+    x = np.arange(n) if x is None else x
+    budget = max(3, max_points // len(series))
+    picked = [lttb_indices(x, values, budget) for values in series]
+    extremes = [[int(np.argmin(values)), int(np.argmax(values))] for values in series]
+    return np.unique(np.concatenate(picked + extremes + [np.asarray(list(keep), dtype=np.int64)]).astype(np.int64))
@@ -0,0 +1,242 @@
+"""
+Local 1-minute OHLCV bar store.
+
+Each contract is a directory of append-only column files under BAR_STORE_DIR:
+
+    <BAR_STORE_DIR>/MNQH6/time.i8      bar open, seconds since epoch, naive LA wall clock
+                         /open.f8 high.f8 low.f8 close.f8
+                         /volume.i8
+
+Every file is a raw little-endian array with one element per bar, sorted by
+time, so a column is read with np.memmap and no parsing. The time column is
+the index: a time window is two searchsorted calls on it, and the returned
+columns are slices of the memory maps - no copy, no database round trip.
+Bar times use the same naive LA wall clock as trades.entry_time/exit_time.
+
+Appends only add bars after the last stored one (re-importing an overlapping
+file is a no-op for the overlap). There is a single writer per process; the
+time column is written last, so a reader never sees a bar whose prices aren't
+on disk yet.
+
+Usage:
+    store = get_bar_store()
+    store.import_csv('MNQH6', 'MNQH6_1m.csv', timezone='UTC')
+    bars = store.trading_day('MNQH6', date(2026, 3, 2))
+    bars.close[-1], bars.times[0]
+"""
+import csv
+import os
+import threading
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Dict, NamedTuple, Optional
+
+import numpy as np
+import pytz
+
+from app.services.session_calendar import STORAGE_TIMEZONE, calendar_for_symbol
+
+BAR_STORE_DIR = os.environ.get(
+    'BAR_STORE_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'data', 'bars')
+)
+
+# column -> (file name, dtype)
+COLUMNS = {
+    'time': ('time.i8', np.dtype('<i8')),
+    'open': ('open.f8', np.dtype('<f8')),
+    'high': ('high.f8', np.dtype('<f8')),
+    'low': ('low.f8', np.dtype('<f8')),
+    'close': ('close.f8', np.dtype('<f8')),
+    'volume': ('volume.i8', np.dtype('<i8')),
+}
+# prices first, time last (see module docstring)
+_WRITE_ORDER = ['open', 'high', 'low', 'close', 'volume', 'time']
+
+
+class Bars(NamedTuple):
+    """Column views of a run of bars (slices of the memory maps, or empty arrays)."""
+    time: np.ndarray      # int64 seconds, naive LA wall clock
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    @property
+    def times(self) -> np.ndarray:
+        """Bar open times as datetime64[s]."""
+        return self.time.view('datetime64[s]')
+
+    def to_dict(self) -> Dict:
+        return {
+            'time': [str(t) for t in self.times],
+            **{name: getattr(self, name).tolist() for name in ('open', 'high', 'low', 'close', 'volume')}
+        }
+
+
+_EMPTY = Bars(*(np.empty(0, dtype=dtype) for _, dtype in COLUMNS.values()))
+
+
+def to_storage_time(times: np.ndarray, timezone: str) -> np.ndarray:
+    """
+    Convert naive datetime64 wall-clock times in timezone to naive storage
+    (LA) time. UTC offsets only change on whole hours, so they're looked up
+    once per distinct hour rather than per bar. Ambiguous fall-back hours are
+    read as standard time.
+    """
+    times = np.asarray(times, dtype='datetime64[s]')
+    if timezone == STORAGE_TIMEZONE or not len(times):
+        return times
+    source, target = pytz.timezone(timezone), pytz.timezone(STORAGE_TIMEZONE)
+    hours, inverse = np.unique(times.astype('datetime64[h]'), return_inverse=True)
+    shifts = []
+    for hour in hours.tolist():
+        local = source.localize(hour, is_dst=False)
+        shifts.append(int((local.astimezone(target).replace(tzinfo=None) - hour).total_seconds()))
+    return times + np.array(shifts, dtype='timedelta64[s]')[inverse]
+
+
+def _parse_times(values) -> np.ndarray:
+    """ISO timestamps ('2026-03-02 06:30:00', trailing Z ignored) or epoch seconds -> datetime64[s]."""
+    values = [value.strip().rstrip('Z') for value in values]
+    if values and values[0].lstrip('-').isdigit():
+        return np.array(values, dtype=np.int64).astype('datetime64[s]')
+    return np.array(values, dtype='datetime64[s]')
+
+
+class BarStore:
+    """Memory-mapped bar files under root (see module docstring)."""
+
+    def __init__(self, root: str = BAR_STORE_DIR):
+        self.root = root
+        self._maps = {}   # symbol -> (bar count, Bars of full-length memmaps)
+        self._lock = threading.Lock()
+
+    def _path(self, symbol: str, column: str) -> str:
+        return os.path.join(self.root, symbol.upper(), COLUMNS[column][0])
+
+    def symbols(self) -> list:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root) if os.path.exists(os.path.join(self.root, name, 'time.i8')))
+
+    def _length(self, symbol: str) -> int:
+        """Bars fully on disk: the time column is appended last."""
+        try:
+            return os.stat(self._path(symbol, 'time')).st_size // COLUMNS['time'][1].itemsize
+        except FileNotFoundError:
+            return 0
+
+    def bars(self, symbol: str) -> Bars:
+        """Every stored bar of a contract, as memory-mapped columns (remapped when the files grow)."""
+        symbol = symbol.upper()
+        length = self._length(symbol)
+        cached = self._maps.get(symbol)
+        if cached is not None and cached[0] == length:
+            return cached[1]
+        if not length:
+            return _EMPTY
+        # plain ndarray views of the maps: slicing them skips np.memmap's per-slice overhead
+        bars = Bars(*(
+            np.asarray(np.memmap(self._path(symbol, column), dtype=dtype, mode='r', shape=(length,)))
+            for column, (_, dtype) in COLUMNS.items()
+        ))
+        self._maps[symbol] = (length, bars)
+        return bars
+
+    def window(self, symbol: str, start: datetime = None, end: datetime = None) -> Bars:
+        """Bars opening in [start, end) (naive LA time; None = unbounded), as zero-copy slices."""
+        bars = self.bars(symbol)
+        lo = np.searchsorted(bars.time, _seconds(start), side='left') if start else 0
+        hi = np.searchsorted(bars.time, _seconds(end), side='left') if end else len(bars.time)
+        return Bars(*(column[lo:hi] for column in bars))
+
+    def trading_day(self, symbol: str, day: date) -> Bars:
+        """Bars of one trading day's session on the contract's exchange calendar."""
+        start, end = calendar_for_symbol(symbol).bounds(day, day)
+        # bars are stamped with their open: the bar opening at the roll starts the next day
+        return self.window(symbol, start, end)
+
+    def last_time(self, symbol: str) -> Optional[datetime]:
+        bars = self.bars(symbol)
+        return bars.times[-1].item() if len(bars.time) else None
+
+    def append(self, symbol: str, times, open_, high, low, close, volume) -> int:
+        """
+        Append bars (times as naive LA datetime64/datetimes, ascending). Bars at
+        or before the last stored bar are skipped.
+
+        Returns:
+            number of bars appended
+        """
+        symbol = symbol.upper()
+        columns = {
+            'time': np.asarray(times, dtype='datetime64[s]').astype(np.int64),
+            'open': np.asarray(open_), 'high': np.asarray(high), 'low': np.asarray(low),
+            'close': np.asarray(close), 'volume': np.asarray(volume),
+        }
+        if len({len(values) for values in columns.values()}) != 1:
+            raise ValueError("All bar columns must have the same length")
+        if len(columns['time']) > 1 and (np.diff(columns['time']) <= 0).any():
+            raise ValueError("Bar times must be strictly increasing")
+
+        with self._lock:
+            os.makedirs(os.path.join(self.root, symbol), exist_ok=True)
+            stored = self.bars(symbol)
+            new = columns['time'] > stored.time[-1] if len(stored.time) else slice(None)
+            count = len(columns['time'][new])
+            if not count:
+                return 0
+            length = len(stored.time)
+            for column in _WRITE_ORDER:
+                with open(self._path(symbol, column), 'ab') as f:
+                    # drop the tail of an append that died before its time column was written
+                    f.truncate(length * COLUMNS[column][1].itemsize)
+                    f.write(columns[column][new].astype(COLUMNS[column][1]).tobytes())
+            return count
+
+    def import_csv(self, symbol: str, path: str, timezone: str = 'UTC') -> int:
+        """
+        Append a 1-minute OHLCV CSV file with a header row: a time column
+        ('time', 'timestamp', 'datetime' or 'ts_event') holding ISO timestamps
+        or epoch seconds in `timezone`, and open, high, low, close, volume.
+
+        Returns:
+            number of bars appended
+        """
+        with open(path, newline='') as f:
+            rows = list(csv.DictReader(f))
+        if not rows:
+            return 0
+        fields = {name.lower().strip(): name for name in rows[0]}
+        time_field = next((fields[name] for name in ('time', 'timestamp', 'datetime', 'ts_event') if name in fields), None)
+        missing = [name for name in ('open', 'high', 'low', 'close', 'volume') if name not in fields]
+        if time_field is None or missing:
+            raise ValueError(f"{path}: need a time column and open/high/low/close/volume")
+
+        times = to_storage_time(_parse_times(row[time_field] for row in rows), timezone)
+        order = np.argsort(times, kind='stable')
+        times = times[order]
+        # keep the last bar of any duplicated minute
+        keep = np.append(times[1:] != times[:-1], True)
+
+        def column(name, dtype):
+            return np.array([row[fields[name]] for row in rows], dtype=np.float64)[order][keep].astype(dtype)
+
+        return self.append(symbol, times[keep], column('open', np.float64), column('high', np.float64),
+                           column('low', np.float64), column('close', np.float64), column('volume', np.int64))
+
+
+_EPOCH = datetime(1970, 1, 1)
+_SECOND = timedelta(seconds=1)
+
+
+def _seconds(ts: datetime) -> int:
+    return (ts - _EPOCH) // _SECOND
+
+
+@lru_cache(maxsize=None)
+def get_bar_store(root: str = None) -> BarStore:
+    """Shared store per directory, so memory maps are reused across requests."""
+    return BarStore(root or BAR_STORE_DIR)
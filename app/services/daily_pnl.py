@@ -0,0 +1,194 @@
+"""
+daily_pnl rollup maintenance.
+
+Past trading days never change unless a trade is inserted or its PnL is
+edited, so daily and calendar endpoints read pre-aggregated rows instead of
+re-summing the trades table. Every code path that writes trades calls
+refresh_daily_pnl_for_trades() before committing, which recomputes just the
+affected (account, symbol, trading day) rows in the same transaction.
+Trading days come from the persisted trades.trading_day column.
+
+The group-by analytics cube (app/services/trade_cube.py) is refreshed for the
+same keys alongside the rollup, and the quantile sketches
+(app/services/quantile_sketch.py) for their months.
+
+Each refresh also bumps the pnl_versions counter of the (account, trading
+month) it touched, which is what invalidates cached PnL responses
+(app/services/pnl_cache.py). Writes that change served trade fields without
+touching the rollup (notes, backfilled excursions/event tags/brackets) call
+bump_trade_months() instead.
+"""
+from datetime import date, datetime
+from typing import Iterable, Set, Tuple
+
+from sqlalchemy.dialects.postgresql import insert
+
+from app.db.models import db, Trade, DailyPnl, PnlVersion
+from app.services.session_calendar import trading_day_calendar
+from app.services.trade_cube import refresh_cube, rebuild_cube
+from app.services.quantile_sketch import refresh_sketches, rebuild_sketches
+
+RollupKey = Tuple[str, str, date]
+
+
+def trading_day_of(dt: datetime) -> date:
+    """Trading day of a naive LA wall-clock datetime, as stored in trades.trading_day."""
+    return trading_day_calendar().trading_day(dt)
+
+
+def backfill_trading_days(recompute: bool = False, batch_size: int = 10000) -> int:
+    """
+    Fill trades.trading_day from exit_time (rows written before the column
+    existed), bucketing each batch with one vectorized calendar lookup.
+    Does not commit.
+
+    Args:
+        recompute: recompute every row, e.g. after changing TRADING_DAY_CALENDAR
+
+    Returns:
+        number of trades updated
+    """
+    query = db.session.query(Trade.id, Trade.exit_time).filter(Trade.exit_time.isnot(None))
+    if not recompute:
+        query = query.filter(Trade.trading_day.is_(None))
+    rows = query.order_by(Trade.id).all()
+
+    calendar = trading_day_calendar()
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        days = calendar.trading_days([row.exit_time for row in batch]).tolist()
+        # ORM bulk UPDATE by primary key (executemany)
+        db.session.execute(
+            db.update(Trade),
+            [{'id': row.id, 'trading_day': day} for row, day in zip(batch, days)]
+        )
+    return len(rows)
+
+
+def _aggregate_select():
+    """(acc_id, symbol, trading_day, pnl, trade_count, wins, losses, gross_win, gross_loss) from trades."""
+    return db.select(
+        Trade.acc_id,
+        Trade.symbol,
+        Trade.trading_day,
+        db.func.sum(Trade.pnl),
+        db.func.count(Trade.id),
+        db.func.sum(db.case((Trade.pnl > 0, 1), else_=0)),
+        db.func.sum(db.case((Trade.pnl < 0, 1), else_=0)),
+        db.func.sum(db.case((Trade.pnl > 0, Trade.pnl), else_=0)),
+        db.func.sum(db.case((Trade.pnl < 0, Trade.pnl), else_=0))
+    ).where(Trade.trading_day.isnot(None)).group_by(Trade.acc_id, Trade.symbol, Trade.trading_day)
+
+
+_ROLLUP_COLUMNS = ['acc_id', 'symbol', 'trading_day', 'pnl', 'trade_count', 'wins', 'losses', 'gross_win', 'gross_loss']
+
+
+def _upsert_from(select):
+    stmt = insert(DailyPnl).from_select(_ROLLUP_COLUMNS, select)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['acc_id', 'symbol', 'trading_day'],
+        set_={col: stmt.excluded[col] for col in _ROLLUP_COLUMNS[3:]}
+    )
+    db.session.execute(stmt)
+
+
+def month_of(day: date) -> date:
+    """First day of the (trading-day) month, the grain of pnl_versions."""
+    return day.replace(day=1)
+
+
+def bump_pnl_versions(months: Iterable[Tuple[str, date]]) -> None:
+    """Increment the version of each (acc_id, month), creating missing rows. Does not commit."""
+    rows = [{'acc_id': acc_id, 'month': month, 'version': 1} for acc_id, month in set(months)]
+    if not rows:
+        return
+    stmt = insert(PnlVersion).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['acc_id', 'month'],
+        set_={'version': PnlVersion.version + 1, 'updated_at': datetime.utcnow()}
+    )
+    db.session.execute(stmt)
+
+
+def bump_trade_months(trades: Iterable) -> None:
+    """
+    Bump the pnl_versions of the months the given trades (or rows with acc_id
+    and trading_day) fall in, for edits that don't change the rollup but do
+    change served trade fields. Does not commit.
+    """
+    bump_pnl_versions(
+        (trade.acc_id, month_of(trade.trading_day)) for trade in trades if trade.trading_day is not None
+    )
+
+
+def refresh_daily_pnl(keys: Iterable[RollupKey]) -> int:
+    """
+    Recompute the given (acc_id, symbol, trading_day) rollup rows from trades.
+
+    Runs in the caller's transaction (flushes pending trades first, does not
+    commit). Keys whose trades are gone are deleted.
+
+    Returns:
+        number of keys refreshed
+    """
+    keys: Set[RollupKey] = set(keys)
+    if not keys:
+        return 0
+
+    db.session.flush()
+
+    DailyPnl.query.filter(
+        db.tuple_(DailyPnl.acc_id, DailyPnl.symbol, DailyPnl.trading_day).in_(keys)
+    ).delete(synchronize_session=False)
+
+    _upsert_from(_aggregate_select().where(db.tuple_(Trade.acc_id, Trade.symbol, Trade.trading_day).in_(keys)))
+    refresh_cube(keys)
+    refresh_sketches(keys)
+    bump_pnl_versions((acc_id, month_of(trading_day)) for acc_id, _, trading_day in keys)
+    return len(keys)
+
+
+def _rollup_keys(trade: Trade) -> Set[RollupKey]:
+    """The rollup key a trade falls into, plus the one it had before unflushed edits moved it."""
+    current = (trade.acc_id, trade.symbol, trade.trading_day)
+    attrs = db.inspect(trade).attrs
+    previous = tuple(
+        attrs[name].history.deleted[0] if attrs[name].history.deleted else value
+        for name, value in zip(('acc_id', 'symbol', 'trading_day'), current)
+    )
+    return {key for key in (current, previous) if key[2] is not None}
+
+
+def refresh_daily_pnl_for_trades(trades: Iterable[Trade]) -> int:
+    """
+    Refresh the rollup rows the given (new or edited) trades fall into, and
+    the rows of the day/account/symbol an edit moved them out of - call it
+    before the edits are flushed.
+    """
+    keys: Set[RollupKey] = set()
+    for trade in trades:
+        keys |= _rollup_keys(trade)
+    return refresh_daily_pnl(keys)
+
+
+def rebuild_daily_pnl() -> int:
+    """
+    Recompute the whole rollup from trades (backfills, or after bulk deletes).
+    Does not commit.
+
+    Returns:
+        number of rollup rows written
+    """
+    DailyPnl.query.delete(synchronize_session=False)
+    _upsert_from(_aggregate_select())
+    rebuild_cube()
+    rebuild_sketches()
+
+    # anything may have changed: invalidate every month we've served or now hold
+    months = set(db.session.query(PnlVersion.acc_id, PnlVersion.month).all())
+    months.update(
+        (acc_id, month_of(trading_day))
+        for acc_id, trading_day in db.session.query(DailyPnl.acc_id, DailyPnl.trading_day).distinct()
+    )
+    bump_pnl_versions(months)
+    return DailyPnl.query.count()
@@ -0,0 +1,228 @@
+"""
+Economic-calendar events and tagging trades that overlap them.
+
+Events come from a local file (ECONOMIC_EVENTS_FILE, CSV or JSON) with one
+event per row:
+
+    date,time,event,impact,tag,timezone
+    2026-02-06,08:30,Non-Farm Payrolls,high,NFP,America/New_York
+    2026-01-28,14:00,FOMC Statement,high,FOMC,
+
+time defaults to 00:00, tag to the event name and timezone to
+America/New_York (release times are published in ET). JSON files hold a list
+of objects with the same keys.
+
+The loaded calendar is an EventIndex: event times converted to the trades'
+naive LA wall clock and sorted. Every event gets the same window of
+EVENT_WINDOW_MINUTES on each side, so a trade's [entry, exit] overlaps an
+event's window exactly when the event time lies in
+[entry - window, exit + window] - two binary searches per trade, whatever
+the number of events. Matching tags are stored in trades.event_tags (GIN
+indexed) when trades are matched; backfill_event_tags() re-tags existing
+trades after the calendar file changes.
+"""
+import csv
+import json
+import os
+from functools import lru_cache
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+from app.db.models import db, Trade
+from app.services.analytics import TradeArrays, _bucket_row
+from app.services.bar_store import to_storage_time
+from app.services.daily_pnl import bump_trade_months
+
+ECONOMIC_EVENTS_FILE = os.environ.get(
+    'ECONOMIC_EVENTS_FILE',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                 'data', 'economic_events.csv')
+)
+EVENT_WINDOW_MINUTES = float(os.environ.get('EVENT_WINDOW_MINUTES', 5))
+DEFAULT_EVENT_TIMEZONE = 'America/New_York'
+MAX_TAG_LENGTH = 50
+
+
+class EventIndex:
+    """Events sorted by time (naive LA wall clock), with a +/- window for overlap queries."""
+
+    def __init__(self, times, names, tags, impacts, window_minutes: float = EVENT_WINDOW_MINUTES):
+        times = np.asarray(times, dtype='datetime64[s]')
+        order = np.argsort(times, kind='stable')
+        self.times = times[order].astype(np.int64)
+        self.names = np.asarray(names, dtype=object)[order]
+        self.tags = np.asarray(tags, dtype=object)[order]
+        self.impacts = np.asarray(impacts, dtype=object)[order]
+        self.window = int(window_minutes * 60)
+        self.version = None   # (path, mtime) of the file it was loaded from
+
+    def __len__(self):
+        return len(self.times)
+
+    def overlapping(self, entry_times, exit_times):
+        """
+        (lo, hi) per trade: events lo..hi-1 have windows overlapping the
+        trade's [entry, exit]. Times as datetime64 / datetimes.
+        """
+        entry = np.asarray(entry_times, dtype='datetime64[s]').astype(np.int64)
+        exit = np.asarray(exit_times, dtype='datetime64[s]').astype(np.int64)
+        lo = np.searchsorted(self.times, entry - self.window, side='left')
+        hi = np.searchsorted(self.times, exit + self.window, side='right')
+        return lo, hi
+
+    def tags_for(self, entry_times, exit_times) -> List[List[str]]:
+        """Sorted distinct event tags overlapping each trade ([] for none)."""
+        lo, hi = self.overlapping(entry_times, exit_times)
+        return [sorted(set(self.tags[a:b])) if b > a else [] for a, b in zip(lo.tolist(), hi.tolist())]
+
+
+def _read_rows(path: str) -> List[Dict]:
+    if path.lower().endswith('.json'):
+        with open(path) as f:
+            return json.load(f)
+    with open(path, newline='') as f:
+        return [{(k or '').strip().lower(): (v or '').strip() for k, v in row.items()} for row in csv.DictReader(f)]
+
+
+def _parse_time(value: str) -> str:
+    """'08:30', '8:30 AM', '2:00 PM' -> 'HH:MM:SS'."""
+    value = (value or '').strip().upper()
+    if not value:
+        return '00:00:00'
+    meridiem = value[-2:] if value.endswith(('AM', 'PM')) else None
+    parts = [int(p) for p in value.rstrip('APM ').split(':')]
+    hour, minute, second = (parts + [0, 0])[:3]
+    if meridiem:
+        hour = hour % 12 + (12 if meridiem == 'PM' else 0)
+    return f'{hour:02d}:{minute:02d}:{second:02d}'
+
+
+def load_event_index(path: str = ECONOMIC_EVENTS_FILE, window_minutes: float = EVENT_WINDOW_MINUTES) -> EventIndex:
+    """Read a calendar file (see module docstring) into an EventIndex; empty when the file doesn't exist."""
+    if not os.path.exists(path):
+        return EventIndex([], [], [], [], window_minutes)
+
+    rows = [row for row in _read_rows(path) if row.get('date') and row.get('event')]
+    times = np.array([f"{row['date']}T{_parse_time(row.get('time'))}" for row in rows], dtype='datetime64[s]')
+    zones = np.array([row.get('timezone') or DEFAULT_EVENT_TIMEZONE for row in rows], dtype=object)
+    # convert per source timezone, each in one vectorized pass
+    for zone in set(zones.tolist()):
+        mask = zones == zone
+        times[mask] = to_storage_time(times[mask], zone)
+    return EventIndex(
+        times,
+        [row['event'] for row in rows],
+        [(row.get('tag') or row['event'])[:MAX_TAG_LENGTH] for row in rows],
+        [(row.get('impact') or '').lower() or None for row in rows],
+        window_minutes,
+    )
+
+
+@lru_cache(maxsize=4)
+def _cached_index(path: str, mtime: float, window_minutes: float) -> EventIndex:
+    index = load_event_index(path, window_minutes)
+    index.version = (path, mtime, window_minutes)
+    return index
+
+
+def get_event_index(path: str = None) -> EventIndex:
+    """Shared index of the calendar file, reloaded when the file changes."""
+    path = path or ECONOMIC_EVENTS_FILE
+    mtime = os.path.getmtime(path) if os.path.exists(path) else 0.0
+    return _cached_index(path, mtime, EVENT_WINDOW_MINUTES)
+
+
+def tag_trade_events(trades: Iterable[Trade], index: EventIndex = None) -> int:
+    """
+    Set event_tags on new or re-matched Trade objects in place, before they're
+    committed.
+
+    Returns:
+        number of trades near at least one event
+    """
+    trades = [trade for trade in trades if trade.entry_time and trade.exit_time]
+    index = index or get_event_index()
+    if not trades:
+        return 0
+    tags = index.tags_for([t.entry_time for t in trades], [t.exit_time for t in trades])
+    for trade, trade_tags in zip(trades, tags):
+        trade.event_tags = trade_tags
+    return sum(1 for trade_tags in tags if trade_tags)
+
+
+def backfill_event_tags(batch_size: int = 10000, index: EventIndex = None) -> int:
+    """
+    Re-tag every trade against the current calendar (run after editing the
+    events file or EVENT_WINDOW_MINUTES). Only changed rows are written, and
+    their months' pnl_versions bumped. Does not commit.
+
+    Returns:
+        number of trades updated
+    """
+    index = index or get_event_index()
+    rows = db.session.query(Trade.id, Trade.acc_id, Trade.trading_day, Trade.entry_time, Trade.exit_time,
+                            Trade.event_tags).order_by(Trade.id).all()
+
+    updated = 0
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        tags = index.tags_for([row.entry_time for row in batch], [row.exit_time for row in batch])
+        changed = [(row, trade_tags) for row, trade_tags in zip(batch, tags) if list(row.event_tags or []) != trade_tags]
+        if changed:
+            # ORM bulk UPDATE by primary key (executemany)
+            db.session.execute(db.update(Trade), [{'id': row.id, 'event_tags': trade_tags} for row, trade_tags in changed])
+            bump_trade_months(row for row, _ in changed)
+            updated += len(changed)
+    return updated
+
+
+def _per_event(lo: np.ndarray, hi: np.ndarray, values: np.ndarray, m: int) -> np.ndarray:
+    """Sum of values over the trades overlapping each of m events, via a difference array."""
+    diff = np.zeros(m + 1)
+    np.add.at(diff, lo, values)
+    np.add.at(diff, hi, -values)
+    return np.cumsum(diff)[:m]
+
+
+def event_stats(index: EventIndex, trades: TradeArrays, limit: int = 100) -> Dict:
+    """
+    How trades overlapping event windows did, per event tag (a trade counts
+    once per tag it overlaps), against trades near no event, plus the most
+    recent event occurrences that had trades.
+    """
+    lo, hi = index.overlapping(trades.entry_times, trades.exit_times)
+    pnl = trades.pnl
+    m = len(index)
+
+    def row(mask):
+        return _bucket_row(pnl[mask].sum(), int(mask.sum()), (pnl[mask] > 0).sum())
+
+    tags = []
+    for tag in sorted(set(index.tags.tolist())):
+        # tag-only prefix counts: a trade overlaps this tag if any of its events carry it
+        prefix = np.concatenate(([0], np.cumsum(index.tags == tag)))
+        mask = prefix[hi] > prefix[lo]
+        if mask.any():
+            impacts = set(index.impacts[index.tags == tag].tolist()) - {None}
+            tags.append({'tag': tag, 'impact': impacts.pop() if len(impacts) == 1 else None, **row(mask)})
+
+    counts = _per_event(lo, hi, np.ones(len(pnl)), m)
+    totals = _per_event(lo, hi, pnl, m)
+    wins = _per_event(lo, hi, (pnl > 0).astype(np.float64), m)
+    with_trades = np.flatnonzero(counts > 0.5)[::-1][:limit]
+    return {
+        'window_minutes': index.window / 60,
+        'event_count': m,
+        'no_event': row(hi == lo),
+        'near_event': row(hi > lo),
+        'tags': tags,
+        'events': [
+            {
+                'time': str(index.times[j].astype('datetime64[s]')),
+                'event': index.names[j], 'tag': index.tags[j], 'impact': index.impacts[j],
+                **_bucket_row(totals[j], int(round(counts[j])), int(round(wins[j]))),
+            }
+            for j in with_trades.tolist()
+        ],
+    }
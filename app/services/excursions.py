@@ -0,0 +1,180 @@
+"""
+MAE / MFE and entry/exit efficiency from the local bar store.
+
+The bars a trade was open over - from the bar containing the entry through
+the last bar that opened before the exit - give the highest high and lowest
+low it lived through (widened to its own entry and exit prices):
+
+- MFE: best unrealized move in the trade's favour, in dollars
+- MAE: worst move against it, in dollars (stored as a positive amount)
+- entry efficiency: long (high - entry) / (high - low), short (entry - low) / (high - low)
+- exit efficiency: long (exit - low) / (high - low), short (high - exit) / (high - low)
+
+Points convert to dollars with get_contract_multiplier(symbol) * quantity.
+
+Trades are processed per contract in one batch: windows are located with two
+searchsorted calls on the bar time index, and the extremes come from
+np.maximum / np.minimum.reduceat over the memory-mapped high and low columns.
+Trades with no bars in their window keep NULL columns and are filled in by
+backfill_excursions() once bars are imported.
+"""
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+from app.db.models import db, Trade
+from app.services.bar_store import Bars, get_bar_store
+from app.services.daily_pnl import bump_trade_months
+from app.utils.contract_multipliers import get_contract_multiplier
+
+_EPOCH = np.datetime64('1970-01-01T00:00:00', 's')
+
+
+def _seconds(times) -> np.ndarray:
+    return (np.asarray(times, dtype='datetime64[s]') - _EPOCH).astype(np.int64)
+
+
+def window_extremes(bars: Bars, starts: np.ndarray, ends: np.ndarray):
+    """
+    Highest high / lowest low of bars opening in [start, end) per window
+    (int64 seconds), NaN where a window has no bars.
+    """
+    lo = np.searchsorted(bars.time, starts, side='left')
+    hi = np.searchsorted(bars.time, ends, side='left')
+    has_bars = hi > lo
+    highest = np.full(len(starts), np.nan)
+    lowest = np.full(len(starts), np.nan)
+    if not has_bars.any():
+        return highest, lowest
+
+    lo, hi = lo[has_bars], hi[has_bars]
+    base, top = int(lo.min()), int(hi.max())
+    # reduceat over (lo, hi) pairs: even slots reduce [lo, hi), odd slots are discarded;
+    # one padding element keeps hi - base a valid index
+    bounds = np.empty(2 * len(lo), dtype=np.int64)
+    bounds[0::2], bounds[1::2] = lo - base, hi - base
+    highest[has_bars] = np.maximum.reduceat(np.append(bars.high[base:top], -np.inf), bounds)[0::2]
+    lowest[has_bars] = np.minimum.reduceat(np.append(bars.low[base:top], np.inf), bounds)[0::2]
+    return highest, lowest
+
+
+def compute_excursions(bars: Bars, entry_times, exit_times, is_short: np.ndarray, entry_price: np.ndarray,
+                       exit_price: np.ndarray, point_value: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    MAE / MFE (dollars) and entry / exit efficiency for a batch of trades on
+    one contract. NaN where no bars cover a trade (or, for efficiencies, where
+    its price range is zero).
+    """
+    entry = _seconds(entry_times)
+    start = entry - entry % 60  # the bar containing the entry
+    end = np.maximum(_seconds(exit_times), start + 1)
+    highest, lowest = window_extremes(bars, start, end)
+    # np.maximum / np.minimum keep NaN (no bars) as NaN
+    highest = np.maximum(highest, np.maximum(entry_price, exit_price))
+    lowest = np.minimum(lowest, np.minimum(entry_price, exit_price))
+
+    favorable = np.where(is_short, entry_price - lowest, highest - entry_price)
+    adverse = np.where(is_short, highest - entry_price, entry_price - lowest)
+    price_range = highest - lowest
+    with np.errstate(divide='ignore', invalid='ignore'):
+        entry_efficiency = favorable / price_range
+        exit_efficiency = np.where(is_short, highest - exit_price, exit_price - lowest) / price_range
+    flat = price_range == 0
+    return {
+        'mae': adverse * point_value,
+        'mfe': favorable * point_value,
+        'entry_efficiency': np.where(flat, np.nan, entry_efficiency),
+        'exit_efficiency': np.where(flat, np.nan, exit_efficiency),
+    }
+
+
+def _excursion_rows(rows: List, store) -> List[Dict]:
+    """Column values for trade rows (id, symbol, direction, times, prices, quantity) that bars cover."""
+    by_symbol = {}
+    for row in rows:
+        by_symbol.setdefault(row.symbol.upper(), []).append(row)
+
+    available = set(store.symbols())
+    updates = []
+    for symbol, trades in by_symbol.items():
+        if symbol not in available:
+            continue
+        result = compute_excursions(
+            store.bars(symbol),
+            np.array([t.entry_time for t in trades], dtype='datetime64[s]'),
+            np.array([t.exit_time for t in trades], dtype='datetime64[s]'),
+            np.array([(t.direction or '').upper() == 'SHORT' for t in trades]),
+            np.array([float(t.entry_price) for t in trades]),
+            np.array([float(t.exit_price) for t in trades]),
+            np.array([get_contract_multiplier(symbol) * (t.quantity or 0) for t in trades], dtype=np.float64),
+        )
+        for i, trade in enumerate(trades):
+            if np.isnan(result['mae'][i]):
+                continue
+            updates.append({
+                'id': trade.id,
+                'mae': round(float(result['mae'][i]), 2),
+                'mfe': round(float(result['mfe'][i]), 2),
+                'entry_efficiency': _optional(result['entry_efficiency'][i]),
+                'exit_efficiency': _optional(result['exit_efficiency'][i]),
+            })
+    return updates
+
+
+def _optional(value: float):
+    return round(float(value), 4) if not np.isnan(value) else None
+
+
+def update_trade_excursions(trades: Iterable[Trade], store=None) -> int:
+    """
+    Set the excursion columns on new or re-matched Trade objects in place,
+    before they're committed. Trades without bar coverage are left as they are.
+
+    Returns:
+        number of trades updated
+    """
+    trades = [trade for trade in trades if trade.entry_time and trade.exit_time]
+    if not trades:
+        return 0
+    by_id = {trade.id: trade for trade in trades}
+    updates = _excursion_rows(trades, store or get_bar_store())
+    for values in updates:
+        trade = by_id[values['id']]
+        for column in ('mae', 'mfe', 'entry_efficiency', 'exit_efficiency'):
+            setattr(trade, column, values[column])
+    return len(updates)
+
+
+def backfill_excursions(recompute: bool = False, batch_size: int = 10000, store=None) -> int:
+    """
+    Fill the excursion columns of trades that bars now cover (all trades with
+    recompute=True, e.g. after replacing bar files), bumping their months'
+    pnl_versions so cached trade payloads pick the values up. Does not commit.
+
+    Returns:
+        number of trades updated
+    """
+    store = store or get_bar_store()
+    symbols = store.symbols()
+    if not symbols:
+        return 0
+
+    query = db.session.query(
+        Trade.id, Trade.acc_id, Trade.trading_day, Trade.symbol, Trade.direction, Trade.entry_time,
+        Trade.exit_time, Trade.entry_price, Trade.exit_price, Trade.quantity
+    ).filter(db.func.upper(Trade.symbol).in_(symbols))
+    if not recompute:
+        query = query.filter(Trade.mae.is_(None))
+    rows = query.order_by(Trade.symbol, Trade.entry_time).all()
+
+    updated = 0
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        updates = _excursion_rows(batch, store)
+        if updates:
+            # ORM bulk UPDATE by primary key (executemany)
+            db.session.execute(db.update(Trade), updates)
+            changed = {values['id'] for values in updates}
+            bump_trade_months(row for row in batch if row.id in changed)
+            updated += len(updates)
+    return updated
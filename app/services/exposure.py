@@ -0,0 +1,158 @@
+"""
+Concurrent exposure from overlapping trades (sweep line).
+
+Every trade holds its quantity from entry_time to exit_time. Turning each
+trade into an open event (+quantity) and a close event (-quantity), sorting
+the 2n events once and taking cumulative sums gives the exposure level after
+every event - open contracts (gross), net signed contracts, and notional
+(contracts x entry price x CONTRACT_MULTIPLIERS point value) - in
+O(n log n). At equal timestamps closes sort before opens, so a trade exited
+and another entered in the same second never count as concurrent.
+
+Exposure is per trade interval: a trade scaled into over several fills counts
+its full quantity from its first entry.
+"""
+from datetime import date
+from typing import Dict, List
+
+import numpy as np
+
+from app.db.models import db, Trade
+from app.services.analytics import trade_filters
+from app.utils.contract_multipliers import get_contract_multiplier
+
+# breach periods listed per limit (all of them are counted)
+MAX_LISTED_BREACHES = 100
+
+
+class TradeIntervals:
+    """Open/close times, size and notional of a trade set (times as int64 seconds, naive LA wall clock)."""
+
+    def __init__(self, acc_ids, entry, exit, quantity, signed_quantity, notional):
+        self.acc_ids = acc_ids
+        self.entry = entry
+        self.exit = exit
+        self.quantity = quantity                  # contracts (>= 0)
+        self.signed_quantity = signed_quantity    # + long, - short
+        self.notional = notional                  # quantity * entry price * point value
+
+    def __len__(self):
+        return len(self.entry)
+
+    def subset(self, mask: np.ndarray) -> 'TradeIntervals':
+        return TradeIntervals(self.acc_ids[mask], self.entry[mask], self.exit[mask], self.quantity[mask],
+                              self.signed_quantity[mask], self.notional[mask])
+
+
+def load_trade_intervals(acc_id: str = None, symbol: str = None, start_day: date = None,
+                         end_day: date = None) -> TradeIntervals:
+    rows = db.session.query(
+        Trade.acc_id, Trade.symbol, Trade.direction, Trade.entry_time, Trade.exit_time, Trade.entry_price,
+        Trade.quantity
+    ).filter(*trade_filters(acc_id, symbol, start_day, end_day)).all()
+
+    accounts, symbols, directions, entry_times, exit_times, prices, quantities = zip(*rows) if rows else ((),) * 7
+    quantity = np.array([q or 0 for q in quantities], dtype=np.int64)
+    short = np.array([(d or '').upper() == 'SHORT' for d in directions], dtype=bool)
+    multipliers = {s: get_contract_multiplier(s) for s in set(symbols)}
+    point_value = np.array([multipliers[s] for s in symbols], dtype=np.float64)
+    return TradeIntervals(
+        acc_ids=np.array(accounts, dtype=object),
+        entry=np.array(entry_times, dtype='datetime64[s]').astype(np.int64),
+        exit=np.array(exit_times, dtype='datetime64[s]').astype(np.int64),
+        quantity=quantity,
+        signed_quantity=np.where(short, -quantity, quantity),
+        notional=quantity * np.array([float(p) for p in prices], dtype=np.float64) * point_value,
+    )
+
+
+def sweep(intervals: TradeIntervals) -> Dict[str, np.ndarray]:
+    """
+    Exposure level after each distinct event time: times (int64 seconds),
+    contracts, net_contracts and notional. The level holds until the next
+    time; the last one is 0 (everything closed).
+    """
+    n = len(intervals)
+    times = np.concatenate((intervals.exit, intervals.entry))
+    # closes (first half) before opens at equal times
+    is_open = np.concatenate((np.zeros(n, dtype=bool), np.ones(n, dtype=bool)))
+    order = np.lexsort((is_open, times))
+    sign = np.where(is_open, 1, -1)[order]
+    half = np.concatenate((np.arange(n), np.arange(n)))[order]
+
+    levels = {
+        'contracts': np.cumsum(sign * intervals.quantity[half]),
+        'net_contracts': np.cumsum(sign * intervals.signed_quantity[half]),
+        'notional': np.cumsum(sign * intervals.notional[half]),
+    }
+    times = times[order]
+    # one point per timestamp: the level after its last event
+    last = np.append(times[1:] != times[:-1], True) if len(times) else np.array([], dtype=bool)
+    return {'times': times[last], **{name: values[last] for name, values in levels.items()}}
+
+
+def exposure_stats(series: Dict[str, np.ndarray], max_contracts: int = None, max_notional: float = None) -> Dict:
+    """
+    Peaks, time at the peak and time-weighted average exposure of a sweep()
+    series; with limits, the time spent above them and the breach periods.
+    Times are seconds while at least one trade is open.
+    """
+    times, contracts, notional = series['times'], series['contracts'], series['notional']
+    if not len(times):
+        return {'peak_contracts': 0, 'peak_notional': 0.0, 'time_in_market_seconds': 0}
+
+    durations = np.diff(times)          # how long each level (but the final 0) is held
+    held_contracts, held_notional = contracts[:-1], notional[:-1]
+    open_time = int(durations[held_contracts > 0].sum())
+    peak_contracts = int(contracts.max())
+    peak_notional = float(notional.max())
+    peak_at = int(np.argmax(contracts))
+
+    result = {
+        'peak_contracts': peak_contracts,
+        'peak_contracts_at': str(times[peak_at].astype('datetime64[s]')),
+        'time_at_peak_contracts_seconds': int(durations[held_contracts == peak_contracts].sum()),
+        'peak_net_contracts': int(np.abs(series['net_contracts']).max()),
+        'peak_notional': round(peak_notional, 2),
+        'peak_notional_at': str(times[int(np.argmax(notional))].astype('datetime64[s]')),
+        'time_at_peak_notional_seconds': int(durations[np.isclose(held_notional, peak_notional)].sum()),
+        'time_in_market_seconds': open_time,
+        'avg_contracts_in_market': round(float((held_contracts * durations).sum() / open_time), 3) if open_time else 0.0,
+        'avg_notional_in_market': round(float((held_notional * durations).sum() / open_time), 2) if open_time else 0.0,
+    }
+    if max_contracts is not None:
+        result['contracts_limit'] = _breaches(times, held_contracts > max_contracts, max_contracts)
+    if max_notional is not None:
+        result['notional_limit'] = _breaches(times, held_notional > max_notional, max_notional)
+    return result
+
+
+def _breaches(times: np.ndarray, over: np.ndarray, limit) -> Dict:
+    """Periods [start, end) during which a held level is over limit (the first MAX_LISTED_BREACHES)."""
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], over.astype(np.int8), [0]))))
+    starts, ends = edges[::2], edges[1::2]
+    return {
+        'limit': limit,
+        'compliant': not len(starts),
+        'time_over_seconds': int((times[ends] - times[starts]).sum()),
+        'breach_count': len(starts),
+        'breaches': [
+            {'start': str(times[s].astype('datetime64[s]')), 'end': str(times[e].astype('datetime64[s]'))}
+            for s, e in zip(starts[:MAX_LISTED_BREACHES].tolist(), ends[:MAX_LISTED_BREACHES].tolist())
+        ],
+    }
+
+
+def exposure_by_account(intervals: TradeIntervals, max_contracts: int = None,
+                        max_notional: float = None) -> Dict[str, object]:
+    """sweep() and exposure_stats() for all accounts combined and for each account."""
+    accounts: List[Dict] = []
+    for acc_id in sorted(set(intervals.acc_ids.tolist())):
+        stats = exposure_stats(sweep(intervals.subset(intervals.acc_ids == acc_id)), max_contracts, max_notional)
+        accounts.append({'acc_id': acc_id, **stats})
+    combined = sweep(intervals)
+    return {
+        'series': combined,
+        'combined': exposure_stats(combined, max_contracts, max_notional),
+        'accounts': accounts,
+    }
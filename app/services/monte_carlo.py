@@ -0,0 +1,148 @@
+"""
+Monte Carlo risk-of-ruin simulation over historical trade PnLs.
+
+Synthetic equity paths are built by resampling an account's trade PnLs -
+either trade by trade (bootstrap) or in runs of consecutive trades (circular
+block bootstrap, which keeps streaks and regime clustering) - and every path
+is evaluated in whole-array passes: cumulative sums for equity, running maxima
+for the trailing drawdown, argmax for first-hit times.
+
+Paths are simulated in fixed-size chunks, each with its own child seed, so
+memory stays bounded and the result for a given seed does not depend on how
+chunks are spread over the process pool. Workers only run numpy on the PnL
+array they are handed - they never touch the database.
+"""
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+
+import numpy as np
+
+CHUNK_PATHS = 2000
+# below this many simulated trades the pool's overhead outweighs the work
+MIN_PARALLEL_TRADES = 5_000_000
+PERCENTILES = [5, 25, 50, 75, 95, 99]
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """One process pool per server process, started on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+        return _pool
+
+
+def resample_indices(rng: np.random.Generator, n: int, paths: int, horizon: int, block_size: int = 1) -> np.ndarray:
+    """
+    (paths, horizon) indices into a length-n history.
+
+    block_size 1 is the plain bootstrap; larger blocks draw random start
+    points and take block_size consecutive trades from each, wrapping around
+    the end of the history (circular block bootstrap).
+    """
+    if block_size <= 1:
+        return rng.integers(0, n, size=(paths, horizon))
+    blocks = -(-horizon // block_size)
+    starts = rng.integers(0, n, size=(paths, blocks, 1))
+    return ((starts + np.arange(block_size)) % n).reshape(paths, blocks * block_size)[:, :horizon]
+
+
+def _simulate_chunk(pnl: np.ndarray, paths: int, horizon: int, block_size: int, seed: np.random.SeedSequence,
+                    trailing_drawdown: Optional[float], lock_at_start: bool, target: Optional[float]) -> Dict:
+    """Per-path outcomes for one chunk: max drawdown, final PnL, first breach / target trade (-1 = never)."""
+    rng = np.random.default_rng(seed)
+    equity = np.cumsum(pnl[resample_indices(rng, len(pnl), paths, horizon, block_size)], axis=1)
+    peak = np.maximum.accumulate(np.maximum(equity, 0.0), axis=1)
+
+    outcome = {
+        'max_drawdown': (equity - peak).min(axis=1),
+        'final_pnl': equity[:, -1].copy(),
+        'ruin_at': np.full(paths, -1),
+        'target_at': np.full(paths, -1),
+    }
+    if trailing_drawdown:
+        threshold = peak - trailing_drawdown
+        if lock_at_start:
+            # the limit stops trailing once it reaches the starting balance
+            threshold = np.minimum(threshold, 0.0)
+        outcome['ruin_at'] = _first_true(equity <= threshold)
+    if target is not None:
+        outcome['target_at'] = _first_true(equity >= target)
+    return outcome
+
+
+def _first_true(hits: np.ndarray) -> np.ndarray:
+    """Index of the first True in each row, -1 where there is none."""
+    first = hits.argmax(axis=1)
+    return np.where(hits[np.arange(len(hits)), first], first, -1)
+
+
+def _percentiles(values: np.ndarray) -> Optional[Dict[str, float]]:
+    if not len(values):
+        return None
+    return {f'p{p}': round(float(v), 2) for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))}
+
+
+def simulate(pnl: np.ndarray, paths: int = 10000, horizon: int = None, block_size: int = 1,
+             trailing_drawdown: float = None, lock_at_start: bool = False, target: float = None,
+             seed: int = 0, parallel: bool = None) -> Dict:
+    """
+    Resample pnl into `paths` equity paths of `horizon` trades each.
+
+    Args:
+        pnl: historical trade PnLs
+        paths: number of synthetic paths
+        horizon: trades per path (default len(pnl))
+        block_size: 1 for the bootstrap, >1 for block bootstrap
+        trailing_drawdown: prop-firm style limit; a path is ruined once equity
+                           falls this far below its high-water mark (which
+                           starts at the starting balance)
+        lock_at_start: stop trailing once the limit reaches the starting balance
+        target: profit target; with both a target and a limit, a path ends at
+                whichever it hits first (pass or fail, like an evaluation)
+        seed: random seed (results are reproducible for a given seed)
+        parallel: split chunks over the process pool (default: for large runs)
+
+    Returns:
+        drawdown / final PnL percentiles, probability of ruin and of hitting
+        the target, and time-to-ruin / time-to-target percentiles in trades
+    """
+    pnl = np.asarray(pnl, dtype=np.float64)
+    horizon = horizon or len(pnl)
+    chunk_sizes = [min(CHUNK_PATHS, paths - start) for start in range(0, paths, CHUNK_PATHS)]
+    seeds = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+    args = [(pnl, size, horizon, block_size, child, trailing_drawdown, lock_at_start, target)
+            for size, child in zip(chunk_sizes, seeds)]
+
+    if parallel is None:
+        parallel = paths * horizon >= MIN_PARALLEL_TRADES and (os.cpu_count() or 1) > 1
+    if parallel:
+        chunks = list(_get_pool().map(_simulate_chunk, *zip(*args)))
+    else:
+        chunks = [_simulate_chunk(*chunk_args) for chunk_args in args]
+    outcome = {key: np.concatenate([chunk[key] for chunk in chunks]) for key in chunks[0]}
+
+    # like an evaluation, a path ends at whichever of target and ruin comes first
+    ruin_at, target_at = outcome['ruin_at'], outcome['target_at']
+    ruined = (ruin_at >= 0) & ((target_at < 0) | (ruin_at < target_at))
+    reached = (target_at >= 0) & ~ruined
+    return {
+        'paths': paths,
+        'horizon': horizon,
+        'method': 'block_bootstrap' if block_size > 1 else 'bootstrap',
+        'block_size': block_size if block_size > 1 else None,
+        'max_drawdown': {**_percentiles(-outcome['max_drawdown']), 'mean': round(float(-outcome['max_drawdown'].mean()), 2)},
+        'final_pnl': {**_percentiles(outcome['final_pnl']), 'mean': round(float(outcome['final_pnl'].mean()), 2)},
+        'probability_of_profit': round(float((outcome['final_pnl'] > 0).mean() * 100), 2),
+        'trailing_drawdown': trailing_drawdown,
+        'probability_of_ruin': round(float(ruined.mean() * 100), 2) if trailing_drawdown else None,
+        'trades_to_ruin': _percentiles(ruin_at[ruined] + 1.0) if trailing_drawdown else None,
+        'target': target,
+        'probability_of_target': round(float(reached.mean() * 100), 2) if target is not None else None,
+        'trades_to_target': _percentiles(target_at[reached] + 1.0) if target is not None else None,
+    }
@@ -0,0 +1,256 @@
+"""
+Persisted bracket/OCO order graph.
+
+Tradovate links orders three ways: parentId (bracket children of an entry),
+ocoId (one-cancels-other siblings, e.g. stop + target) and linkedId. We keep
+those edges in the order_links table, updated incrementally as order/list
+results arrive, so any order's stop/target context is an indexed lookup.
+
+The matcher stamps each trade with the stop and target of its entry order's
+bracket (attach_bracket_context), so trade records carry their planned risk
+and reward without a graph lookup per read.
+"""
+from typing import List, Dict, Iterable, Optional, Tuple
+
+from app.db.models import db, OrderLink, Trade
+from app.services.daily_pnl import bump_trade_months
+
+STOP_ORDER_TYPES = ('Stop', 'StopLimit', 'TrailingStop', 'TrailingStopLimit')
+TARGET_ORDER_TYPES = ('Limit', 'MIT')
+
+
+def _str_id(value) -> Optional[str]:
+    return str(value) if value is not None else None
+
+
+def _float_or_none(value) -> Optional[float]:
+    return float(value) if value is not None else None
+
+
+def upsert_order_links(orders: List[Dict]) -> Dict[str, int]:
+    """
+    Insert or update order_links rows from Tradovate order/list dicts.
+
+    Existing rows are prefetched in one query; only new or changed orders are
+    written, so re-syncing an unchanged order list is a read-only no-op.
+
+    Does not commit - callers commit alongside the rest of their import.
+    """
+    summary = {'inserted': 0, 'updated': 0}
+    if not orders:
+        return summary
+
+    by_id = {}
+    for order in orders:
+        order_id = _str_id(order.get('id'))
+        if order_id is not None:
+            by_id[order_id] = order
+
+    existing = {
+        link.order_id: link
+        for link in OrderLink.query.filter(OrderLink.order_id.in_(by_id.keys())).all()
+    }
+
+    new_links = []
+    for order_id, order in by_id.items():
+        values = {
+            'account': _str_id(order.get('accountId')),
+            'contract_id': _str_id(order.get('contractId')),
+            'action': order.get('action'),
+            'order_type': order.get('orderType'),
+            'ord_status': order.get('ordStatus'),
+            'price': order.get('price'),
+            'stop_price': order.get('stopPrice'),
+            'parent_id': _str_id(order.get('parentId')),
+            'linked_id': _str_id(order.get('linkedId')),
+            'oco_id': _str_id(order.get('ocoId')),
+        }
+
+        link = existing.get(order_id)
+        if link is None:
+            new_links.append(OrderLink(order_id=order_id, **values))
+            continue
+
+        changed = False
+        for field, value in values.items():
+            # order/list doesn't always carry type/prices - don't erase what we know
+            if value is None:
+                continue
+            current = getattr(link, field)
+            if field in ('price', 'stop_price'):
+                # compare at the column's Numeric(10,2) precision
+                current = float(current) if current is not None else None
+                value = round(float(value), 2)
+            if current != value:
+                setattr(link, field, value)
+                changed = True
+        if changed:
+            summary['updated'] += 1
+
+    db.session.add_all(new_links)
+    summary['inserted'] = len(new_links)
+    return summary
+
+
+def get_order_links(order_ids: Iterable) -> Dict[str, Dict]:
+    """
+    Bracket context for a set of broker order ids, in at most three indexed queries.
+
+    Returns dict keyed by order id:
+        order: this order's link (or None if we've never seen it in order/list)
+        parent: the bracket parent, if any
+        children: orders whose parentId is this order
+        oco: other orders in the same OCO group
+        stops / targets: children and OCO siblings split by order type
+    """
+    ids = {_str_id(oid) for oid in order_ids if oid is not None}
+    if not ids:
+        return {}
+
+    links = {link.order_id: link for link in OrderLink.query.filter(OrderLink.order_id.in_(ids)).all()}
+
+    parent_ids = {link.parent_id for link in links.values() if link.parent_id and link.parent_id not in links}
+    if parent_ids:
+        for link in OrderLink.query.filter(OrderLink.order_id.in_(parent_ids)).all():
+            links[link.order_id] = link
+
+    oco_ids = {link.oco_id for oid, link in links.items() if oid in ids and link.oco_id}
+    conditions = [OrderLink.parent_id.in_(ids)]
+    if oco_ids:
+        conditions.append(OrderLink.oco_id.in_(oco_ids))
+    related = OrderLink.query.filter(db.or_(*conditions)).all()
+
+    children_by_parent: Dict[str, List[OrderLink]] = {}
+    by_oco: Dict[str, List[OrderLink]] = {}
+    for link in related:
+        if link.parent_id in ids:
+            children_by_parent.setdefault(link.parent_id, []).append(link)
+        if link.oco_id in oco_ids:
+            by_oco.setdefault(link.oco_id, []).append(link)
+
+    context = {}
+    for oid in ids:
+        link = links.get(oid)
+        parent = links.get(link.parent_id) if link and link.parent_id else None
+        children = children_by_parent.get(oid, [])
+        oco = [o for o in by_oco.get(link.oco_id, []) if o.order_id != oid] if link and link.oco_id else []
+
+        protective = {o.order_id: o for o in children + oco}.values()
+        context[oid] = {
+            'order': link.to_dict() if link else None,
+            'parent': parent.to_dict() if parent else None,
+            'children': [o.to_dict() for o in children],
+            'oco': [o.to_dict() for o in oco],
+            'stops': [o.to_dict() for o in protective if o.order_type in STOP_ORDER_TYPES],
+            'targets': [o.to_dict() for o in protective if o.order_type in TARGET_ORDER_TYPES],
+        }
+    return context
+
+
+def _entry_order_id(fills) -> Optional[str]:
+    """Broker order id of a trade's entry: the first of its fills (stored in fill_time order)."""
+    order_id = fills[0].get('order_id') if fills else None
+    return str(order_id) if order_id else None
+
+
+def _nearest_price(orders: List[Dict], field: str, entry_price) -> Optional[float]:
+    """field (falling back to price) of the order closest to the entry - the first stop / target to trigger."""
+    prices = [o.get(field) if o.get(field) is not None else o.get('price') for o in orders]
+    prices = [p for p in prices if p is not None]
+    if not prices:
+        return None
+    if entry_price is None:
+        return prices[0]
+    return min(prices, key=lambda p: abs(p - float(entry_price)))
+
+
+def bracket_prices(entries: List[Tuple[Optional[str], object]]) -> List[Tuple[Optional[float], Optional[float]]]:
+    """
+    (stop_price, target_price) for each (entry order id, entry price), from the
+    entry order's bracket children and OCO siblings, in one get_order_links call.
+    With several stops or targets (scaled exits), the one nearest the entry.
+    """
+    context = get_order_links(order_id for order_id, _ in entries)
+    prices = []
+    for order_id, entry_price in entries:
+        entry = context.get(order_id) or {}
+        prices.append((
+            _nearest_price(entry.get('stops', []), 'stop_price', entry_price),
+            _nearest_price(entry.get('targets', []), 'price', entry_price),
+        ))
+    return prices
+
+
+def attach_bracket_context(trades: Iterable[Trade]) -> int:
+    """
+    Set stop_price / target_price on new or re-matched Trade objects in place,
+    before they're committed.
+
+    Returns:
+        number of trades with a stop or target
+    """
+    trades = list(trades)
+    if not trades:
+        return 0
+    prices = bracket_prices([(_entry_order_id(trade.fills), trade.entry_price) for trade in trades])
+    for trade, (stop_price, target_price) in zip(trades, prices):
+        trade.stop_price = stop_price
+        trade.target_price = target_price
+    return sum(1 for stop_price, target_price in prices if stop_price is not None or target_price is not None)
+
+
+def backfill_bracket_context(batch_size: int = 5000) -> int:
+    """
+    Set stop/target on existing trades from order_links (run after order_links
+    is first populated). Only changed rows are written, and their months'
+    pnl_versions bumped. Does not commit.
+
+    Returns:
+        number of trades updated
+    """
+    rows = db.session.query(Trade.id, Trade.acc_id, Trade.trading_day, Trade.fills, Trade.entry_price,
+                            Trade.stop_price, Trade.target_price).order_by(Trade.id).all()
+
+    updated = 0
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        prices = bracket_prices([(_entry_order_id(row.fills), row.entry_price) for row in batch])
+        changed = [
+            (row, stop_price, target_price) for row, (stop_price, target_price) in zip(batch, prices)
+            if (_float_or_none(row.stop_price), _float_or_none(row.target_price)) != (stop_price, target_price)
+        ]
+        if changed:
+            # ORM bulk UPDATE by primary key (executemany)
+            db.session.execute(db.update(Trade), [
+                {'id': row.id, 'stop_price': stop_price, 'target_price': target_price}
+                for row, stop_price, target_price in changed
+            ])
+            bump_trade_months(row for row, _, _ in changed)
+            updated += len(changed)
+    return updated
+
+
+def get_trade_bracket_context(trade) -> Dict:
+    """
+    Stop/target context for a matched trade, from the bracket of its entry order.
+
+    The entry order is the first fill in trade.fills (fills are stored in
+    fill_time order); its bracket children and OCO siblings are the stop/target.
+    """
+    fills = trade.fills or []
+    entry_order_id = _entry_order_id(fills)
+    if not entry_order_id:
+        return {'entry_order_id': None, 'stops': [], 'targets': [], 'orders': {}}
+
+    order_ids = {f.get('order_id') for f in fills if f.get('order_id')}
+    context = get_order_links(order_ids)
+    entry = context.get(entry_order_id, {})
+
+    return {
+        'entry_order_id': entry_order_id,
+        'stop_price': _float_or_none(trade.stop_price),
+        'target_price': _float_or_none(trade.target_price),
+        'stops': entry.get('stops', []),
+        'targets': entry.get('targets', []),
+        'orders': context
+    }
@@ -1,6 +1,9 @@
 from typing import List, Dict, Tuple
 from app.db.models import Order, Trade, db
 from app.services.metrics import detect_trade_type
+from app.services.daily_pnl import refresh_daily_pnl_for_trades
+from app.services.excursions import update_trade_excursions
+from app.services.economic_events import tag_trade_events
 from datetime import datetime
 import uuid
 
@@ -67,7 +70,10 @@ def match_orders_to_trades(account:str = None) -> tuple[List[Trade], Dict]:
 
     if trades:
         try:
+            update_trade_excursions(trades)
+            tag_trade_events(trades)
             db.session.bulk_save_objects(trades)
+            refresh_daily_pnl_for_trades(trades)
             db.session.commit()
             summary['trades_created'] = len(trades)
         except Exception as e:
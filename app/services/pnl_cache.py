@@ -0,0 +1,161 @@
+"""
+Versioned response cache for calendar and daily PnL periods.
+
+A PnL response for a range of trading days only changes when a trade in one of
+the months it covers is written, and every such write bumps the month's
+pnl_versions counter (see bump_pnl_versions). So a response is identified by
+the request plus the versions of the months it spans:
+
+- the strong ETag is a hash of exactly that, and a matching If-None-Match gets
+  304 Not Modified without building the response
+- closed months (before the current trading month) are effectively immutable,
+  so their responses are kept in memory and replayed until a version moves
+- ranges that reach into the open month are re-built on a miss (fills land
+  there all day), but still get ETags so unchanged reloads are 304s
+
+Analytics responses use cached_account_response() instead, keyed by the
+account's overall data_version().
+
+Validating a request costs one indexed query on pnl_versions.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Callable, List, Optional, Tuple
+
+import pytz
+from flask import Response, make_response, request
+
+from app.db.models import db, PnlVersion
+from app.services.daily_pnl import month_of, trading_day_of
+
+MARKET_TIMEZONE = 'America/Los_Angeles'
+MAX_ENTRIES = 256
+
+
+class LRUCache:
+    """Thread-safe LRU of key -> value."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+response_cache = LRUCache(MAX_ENTRIES)  # request key -> (etag, body)
+
+
+def current_trading_day(now: datetime = None) -> date:
+    """Today's trading day in market (LA) time."""
+    tz = pytz.timezone(MARKET_TIMEZONE)
+    now = now.astimezone(tz) if now else datetime.now(tz)
+    return trading_day_of(now.replace(tzinfo=None))
+
+
+def is_closed_period(end_day: Optional[date], now: datetime = None) -> bool:
+    """True if every trading day up to end_day is in a month that's already over."""
+    return end_day is not None and end_day < month_of(current_trading_day(now))
+
+
+def period_versions(start_day: Optional[date], end_day: Optional[date]) -> List[Tuple[str, date, int]]:
+    """(acc_id, month, version) for every month overlapping the trading-day range (None = unbounded)."""
+    query = db.session.query(PnlVersion.acc_id, PnlVersion.month, PnlVersion.version)
+    if start_day:
+        query = query.filter(PnlVersion.month >= month_of(start_day))
+    if end_day:
+        query = query.filter(PnlVersion.month <= month_of(end_day))
+    return [tuple(row) for row in query.order_by(PnlVersion.acc_id, PnlVersion.month).all()]
+
+
+def data_version(acc_id: str = None) -> tuple:
+    """
+    Version of an account's trades (all accounts if acc_id is None).
+
+    Per-month versions only ever increase and new months add rows, so the
+    (acc_id, sum, count) triple changes whenever any of the account's trades do.
+    """
+    query = db.session.query(PnlVersion.acc_id, db.func.sum(PnlVersion.version), db.func.count())
+    if acc_id:
+        query = query.filter(PnlVersion.acc_id == acc_id)
+    return tuple((acc, int(total), count) for acc, total, count in query.group_by(PnlVersion.acc_id).order_by(PnlVersion.acc_id))
+
+
+def _request_key() -> tuple:
+    return (request.path, tuple(sorted(request.args.items(multi=True))))
+
+
+def _etag(*parts) -> str:
+    return hashlib.sha1(json.dumps(parts, default=str).encode()).hexdigest()
+
+
+def _serve(key, etag: str, build: Callable, store: bool):
+    """304 on a matching If-None-Match, else replay or build (and maybe store) the body."""
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        entry = response_cache.get(key) if store else None
+        if entry is not None and entry[0] == etag:
+            response = Response(entry[1], status=200, mimetype='application/json')
+        else:
+            response = make_response(build())
+            if response.status_code != 200:
+                return response
+            if store:
+                response_cache.put(key, (etag, response.get_data()))
+
+    response.set_etag(etag)
+    # always revalidate - an edit to an old trade must still show up
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def cached_period_response(start_day: Optional[date], end_day: Optional[date], build: Callable):
+    """
+    Serve a PnL response for trading days start_day..end_day with a strong ETag.
+
+    Args:
+        start_day / end_day: trading-day range the response covers (None = unbounded)
+        build: view function producing the response on a cache miss; non-200
+               results are returned as-is and never cached
+    """
+    key = _request_key()
+    etag = _etag(key, period_versions(start_day, end_day))
+    return _serve(key, etag, build, store=is_closed_period(end_day))
+
+
+def cached_account_response(acc_id: Optional[str], build: Callable, extra_version=None):
+    """
+    Serve an analytics response cached per account and data version.
+
+    Analytics span an account's whole history (equity curves, drawdowns), so
+    they are keyed by data_version() rather than by month and always stored.
+
+    Args:
+        acc_id: account the response covers (None = all accounts)
+        build: view function producing the response on a cache miss
+        extra_version: anything else the response depends on (e.g. a reference
+                       file's modification time)
+    """
+    key = _request_key()
+    etag = _etag(key, data_version(acc_id), extra_version)
+    return _serve(key, etag, build, store=True)
@@ -0,0 +1,223 @@
+"""
+Mergeable quantile sketches of trade PnL and holding time.
+
+trade_sketches keeps one t-digest per (account, symbol, trading month) and
+metric. A t-digest summarizes a distribution as a bounded number of weighted
+centroids - small near the tails, larger in the middle - so percentiles stay
+accurate where they matter (p1, p99) and the sketches of any set of months
+merge into one without touching the trades behind them.
+
+Rows are refreshed with daily_pnl (refresh_daily_pnl): the months of the
+(account, symbol, trading day) keys it refreshes are re-sketched from their
+trades in the same transaction, so edits and re-matched trades are reflected
+exactly. rebuild_sketches() recomputes everything from scratch.
+"""
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.db.models import db, Trade, TradeSketch
+
+METRICS = ['pnl', 'holding_minutes']
+COMPRESSION = 200
+
+
+class TDigest:
+    """
+    Merging t-digest: centroids (means, weights) sorted by mean, with exact
+    count, sum, min and max. Compression bounds the centroid count (at most
+    about compression / 2), trading size for accuracy.
+    """
+
+    def __init__(self, means=None, weights=None, total: float = 0.0, min_value: float = np.inf,
+                 max_value: float = -np.inf, compression: int = COMPRESSION):
+        self.means = np.asarray(means if means is not None else [], dtype=np.float64)
+        self.weights = np.asarray(weights if weights is not None else [], dtype=np.float64)
+        self.total = float(total)
+        self.min_value = float(min_value)
+        self.max_value = float(max_value)
+        self.compression = compression
+
+    @property
+    def count(self) -> int:
+        return int(round(self.weights.sum()))
+
+    @classmethod
+    def from_values(cls, values, compression: int = COMPRESSION) -> 'TDigest':
+        values = np.asarray(values, dtype=np.float64)
+        if not len(values):
+            return cls(compression=compression)
+        return cls(values, np.ones(len(values)), values.sum(), values.min(), values.max(), compression)._compress()
+
+    @classmethod
+    def merge(cls, digests: Iterable['TDigest'], compression: int = COMPRESSION) -> 'TDigest':
+        digests = [d for d in digests if len(d.weights)]
+        if not digests:
+            return cls(compression=compression)
+        return cls(
+            np.concatenate([d.means for d in digests]), np.concatenate([d.weights for d in digests]),
+            sum(d.total for d in digests), min(d.min_value for d in digests), max(d.max_value for d in digests),
+            compression
+        )._compress()
+
+    def _compress(self) -> 'TDigest':
+        """
+        Re-bucket centroids in one pass: sorted by mean, each lands in the
+        unit interval of the k1 scale function k(q) = c / 2pi * asin(2q - 1)
+        its cumulative-weight midpoint falls in, and each bucket becomes one
+        weighted-mean centroid. Buckets are narrow near q = 0 and 1.
+        """
+        order = np.argsort(self.means, kind='stable')
+        means, weights = self.means[order], self.weights[order]
+        cumulative = np.cumsum(weights)
+        q = (cumulative - weights / 2) / cumulative[-1]
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * q - 1)
+        _, bucket = np.unique(np.floor(k), return_inverse=True)
+        bucket = bucket.reshape(-1)
+        merged = np.bincount(bucket, weights=weights)
+        self.means = np.bincount(bucket, weights=means * weights) / merged
+        self.weights = merged
+        return self
+
+    def _knots(self):
+        """(values, cumulative weights) to interpolate between: min, centroid centres, max."""
+        centres = np.cumsum(self.weights) - self.weights / 2
+        values = np.concatenate(([self.min_value], self.means, [self.max_value]))
+        return values, np.concatenate(([0.0], centres, [self.weights.sum()]))
+
+    def quantiles(self, qs: Sequence[float]) -> np.ndarray:
+        """Values at quantiles qs (0..1), NaN for an empty digest."""
+        qs = np.asarray(qs, dtype=np.float64)
+        if not len(self.weights):
+            return np.full(len(qs), np.nan)
+        values, positions = self._knots()
+        return np.interp(qs * positions[-1], positions, values)
+
+    def cdf(self, x) -> np.ndarray:
+        """Estimated fraction of values <= x."""
+        x = np.asarray(x, dtype=np.float64)
+        if not len(self.weights):
+            return np.full(x.shape, np.nan)
+        values, positions = self._knots()
+        return np.interp(x, values, positions, left=0.0) / positions[-1]
+
+    def histogram(self, bins: int = 20) -> List[Dict]:
+        """Estimated counts in equal-width bins between min and max."""
+        if not len(self.weights):
+            return []
+        edges = np.linspace(self.min_value, self.max_value, bins + 1)
+        counts = np.diff(np.concatenate(([0.0], self.cdf(edges[1:-1]), [1.0]))) * self.count
+        return [
+            {'low': round(float(lo), 2), 'high': round(float(hi), 2), 'count': int(round(count))}
+            for lo, hi, count in zip(edges[:-1], edges[1:], counts)
+        ]
+
+    def to_bytes(self) -> bytes:
+        return np.concatenate((self.means, self.weights)).astype('<f8').tobytes()
+
+    @classmethod
+    def from_row(cls, row: TradeSketch, compression: int = COMPRESSION) -> 'TDigest':
+        packed = np.frombuffer(row.centroids, dtype='<f8')
+        half = len(packed) // 2
+        return cls(packed[:half], packed[half:], row.total, row.min_value, row.max_value, compression)
+
+
+def _month(column):
+    return db.cast(db.func.date_trunc('month', column), db.Date)
+
+
+def _sketch_rows(filters) -> List[Dict]:
+    """TradeSketch rows for every (account, symbol, month) with trades matching filters."""
+    month = _month(Trade.trading_day)
+    rows = db.session.query(
+        Trade.acc_id, Trade.symbol, month, Trade.pnl, Trade.entry_time, Trade.exit_time
+    ).filter(Trade.trading_day.isnot(None), *filters).order_by(Trade.acc_id, Trade.symbol, month).all()
+    if not rows:
+        return []
+
+    accounts, symbols, months, pnl, entry_times, exit_times = zip(*rows)
+    metrics = {
+        'pnl': np.array([float(p) for p in pnl]),
+        'holding_minutes': (np.array(exit_times, dtype='datetime64[us]') - np.array(entry_times, dtype='datetime64[us]'))
+                           / np.timedelta64(1, 'm'),
+    }
+    # rows are sorted by key, so each (account, symbol, month) is one contiguous run
+    keys = list(zip(accounts, symbols, months))
+    starts = [0] + [i for i in range(1, len(keys)) if keys[i] != keys[i - 1]] + [len(keys)]
+
+    result = []
+    for start, end in zip(starts[:-1], starts[1:]):
+        acc_id, symbol, month_start = keys[start]
+        for metric, values in metrics.items():
+            digest = TDigest.from_values(values[start:end])
+            result.append({
+                'acc_id': acc_id, 'symbol': symbol, 'month': month_start, 'metric': metric,
+                'count': digest.count, 'total': digest.total, 'min_value': digest.min_value,
+                'max_value': digest.max_value, 'centroids': digest.to_bytes(),
+            })
+    return result
+
+
+def refresh_sketches(keys: Iterable[Tuple[str, str, date]]) -> None:
+    """Re-sketch the months of the given (acc_id, symbol, trading_day) keys. Does not commit."""
+    months = {(acc_id, symbol, day.replace(day=1)) for acc_id, symbol, day in keys}
+    if not months:
+        return
+    TradeSketch.query.filter(
+        db.tuple_(TradeSketch.acc_id, TradeSketch.symbol, TradeSketch.month).in_(months)
+    ).delete(synchronize_session=False)
+    rows = _sketch_rows([db.tuple_(Trade.acc_id, Trade.symbol, _month(Trade.trading_day)).in_(months)])
+    if rows:
+        db.session.execute(db.insert(TradeSketch), rows)
+
+
+def rebuild_sketches() -> int:
+    """
+    Recompute every sketch from trades. Does not commit.
+
+    Returns:
+        number of sketch rows written
+    """
+    TradeSketch.query.delete(synchronize_session=False)
+    rows = _sketch_rows([])
+    if rows:
+        db.session.execute(db.insert(TradeSketch), rows)
+    return len(rows)
+
+
+def load_digest(metric: str, acc_id: str = None, symbol: str = None, start_day: date = None,
+                end_day: date = None) -> TDigest:
+    """
+    Merge the sketches of metric over the trading months overlapping
+    [start_day, end_day] (whole months: the month is the sketch grain).
+    """
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric: {metric}")
+    query = TradeSketch.query.filter(TradeSketch.metric == metric)
+    if acc_id:
+        query = query.filter(TradeSketch.acc_id == acc_id)
+    if symbol:
+        query = query.filter(TradeSketch.symbol == symbol)
+    if start_day:
+        query = query.filter(TradeSketch.month >= start_day.replace(day=1))
+    if end_day:
+        query = query.filter(TradeSketch.month <= end_day)
+    return TDigest.merge(TDigest.from_row(row) for row in query.all())
+
+
+def distribution(digest: TDigest, percentiles: Sequence[float], bins: int) -> Optional[Dict]:
+    """Summary, percentiles and histogram of a merged digest (None when empty)."""
+    if not digest.count:
+        return None
+    return {
+        'count': digest.count,
+        'mean': round(digest.total / digest.count, 2),
+        'min': round(digest.min_value, 2),
+        'max': round(digest.max_value, 2),
+        'percentiles': {
+            f'p{p:g}': round(float(value), 2)
+            for p, value in zip(percentiles, digest.quantiles(np.asarray(percentiles) / 100))
+        },
+        'histogram': digest.histogram(bins),
+    }
@@ -0,0 +1,298 @@
+"""
+Exchange session calendars.
+
+A trading day ends at the exchange's daily roll (CME Globex reopens at 5pm CT,
+3pm in Los Angeles): anything filled after the roll belongs to the next
+trading day. Weekends and exchange holidays are not trading days, so a fill in
+the Sunday evening session - or in the shortened session on MLK day - counts
+toward the next business day.
+
+Each calendar precomputes the end boundary of every trading day over a span of
+years, localized day by day in the exchange timezone (so DST transitions land
+on the right date) and converted to the storage timezone: stored timestamps
+are naive Los Angeles wall-clock time. Looking up the trading day of a
+timestamp is then a bisect over that list, and trading_days() buckets a whole
+array of timestamps with one numpy searchsorted call. Timestamps outside the
+precomputed span widen it on first use.
+
+Usage:
+    calendar = calendar_for_symbol('MNQH6')
+    calendar.trading_day(datetime(2026, 1, 19, 8, 30))   # MLK day -> 2026-01-20
+    calendar.bounds(date(2026, 1, 1), date(2026, 1, 31))
+"""
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+import re
+import threading
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+import numpy as np
+import pytz
+
+STORAGE_TIMEZONE = 'America/Los_Angeles'
+DEFAULT_YEARS = (2010, 2035)
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """n-th (1-based) weekday of a month; n = -1 for the last one."""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = (date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _easter(year: int) -> date:
+    """Gregorian Easter Sunday (anonymous Gregorian algorithm)."""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _observed(day: date, saturday_to_friday: bool = True) -> Optional[date]:
+    """Weekend holidays move to Friday (Saturday) or Monday (Sunday)."""
+    if day.weekday() == 5:
+        return day - timedelta(days=1) if saturday_to_friday else None
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+def cme_holidays(year: int) -> Set[date]:
+    """
+    Dates that are not CME trade dates.
+
+    Includes the early-halt holidays (MLK, Presidents, Memorial, Juneteenth,
+    July 4th, Labor, Thanksgiving): Globex trades part of those days, but the
+    session rolls into the next trade date.
+    """
+    days = {
+        _observed(date(year, 1, 1), saturday_to_friday=False),  # Dec 31 stays a trading day
+        _nth_weekday(year, 1, 0, 3),    # MLK day
+        _nth_weekday(year, 2, 0, 3),    # Presidents day
+        _easter(year) - timedelta(days=2),  # Good Friday
+        _nth_weekday(year, 5, 0, -1),   # Memorial day
+        _observed(date(year, 7, 4)),
+        _nth_weekday(year, 9, 0, 1),    # Labor day
+        _nth_weekday(year, 11, 3, 4),   # Thanksgiving
+        _observed(date(year, 12, 25)),
+    }
+    if year >= 2022:
+        days.add(_observed(date(year, 6, 19)))
+    days.discard(None)
+    return days
+
+
+def cme_early_closes(year: int, close: time) -> Dict[date, time]:
+    """Trade dates with a shortened day session: day after Thanksgiving, Christmas Eve, July 3rd."""
+    days = {_nth_weekday(year, 11, 3, 4) + timedelta(days=1)}
+    for day in (date(year, 12, 24), date(year, 7, 3)):
+        if day.weekday() < 5:
+            days.add(day)
+    holidays = cme_holidays(year)
+    return {day: close for day in days if day not in holidays}
+
+
+class SessionCalendar:
+    """
+    Args:
+        name: registry name
+        timezone: exchange timezone the session times are defined in
+        roll_time: time the next trading day starts (end of the current one, inclusive)
+        close_time: regular close of the day session, for session_close()
+        holidays: year -> set of non-trading dates
+        early_closes: year -> {date: shortened close time}
+        weekdays: weekdays that can be trading days (Monday = 0)
+        years: (first, last) year to precompute; lookups outside it widen the span
+        storage_timezone: timezone of the naive timestamps being looked up
+    """
+
+    def __init__(self, name: str, timezone: str, roll_time: time, close_time: time = None,
+                 holidays=None, early_closes=None, weekdays: Iterable[int] = range(5),
+                 years: Tuple[int, int] = DEFAULT_YEARS, storage_timezone: str = STORAGE_TIMEZONE):
+        self.name = name
+        self.timezone = timezone
+        self.storage_timezone = storage_timezone
+        self.roll_time = roll_time
+        self.close_time = close_time or roll_time
+        self.holidays = holidays
+        self.early_closes = early_closes
+        self.weekdays = set(weekdays)
+        self._lock = threading.Lock()
+        self._build(years)
+
+    def _to_storage(self, day: date, at: time) -> datetime:
+        if self.timezone == self.storage_timezone:
+            return datetime.combine(day, at)
+        local = pytz.timezone(self.timezone).localize(datetime.combine(day, at))
+        return local.astimezone(pytz.timezone(self.storage_timezone)).replace(tzinfo=None)
+
+    def _build(self, years: Tuple[int, int]):
+        days, ends, closes = [], [], []
+        for year in range(years[0], years[1] + 1):
+            off = self.holidays(year) if self.holidays else set()
+            shortened = self.early_closes(year) if self.early_closes else {}
+            day = date(year, 1, 1)
+            while day.year == year:
+                if day.weekday() in self.weekdays and day not in off:
+                    end = self._to_storage(day, self.roll_time)
+                    # close and roll are both afternoon times, past any DST switch that day
+                    close = datetime.combine(day, shortened.get(day, self.close_time))
+                    days.append(day)
+                    ends.append(end)
+                    closes.append(end + (close - datetime.combine(day, self.roll_time)))
+                day += timedelta(days=1)
+
+        # readers only ever see a complete set of arrays
+        self._days, self._ends, self._closes = days, ends, closes
+        self._index = {day: i for i, day in enumerate(days)}
+        self._days64 = np.array(days, dtype='datetime64[D]')
+        self._ends64 = np.array(ends, dtype='datetime64[us]')
+        self.years = years
+
+    def _cover(self, first_year: int, last_year: int):
+        """Widen the precomputed span (with a year of margin) to include first_year..last_year."""
+        if self.years[0] < first_year and last_year < self.years[1]:
+            return
+        with self._lock:
+            years = (min(self.years[0], first_year - 1), max(self.years[1], last_year + 1))
+            if years != self.years:
+                self._build(years)
+
+    def __repr__(self):
+        return f"SessionCalendar({self.name!r}, {self.years[0]}-{self.years[1]})"
+
+    def is_trading_day(self, day: date) -> bool:
+        self._cover(day.year, day.year)
+        return day in self._index
+
+    def trading_day(self, ts: datetime) -> date:
+        """
+        Trading day of a timestamp, by bisect over the precomputed ends.
+        Naive timestamps are storage-timezone wall-clock time.
+        """
+        if ts.tzinfo is not None:
+            ts = ts.astimezone(pytz.timezone(self.storage_timezone)).replace(tzinfo=None)
+        self._cover(ts.year, ts.year)
+        return self._days[bisect_left(self._ends, ts)]
+
+    def trading_days(self, timestamps) -> np.ndarray:
+        """
+        Vectorized trading_day(): one searchsorted over the whole array.
+
+        Args:
+            timestamps: naive storage-timezone datetimes (list or datetime64 array);
+                        None/NaT stays NaT
+
+        Returns:
+            numpy datetime64[D] array (call .tolist() for dates)
+        """
+        ts = np.asarray(timestamps, dtype='datetime64[us]')
+        valid = ~np.isnat(ts)
+        out = np.full(ts.shape, np.datetime64('NaT'), dtype='datetime64[D]')
+        if not valid.any():
+            return out
+        years = ts[valid].astype('datetime64[Y]').astype(int) + 1970
+        self._cover(int(years.min()), int(years.max()))
+        out[valid] = self._days64[np.searchsorted(self._ends64, ts[valid], side='left')]
+        return out
+
+    def session_end(self, day: date) -> datetime:
+        """Inclusive end of a trading day (the roll) in storage time."""
+        self._cover(day.year, day.year)
+        return self._ends[self._index[day]]
+
+    def session_close(self, day: date) -> datetime:
+        """Close of the trading day's day session in storage time, early closes included."""
+        self._cover(day.year, day.year)
+        return self._closes[self._index[day]]
+
+    def bounds(self, start_day: date, end_day: date) -> Tuple[datetime, datetime]:
+        """
+        Timestamp bounds covering trading days start_day..end_day inclusive.
+        Non-trading endpoints are narrowed to the trading days inside the range.
+
+        Returns:
+            (exclusive_start, inclusive_end) - filter with ts > start and ts <= end
+        """
+        self._cover(start_day.year, end_day.year)
+        first = bisect_left(self._days, start_day)
+        last = bisect_right(self._days, end_day) - 1
+        if last < first:
+            # no trading day in range - an empty interval at the next roll
+            return self._ends[first - 1], self._ends[first - 1]
+        return self._ends[first - 1], self._ends[last]
+
+    def trading_days_between(self, start_day: date, end_day: date) -> list:
+        """Trading days in start_day..end_day inclusive."""
+        self._cover(start_day.year, end_day.year)
+        return self._days[bisect_left(self._days, start_day):bisect_right(self._days, end_day)]
+
+
+CME_ROLL = time(17, 0)    # Globex reopen, 5pm CT
+CME_CLOSE = time(16, 0)   # day session close, 4pm CT
+
+CALENDAR_SPECS = {
+    # legacy journal behaviour: every calendar day is a trading day, rolling at 3pm PT
+    'LEGACY': dict(timezone=STORAGE_TIMEZONE, roll_time=time(15, 0), weekdays=range(7)),
+    'CME_EQUITY': dict(timezone='America/Chicago', roll_time=CME_ROLL, close_time=CME_CLOSE,
+                       holidays=cme_holidays, early_closes=lambda year: cme_early_closes(year, time(12, 15))),
+    'CME_COMMODITY': dict(timezone='America/Chicago', roll_time=CME_ROLL, close_time=CME_CLOSE,
+                          holidays=cme_holidays, early_closes=lambda year: cme_early_closes(year, time(12, 45))),
+}
+
+# product root -> calendar; anything else trades on the CME equity calendar
+PRODUCT_CALENDARS = {
+    **{root: 'CME_EQUITY' for root in ('ES', 'MES', 'NQ', 'MNQ', 'YM', 'MYM', 'RTY', 'M2K', 'NKD')},
+    **{root: 'CME_COMMODITY' for root in ('GC', 'MGC', 'SI', 'SIL', 'HG', 'CL', 'MCL', 'NG', 'QM')},
+}
+
+# calendar behind trades.trading_day - the daily_pnl rollup and every trading-day
+# filter follow it. After changing it, recompute the column:
+#   python -m app.scripts.rebuild_daily_pnl --recompute-trading-days
+TRADING_DAY_CALENDAR = 'LEGACY'
+
+_CONTRACT_SUFFIX = re.compile(r'^/?([A-Z0-9]+?)([FGHJKMNQUVXZ]\d{1,2})?$')
+
+
+def product_root(symbol: str) -> str:
+    """'MNQH6' / '/MNQ' / 'MNQ' -> 'MNQ'."""
+    match = _CONTRACT_SUFFIX.match((symbol or '').upper())
+    return match.group(1) if match else (symbol or '').upper()
+
+
+@lru_cache(maxsize=None)
+def get_calendar(name: str = 'LEGACY') -> SessionCalendar:
+    """Built once per process, on first use."""
+    if name not in CALENDAR_SPECS:
+        raise ValueError(f"Unknown session calendar: {name}")
+    return SessionCalendar(name, **CALENDAR_SPECS[name])
+
+
+@lru_cache(maxsize=None)
+def daily_calendar(close_hour: int = 15, timezone: str = STORAGE_TIMEZONE) -> SessionCalendar:
+    """
+    Every-day calendar rolling at close_hour, for naive timestamps in timezone
+    (the get_trading_day() model).
+    """
+    if close_hour == 15 and timezone == STORAGE_TIMEZONE:
+        return get_calendar('LEGACY')
+    return SessionCalendar(f'DAILY_{close_hour}_{timezone}', timezone=timezone, roll_time=time(close_hour, 0),
+                           weekdays=range(7), storage_timezone=timezone)
+
+
+def calendar_for_symbol(symbol: str) -> SessionCalendar:
+    return get_calendar(PRODUCT_CALENDARS.get(product_root(symbol), 'CME_EQUITY'))
+
+
+def trading_day_calendar() -> SessionCalendar:
+    """The calendar trades.trading_day is computed with."""
+    return get_calendar(TRADING_DAY_CALENDAR)
@@ -0,0 +1,183 @@
+"""
+Group-by analytics cube.
+
+daily_cube holds trades pre-aggregated at the finest grain analytics slice on
+(account, symbol, trading day, direction, strategy, trade_type), and
+daily_tag_cube the same rows further split by tag. Any combination of
+dimensions and filters - "PnL by strategy for MNQ shorts last quarter" - is
+then a GROUP BY over these partial aggregates instead of a scan of trades.
+
+Rows are refreshed with daily_pnl (refresh_daily_pnl), for the same
+(account, symbol, trading day) keys and in the same transaction.
+"""
+from datetime import date
+from typing import Dict, Iterable, List, Tuple
+
+from app.db.models import db, Trade, DailyCube, DailyTagCube
+from app.services.session_calendar import product_root
+
+# group-by dimensions; root is the product (MNQ for MNQH6)
+DIMENSIONS = ['account', 'symbol', 'root', 'direction', 'strategy', 'trade_type', 'tag', 'day', 'week', 'month', 'year']
+FILTER_DIMENSIONS = ['account', 'symbol', 'root', 'direction', 'strategy', 'trade_type', 'tag']
+
+_TIME_GRAINS = {'week': 'week', 'month': 'month', 'year': 'year'}
+
+_CUBE_COLUMNS = ['acc_id', 'symbol', 'trading_day', 'direction', 'strategy', 'trade_type',
+                 'pnl', 'trade_count', 'wins', 'losses', 'gross_win', 'gross_loss', 'quantity']
+
+
+def _measures():
+    return [
+        db.func.sum(Trade.pnl),
+        db.func.count(Trade.id),
+        db.func.sum(db.case((Trade.pnl > 0, 1), else_=0)),
+        db.func.sum(db.case((Trade.pnl < 0, 1), else_=0)),
+        db.func.sum(db.case((Trade.pnl > 0, Trade.pnl), else_=0)),
+        db.func.sum(db.case((Trade.pnl < 0, Trade.pnl), else_=0)),
+        db.func.sum(Trade.quantity),
+    ]
+
+
+def _cube_select(tagged: bool = False):
+    """Aggregate trades to cube rows (tag last when tagged)."""
+    dimensions = [
+        Trade.acc_id, Trade.symbol, Trade.trading_day, Trade.direction,
+        db.func.coalesce(Trade.strategy, ''), db.func.coalesce(Trade.trade_type, ''),
+    ]
+    if not tagged:
+        return db.select(*dimensions, *_measures()).where(Trade.trading_day.isnot(None)).group_by(*dimensions)
+
+    # one row per (trade, distinct tag) - ["a", "a"] counts once under a; LEFT JOIN
+    # keeps untagged trades with a NULL tag
+    elements = db.func.json_array_elements_text(
+        db.case((db.func.json_typeof(Trade.tags) == 'array', Trade.tags))
+    ).table_valued('value')
+    tags = db.select(elements.c.value).distinct().lateral('tag')
+    tag = db.func.coalesce(tags.c.value, '')
+    return db.select(*dimensions, *_measures(), tag).select_from(Trade).outerjoin(tags, db.true()) \
+        .where(Trade.trading_day.isnot(None)).group_by(*dimensions, tag)
+
+
+def _insert_from(select, tagged: bool):
+    model = DailyTagCube if tagged else DailyCube
+    columns = _CUBE_COLUMNS + ['tag'] if tagged else _CUBE_COLUMNS
+    db.session.execute(db.insert(model).from_select(columns, select))
+
+
+def refresh_cube(keys: Iterable[Tuple[str, str, date]]) -> None:
+    """Recompute the cube rows of the given (acc_id, symbol, trading_day) keys. Does not commit."""
+    keys = set(keys)
+    if not keys:
+        return
+    for tagged, model in ((False, DailyCube), (True, DailyTagCube)):
+        model.query.filter(
+            db.tuple_(model.acc_id, model.symbol, model.trading_day).in_(keys)
+        ).delete(synchronize_session=False)
+        _insert_from(_cube_select(tagged).where(db.tuple_(Trade.acc_id, Trade.symbol, Trade.trading_day).in_(keys)),
+                     tagged)
+
+
+def rebuild_cube() -> None:
+    """Recompute both cube tables from trades. Does not commit."""
+    for tagged, model in ((False, DailyCube), (True, DailyTagCube)):
+        model.query.delete(synchronize_session=False)
+        _insert_from(_cube_select(tagged), tagged)
+
+
+def _root_expression(model, roots: Dict[str, str]):
+    """product_root(symbol) as SQL: a CASE over the (few) distinct symbols in the cube."""
+    return db.case(roots, value=model.symbol, else_=model.symbol) if roots else model.symbol
+
+
+def _dimension_expression(model, dimension: str, roots: Dict[str, str]):
+    if dimension == 'account':
+        return model.acc_id
+    if dimension == 'root':
+        return _root_expression(model, roots)
+    if dimension == 'day':
+        return model.trading_day
+    if dimension in _TIME_GRAINS:
+        return db.cast(db.func.date_trunc(_TIME_GRAINS[dimension], model.trading_day), db.Date)
+    return getattr(model, dimension)
+
+
+def query_cube(group_by: List[str], filters: Dict[str, List[str]] = None,
+               start_day: date = None, end_day: date = None) -> List[Dict]:
+    """
+    Roll the cube up to the group_by dimensions.
+
+    Args:
+        group_by: dimensions from DIMENSIONS (may be empty for a grand total)
+        filters: dimension -> accepted values, for FILTER_DIMENSIONS
+        start_day / end_day: trading-day range (inclusive)
+
+    Grouping or filtering by tag reads daily_tag_cube, where a trade counts
+    once per tag it carries (untagged trades have tag None).
+    """
+    filters = {dim: values for dim, values in (filters or {}).items() if values}
+    unknown = [dim for dim in group_by if dim not in DIMENSIONS] + \
+              [dim for dim in filters if dim not in FILTER_DIMENSIONS]
+    if unknown:
+        raise ValueError(f"Unknown dimension(s): {', '.join(unknown)}")
+
+    model = DailyTagCube if 'tag' in group_by or 'tag' in filters else DailyCube
+    roots = {}
+    if 'root' in group_by or 'root' in filters:
+        roots = {symbol: product_root(symbol) for symbol, in db.session.query(model.symbol).distinct()}
+
+    conditions = []
+    if start_day:
+        conditions.append(model.trading_day >= start_day)
+    if end_day:
+        conditions.append(model.trading_day <= end_day)
+    for dim, values in filters.items():
+        if dim == 'root':
+            wanted = {value.upper() for value in values}
+            conditions.append(model.symbol.in_([s for s, root in roots.items() if root in wanted]))
+        elif dim == 'direction':
+            conditions.append(db.func.upper(model.direction).in_([value.upper() for value in values]))
+        else:
+            conditions.append(_dimension_expression(model, dim, roots).in_(values))
+
+    keys = [_dimension_expression(model, dim, roots).label(dim) for dim in group_by]
+    rows = db.session.query(
+        *keys,
+        db.func.sum(model.pnl).label('pnl'),
+        db.func.sum(model.trade_count).label('trade_count'),
+        db.func.sum(model.wins).label('winning_trades'),
+        db.func.sum(model.losses).label('losing_trades'),
+        db.func.sum(model.gross_win).label('gross_win'),
+        db.func.sum(model.gross_loss).label('gross_loss'),
+        db.func.sum(model.quantity).label('quantity'),
+        db.func.count(db.distinct(model.trading_day)).label('trading_days')
+    ).filter(*conditions).group_by(*keys).order_by(*keys).all()
+
+    result = []
+    for row in rows:
+        if not row.trade_count:
+            continue
+        values = row._asdict()
+        cell = {dim: _dimension_value(values[dim]) for dim in group_by}
+        count = int(row.trade_count)
+        gross_loss = float(row.gross_loss)
+        cell.update({
+            'pnl': round(float(row.pnl), 2),
+            'trade_count': count,
+            'winning_trades': int(row.winning_trades),
+            'losing_trades': int(row.losing_trades),
+            'win_rate': round(int(row.winning_trades) / count * 100, 2),
+            'avg_pnl': round(float(row.pnl) / count, 2),
+            'gross_win': round(float(row.gross_win), 2),
+            'gross_loss': round(gross_loss, 2),
+            'profit_factor': round(float(row.gross_win) / -gross_loss, 2) if gross_loss else None,
+            'quantity': int(row.quantity),
+            'trading_days': row.trading_days,
+        })
+        result.append(cell)
+    return result
+
+
+def _dimension_value(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    return value if value != '' else None
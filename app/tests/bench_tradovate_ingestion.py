@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Benchmark Tradovate ingestion end to end against the local stub.
+
+Each run:
+1. Wipes trades, orders (with their child fills and order_links) and every
+   table derived from trades in the test database, as wipe.py does
+2. Calls POST /api/trades/import/tradovate (auth → fill/list → contract/item → save → match)
+3. Times the whole request
+
+Reports fills/sec and p50/p95 import latency across runs.
+
+Usage:
+    python -m app.tests.bench_tradovate_ingestion --fills 5000 --runs 5
+    python -m app.tests.bench_tradovate_ingestion --replay recording.json --latency-ms 40 --error-rate 0.01
+"""
+
+import argparse
+import math
+import os
+import sys
+import time
+
+# Add the project root to the path (go up two levels from tests folder)
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from flask import Flask
+from app.db.models import db, Trade, Order, OrderFill, OrderLink
+from app.services.daily_pnl import rebuild_daily_pnl
+from app.api.trades import trade_bp
+from app.ingestion import tradovate
+from app.tests.tradovate_stub import create_stub_app, synthetic_payloads, load_payloads, StubServer
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100.0 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def run_benchmark(payloads, runs=3, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0,
+                  database_url='postgresql://desmondjung@localhost/trading_journal_test'):
+    server = StubServer(create_stub_app(payloads, latency_ms, jitter_ms, error_rate)).start()
+    tradovate.BASE_URL = server.base_url
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_url
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        'connect_args': {'options': '-csearch_path=trade'}
+    }
+    db.init_app(app)
+    app.register_blueprint(trade_bp)
+    client = app.test_client()
+
+    num_fills = len(payloads.get('fills', []))
+    latencies = []
+    results = []
+
+    try:
+        with app.app_context():
+            db.create_all()
+
+        for run in range(1, runs + 1):
+            with app.app_context():
+                # every run starts from empty tables, so later runs time inserts, not no-op upserts
+                Trade.query.delete()
+                OrderFill.query.delete()
+                Order.query.delete()
+                OrderLink.query.delete()
+                rebuild_daily_pnl()   # daily_pnl, analytics cube, sketches
+                db.session.commit()
+
+            start = time.perf_counter()
+            response = client.post('/api/trades/import/tradovate', json={'auto_match': True})
+            elapsed = time.perf_counter() - start
+
+            data = response.get_json() or {}
+            latencies.append(elapsed)
+            results.append(data)
+            print(f"  Run {run}: {elapsed:.3f}s, status {response.status_code}, "
+                  f"{data.get('orders_saved', 0)} orders, {data.get('trades_created', 0)} trades, "
+                  f"{len(data.get('errors', []))} errors")
+    finally:
+        server.stop()
+
+    total_time = sum(latencies)
+    summary = {
+        'fills': num_fills,
+        'runs': runs,
+        'fills_per_sec': (num_fills * runs / total_time) if total_time else 0.0,
+        'p50_latency': percentile(latencies, 50),
+        'p95_latency': percentile(latencies, 95),
+        'max_latency': max(latencies) if latencies else 0.0,
+        'stub_requests': server.request_counts
+    }
+    return summary, results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark Tradovate ingestion against the stub server')
+    parser.add_argument('--fills', type=int, default=1000, help='number of synthetic fills')
+    parser.add_argument('--accounts', type=int, default=1, help='number of synthetic accounts')
+    parser.add_argument('--replay', help='use a recorded session instead of synthetic data')
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--database-url', default='postgresql://desmondjung@localhost/trading_journal_test')
+    args = parser.parse_args()
+
+    if args.replay:
+        payloads = load_payloads(args.replay)
+    else:
+        payloads = synthetic_payloads(args.fills, accounts=tuple(5551001 + i for i in range(args.accounts)))
+
+    print("="*80)
+    print(f"⏱️  BENCHMARKING TRADOVATE INGESTION ({len(payloads['fills'])} fills, {args.runs} runs)")
+    print("="*80)
+
+    summary, _ = run_benchmark(
+        payloads, runs=args.runs, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate, database_url=args.database_url
+    )
+
+    print(f"\n📊 Results:")
+    print(f"  - Fills/sec: {summary['fills_per_sec']:.1f}")
+    print(f"  - p50 latency: {summary['p50_latency']:.3f}s")
+    print(f"  - p95 latency: {summary['p95_latency']:.3f}s")
+    print(f"  - Max latency: {summary['max_latency']:.3f}s")
+    print(f"  - Stub requests: {summary['stub_requests']}")
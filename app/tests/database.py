@@ -0,0 +1,54 @@
+"""
+Postgres-backed test case, for code that needs the real schema (the trade
+schema, JSON/ARRAY columns, window functions).
+
+Tests run against TEST_DATABASE_URL (default: the local trading_journal_test
+database test_csv_import.py uses). Tables are created before and dropped after
+each test; the whole class is skipped when the database isn't reachable.
+Subclasses list the API blueprints they call through self.client.
+"""
+
+import os
+import unittest
+
+from flask import Flask
+
+from app.db.models import db
+
+TEST_DATABASE_URL = os.environ.get('TEST_DATABASE_URL', 'postgresql://desmondjung@localhost/trading_journal_test')
+
+
+class DatabaseTestCase(unittest.TestCase):
+    """unittest.TestCase with an app context and empty tables for every test"""
+
+    blueprints = ()
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = Flask(__name__)
+        cls.app.config['TESTING'] = True
+        cls.app.config['SQLALCHEMY_DATABASE_URI'] = TEST_DATABASE_URL
+        cls.app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+        cls.app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+            'connect_args': {'options': '-csearch_path=trade'}
+        }
+        for blueprint in cls.blueprints:
+            cls.app.register_blueprint(blueprint)
+        try:
+            db.init_app(cls.app)
+            with cls.app.app_context():
+                db.session.execute(db.text('CREATE SCHEMA IF NOT EXISTS trade'))
+                db.session.commit()
+        except Exception as e:
+            raise unittest.SkipTest(f"Test database not available: {str(e).splitlines()[0]}")
+
+    def setUp(self):
+        self.context = self.app.app_context()
+        self.context.push()
+        db.create_all()
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.context.pop()
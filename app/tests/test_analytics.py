@@ -0,0 +1,282 @@
+import math
+import statistics
+import unittest
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from app.db.models import db, DailyPnl
+from app.services.analytics import (TradeArrays, performance, heatmap, rolling_stats, downsample_indices, lttb_indices,
+                                    drawdown_anchor_indices, drawdown_series, sequence_stats,
+                                    correlation_matrix, daily_pnl_matrix)
+from app.tests.database import DatabaseTestCase
+
+
+def make_trades(pnls, days):
+    """TradeArrays from per-trade pnl and trading day (one exit a minute apart)."""
+    start = datetime(2026, 1, 5, 6, 30)
+    return TradeArrays(
+        ids=[f't{i}' for i in range(len(pnls))],
+        entry_times=np.array([start + timedelta(minutes=i) for i in range(len(pnls))], dtype='datetime64[us]'),
+        exit_times=np.array([start + timedelta(minutes=i + 1) for i in range(len(pnls))], dtype='datetime64[us]'),
+        trading_days=np.array(days, dtype='datetime64[D]'),
+        pnl=np.array(pnls, dtype=np.float64),
+        acc_ids=np.array(['1'] * len(pnls), dtype=object),
+        symbols=np.array(['MNQH6'] * len(pnls), dtype=object),
+    )
+
+
+class TestPerformance(unittest.TestCase):
+    """Vectorized performance metrics against hand-computed values"""
+
+    def setUp(self):
+        d1, d2, d3, d4 = date(2026, 1, 5), date(2026, 1, 6), date(2026, 1, 7), date(2026, 1, 8)
+        self.trades = make_trades([100, -50, -80, 30, 0, 120, -40],
+                                  [d1, d1, d2, d2, d3, d3, d4])
+
+    def test_summary(self):
+        summary = performance(self.trades)['summary']
+        self.assertEqual(summary['total_pnl'], 80)
+        self.assertEqual((summary['winning_trades'], summary['losing_trades'], summary['breakeven_trades']), (3, 3, 1))
+        self.assertEqual(summary['profit_factor'], round(250 / 170, 2))
+        self.assertEqual(summary['expectancy'], round(80 / 7, 2))
+
+    def test_drawdown(self):
+        summary = performance(self.trades)['summary']
+        # equity 100, 50, -30, 0, 0, 120, 80: peak 100 -> trough -30, recovered at 120
+        self.assertEqual(summary['max_drawdown'], -130)
+        self.assertEqual(summary['max_drawdown_peak'], '2026-01-05')
+        self.assertEqual(summary['max_drawdown_trough'], '2026-01-06')
+        self.assertEqual(summary['max_drawdown_recovery'], '2026-01-07')
+        self.assertEqual(summary['max_drawdown_duration_trades'], 4)
+        # daily equity 50, 0, 120, 80
+        self.assertEqual(summary['max_drawdown_duration_days'], 1)
+
+    def test_sharpe_sortino(self):
+        summary = performance(self.trades)['summary']
+        daily = [50, -50, 120, -40]
+        sharpe = statistics.mean(daily) / statistics.stdev(daily) * math.sqrt(252)
+        downside = math.sqrt(sum(min(r, 0) ** 2 for r in daily) / len(daily))
+        self.assertAlmostEqual(summary['sharpe'], round(sharpe, 3))
+        self.assertAlmostEqual(summary['sortino'], round(statistics.mean(daily) / downside * math.sqrt(252), 3))
+
+    def test_no_losses(self):
+        summary = performance(make_trades([10, 20], [date(2026, 1, 5)] * 2))['summary']
+        self.assertIsNone(summary['profit_factor'])
+        self.assertEqual(summary['max_drawdown'], 0)
+        self.assertIsNone(summary['max_drawdown_peak'])
+        self.assertIsNone(summary['sharpe'])
+
+
+class TestHeatmap(unittest.TestCase):
+    """Weekday / entry hour cells and holding-duration buckets"""
+
+    def test_cells_and_durations(self):
+        trades = make_trades([100, -50, 30], [date(2026, 1, 5), date(2026, 1, 5), date(2026, 1, 9)])
+        trades.entry_times[2] = np.datetime64('2026-01-08T16:10')  # overnight entry, Friday's trading day
+        trades.exit_times[2] = np.datetime64('2026-01-08T16:30')
+        result = heatmap(trades)
+        cells = {(c['day'], c['hour']): c for c in result['cells']}
+        self.assertEqual(set(cells), {('Monday', 6), ('Friday', 16)})
+        self.assertEqual(cells[('Monday', 6)]['pnl'], 50)
+        self.assertEqual(cells[('Monday', 6)]['win_rate'], 50)
+        durations = {d['bucket']: d['trade_count'] for d in result['durations']}
+        self.assertEqual(durations['1-5m'], 2)
+        self.assertEqual(durations['15-30m'], 1)
+        self.assertEqual(sum(durations.values()), 3)
+
+
+class TestRolling(unittest.TestCase):
+    """Cumulative-sum rolling windows against recomputing each window"""
+
+    def test_matches_brute_force(self):
+        rng = np.random.default_rng(7)
+        pnl = np.round(rng.normal(0, 50, 300), 2)
+        stats = rolling_stats(pnl, 20)
+        self.assertEqual(len(stats['win_rate']), 281)
+        for k in (0, 137, 280):
+            window = pnl[k:k + 20]
+            wins, losses = window[window > 0], window[window < 0]
+            self.assertAlmostEqual(stats['win_rate'][k], len(wins) / 20 * 100)
+            self.assertAlmostEqual(stats['avg_win'][k], wins.mean())
+            self.assertAlmostEqual(stats['avg_loss'][k], losses.mean())
+            self.assertAlmostEqual(stats['expectancy'][k], window.mean())
+            self.assertAlmostEqual(stats['profit_factor'][k], wins.sum() / -losses.sum())
+
+    def test_empty_ratios_and_short_series(self):
+        stats = rolling_stats(np.array([10.0, 5.0, -1.0]), 2)
+        self.assertTrue(np.isnan(stats['profit_factor'][0]))
+        self.assertTrue(np.isnan(stats['avg_loss'][0]))
+        self.assertEqual(len(rolling_stats(np.array([1.0]), 2)['expectancy']), 0)
+
+    def test_downsample_keeps_ends(self):
+        series = np.random.default_rng(1).normal(size=10000)
+        indices = downsample_indices([series], 500)
+        self.assertLessEqual(len(indices), 502)
+        self.assertEqual((indices[0], indices[-1]), (0, 9999))
+        self.assertEqual(len(downsample_indices([series[:10]], 500)), 10)
+
+
+class TestSequence(unittest.TestCase):
+    """Streak / nth-trade / revenge statistics against the dashboard's loops"""
+
+    def setUp(self):
+        rng = np.random.default_rng(11)
+        pnls = rng.choice([-20.0, 0.0, 15.0, 40.0], size=400, p=[0.45, 0.05, 0.3, 0.2])
+        days = np.repeat(np.arange(np.datetime64('2026-01-05'), np.datetime64('2026-03-05')), 7)[:400]
+        self.trades = make_trades(pnls, days)
+        self.trades.quantities = rng.integers(1, 4, size=400)
+        self.stats = sequence_stats(self.trades)
+
+    def test_after_streaks(self):
+        pnl = self.trades.pnl.tolist()
+        for n in range(1, 5):
+            after_wins = [pnl[i] for i in range(n, len(pnl)) if all(p > 0 for p in pnl[i - n:i])]
+            after_losses = [pnl[i] for i in range(n, len(pnl)) if all(p < 0 for p in pnl[i - n:i])]
+            self.assertEqual(self.stats['streaks']['after_wins'][n - 1]['trade_count'], len(after_wins))
+            self.assertAlmostEqual(self.stats['streaks']['after_wins'][n - 1]['pnl'], sum(after_wins))
+            self.assertEqual(self.stats['streaks']['after_losses'][n - 1]['trade_count'], len(after_losses))
+            self.assertAlmostEqual(self.stats['streaks']['after_losses'][n - 1]['pnl'], sum(after_losses))
+
+    def test_longest_streaks(self):
+        signs = ''.join('w' if p > 0 else 'l' if p < 0 else '-' for p in self.trades.pnl)
+        self.assertEqual(self.stats['streaks']['longest_win']['length'], max(len(r) for r in signs.replace('l', '-').split('-')))
+        self.assertEqual(self.stats['streaks']['longest_loss']['length'], max(len(r) for r in signs.replace('w', '-').split('-')))
+
+    def test_nth_trade_and_revenge(self):
+        by_day = {}
+        for i, day in enumerate(self.trades.trading_days.tolist()):
+            by_day.setdefault(day, []).append(i)
+        firsts = [ids[0] for ids in by_day.values()]
+        self.assertEqual(self.stats['first_trade_of_day']['trade_count'], len(firsts))
+        self.assertAlmostEqual(self.stats['first_trade_of_day']['pnl'], sum(self.trades.pnl[firsts]))
+        self.assertEqual(self.stats['nth_trade_of_day'][4]['trade_count'], sum(max(len(ids) - 4, 0) for ids in by_day.values()))
+
+        # trades are a minute apart and each entered when the previous one exits, so
+        # every trade after a same-day loss is a quick re-entry
+        after_loss = [i for ids in by_day.values() for prev, i in zip(ids, ids[1:]) if self.trades.pnl[prev] < 0]
+        sized_up = [i for ids in by_day.values() for prev, i in zip(ids, ids[1:])
+                    if self.trades.pnl[prev] < 0 and self.trades.quantities[i] > self.trades.quantities[prev]]
+        revenge = self.stats['revenge']
+        self.assertEqual(revenge['trades']['trade_count'], len(after_loss))
+        self.assertEqual(revenge['quick_reentries'], len(after_loss))
+        self.assertEqual(revenge['sized_up'], len(sized_up))
+        self.assertEqual(sequence_stats(self.trades, revenge_minutes=-1)['revenge']['trades']['trade_count'], len(sized_up))
+
+
+class TestCorrelation(unittest.TestCase):
+    """Daily PnL correlation against np.corrcoef"""
+
+    def test_matches_corrcoef(self):
+        rng = np.random.default_rng(9)
+        base = rng.normal(0, 100, 250)
+        # copy-traded accounts (same signal plus noise), an independent one, and one that never traded
+        matrix = np.column_stack([base + rng.normal(0, 10, 250), base * 2, rng.normal(0, 100, 250), np.zeros(250)])
+        correlation = correlation_matrix(matrix)
+        np.testing.assert_allclose(correlation[:3, :3], np.corrcoef(matrix[:, :3].T), atol=1e-12)
+        self.assertGreater(correlation[0, 1], 0.99)
+        self.assertTrue(np.isnan(correlation[3]).all())
+
+
+class TestDailyPnlMatrix(DatabaseTestCase):
+    """(day, group) matrix built from the daily_pnl rollup"""
+
+    def setUp(self):
+        super().setUp()
+        rng = np.random.default_rng(4)
+        self.expected = {}
+        rows = []
+        for acc_id in ['1', '2', '3']:
+            for symbol in ['MNQH6', 'MNQM6', 'MESH6']:
+                for offset in rng.choice(90, 40, replace=False).tolist():
+                    day = date(2026, 1, 5) + timedelta(days=offset)
+                    pnl = round(float(rng.normal(0, 200)), 2) or 1.0
+                    rows.append(DailyPnl(acc_id=acc_id, symbol=symbol, trading_day=day, pnl=pnl, trade_count=1))
+                    self.expected[(acc_id, symbol, day)] = pnl
+        # an account active on a single day nobody else traded
+        rows.append(DailyPnl(acc_id='4', symbol='MGCG6', trading_day=date(2026, 6, 1), pnl=50, trade_count=1))
+        self.expected[('4', 'MGCG6', date(2026, 6, 1))] = 50.0
+        rng.shuffle(rows)   # insertion order shouldn't matter to the aggregate
+        db.session.add_all(rows)
+        db.session.commit()
+
+    def reference(self, group_of):
+        cells = {}
+        for (acc_id, symbol, day), pnl in self.expected.items():
+            key = (day, group_of(acc_id, symbol))
+            cells[key] = cells.get(key, 0) + pnl
+        return cells
+
+    def assert_matches(self, labels, days, matrix, cells):
+        self.assertEqual(matrix.shape, (len(days), len(labels)))
+        self.assertEqual(sorted({day for day, _ in cells}), [d.astype(date) for d in days])
+        for (day, group), pnl in cells.items():
+            d, g = [x.astype(date) for x in days].index(day), labels.index(group)
+            self.assertAlmostEqual(matrix[d, g], pnl, places=2)
+        self.assertAlmostEqual(matrix.sum(), sum(cells.values()), places=2)
+
+    def test_matches_rollup(self):
+        for by, group_of in [('account', lambda acc_id, symbol: acc_id), ('symbol', lambda acc_id, symbol: symbol),
+                             ('root', lambda acc_id, symbol: symbol[:-2])]:
+            labels, days, matrix = daily_pnl_matrix(by)
+            self.assert_matches(labels, days, matrix, self.reference(group_of))
+
+    def test_min_days(self):
+        labels, days, matrix = daily_pnl_matrix('account', min_days=2)
+        self.assertEqual(labels, ['1', '2', '3'])
+        # the day only the dropped account traded goes with it
+        self.assertNotIn(np.datetime64('2026-06-01'), days)
+        self.assertTrue((matrix != 0).any(axis=1).all())
+        cells = {key: pnl for key, pnl in self.reference(lambda acc_id, symbol: acc_id).items() if key[1] != '4'}
+        self.assert_matches(labels, days, matrix, cells)
+
+    def test_filters(self):
+        labels, days, matrix = daily_pnl_matrix('account', ['2'], start_day=date(2026, 2, 1), end_day=date(2026, 2, 28))
+        cells = {key: pnl for key, pnl in self.reference(lambda acc_id, symbol: acc_id).items()
+                 if key[1] == '2' and date(2026, 2, 1) <= key[0] <= date(2026, 2, 28)}
+        self.assert_matches(labels, days, matrix, cells)
+        with self.assertRaises(ValueError):
+            daily_pnl_matrix('strategy')
+
+
+def reference_lttb(x, y, n_out):
+    """Straightforward LTTB, one point at a time."""
+    n = len(y)
+    every = (n - 2) / (n_out - 2)
+    picked, a = [0], 0
+    for i in range(n_out - 2):
+        start, end = int(i * every) + 1, int((i + 1) * every) + 1
+        next_start, next_end = end, min(int((i + 2) * every) + 1, n)
+        if i == n_out - 3:
+            next_start, next_end = n - 1, n
+        avg_x = sum(x[next_start:next_end]) / (next_end - next_start)
+        avg_y = sum(y[next_start:next_end]) / (next_end - next_start)
+        areas = [abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a])) for j in range(start, end)]
+        a = start + areas.index(max(areas))
+        picked.append(a)
+    return picked + [n - 1]
+
+
+class TestDownsample(unittest.TestCase):
+    """LTTB downsampling of chart series"""
+
+    def test_lttb_matches_reference(self):
+        y = np.cumsum(np.random.default_rng(3).normal(size=1000))
+        x = np.arange(1000)
+        self.assertEqual(lttb_indices(x, y, 50).tolist(), reference_lttb(x.tolist(), y.tolist(), 50))
+
+    def test_drawdown_extremes_survive(self):
+        rng = np.random.default_rng(5)
+        equity = np.cumsum(rng.normal(0.1, 10, 20000))
+        _, drawdown = drawdown_series(equity)
+        anchors = drawdown_anchor_indices(drawdown)
+        indices = downsample_indices([equity, drawdown], 300, keep=anchors)
+        self.assertLessEqual(len(indices), 310)
+        self.assertIn(int(np.argmin(drawdown)), indices)
+        self.assertEqual(drawdown[indices].min(), drawdown.min())
+        self.assertEqual(equity[indices].max(), equity.max())
+        self.assertTrue(set(anchors) <= set(indices.tolist()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import date, datetime
+
+import numpy as np
+
+from app.services.bar_store import BarStore, to_storage_time
+
+
+class TestBarStore(unittest.TestCase):
+    """Append-only memory-mapped bar files"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.store = BarStore(self.root)
+        # two days of MNQ minute bars, 06:30-16:29 LA
+        times = np.concatenate([
+            np.arange(np.datetime64('2026-03-02T06:30'), np.datetime64('2026-03-02T16:30'), np.timedelta64(1, 'm')),
+            np.arange(np.datetime64('2026-03-03T06:30'), np.datetime64('2026-03-03T16:30'), np.timedelta64(1, 'm')),
+        ])
+        self.close = np.arange(len(times), dtype=np.float64)
+        self.store.append('MNQH6', times, self.close, self.close + 1, self.close - 1, self.close, np.ones(len(times)))
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_window_is_zero_copy(self):
+        bars = self.store.window('MNQH6', datetime(2026, 3, 2, 7, 0), datetime(2026, 3, 2, 7, 5))
+        self.assertEqual([str(t) for t in bars.times], [f'2026-03-02T07:0{i}:00' for i in range(5)])
+        self.assertTrue(np.shares_memory(bars.close, self.store.bars('MNQH6').close))
+
+    def test_trading_day_session(self):
+        # CME roll is 3pm LA: 15:00 onwards on the 2nd belongs to the 3rd
+        bars = self.store.trading_day('mnqh6', date(2026, 3, 3))
+        self.assertEqual(bars.times[0], np.datetime64('2026-03-02T15:00'))
+        self.assertEqual(bars.times[-1], np.datetime64('2026-03-03T14:59'))
+
+    def test_append_skips_stored_bars_and_repairs_torn_writes(self):
+        with open(os.path.join(self.root, 'MNQH6', 'open.f8'), 'ab') as f:
+            f.write(b'\0' * 16)  # an append that died before writing its time column
+        times = np.array(['2026-03-03T16:29', '2026-03-03T16:30'], dtype='datetime64[s]')
+        self.assertEqual(self.store.append('MNQH6', times, [1, 2], [1, 2], [1, 2], [1, 2], [1, 1]), 1)
+        bars = self.store.bars('MNQH6')
+        self.assertEqual(len(bars.time), len(self.close) + 1)
+        self.assertEqual((bars.open[-1], bars.open[-2]), (2, self.close[-1]))
+
+    def test_to_storage_time(self):
+        utc = np.array(['2026-03-08T09:30', '2026-03-08T10:30'], dtype='datetime64[s]')  # spans the DST switch
+        self.assertEqual(to_storage_time(utc, 'UTC').tolist(),
+                         [datetime(2026, 3, 8, 1, 30), datetime(2026, 3, 8, 3, 30)])
+
+
+if __name__ == '__main__':
+    unittest.main()
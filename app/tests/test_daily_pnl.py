@@ -0,0 +1,175 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from app.api.trades import trade_bp
+from app.db.models import db, DailyPnl, Trade
+from app.services.daily_pnl import (refresh_daily_pnl, refresh_daily_pnl_for_trades, rebuild_daily_pnl,
+                                    backfill_trading_days)
+from app.tests.database import DatabaseTestCase
+from app.utils.csv_parser import process_filled_orders_to_trades
+from app.utils.tradovate_parser import save_tradovate_fills_to_db
+
+
+def make_trade(i, exit_time, pnl=10.0, acc_id='1', symbol='MNQH6'):
+    return Trade(id=f't{i}', acc_id=acc_id, symbol=symbol, direction='LONG', entry_time=exit_time - timedelta(minutes=5),
+                 exit_time=exit_time, entry_price=100, exit_price=101, quantity=1, pnl=pnl, trade_type='day_trade')
+
+
+class TestDailyPnlRollup(DatabaseTestCase):
+    """daily_pnl stays equal to the aggregate of trades after every kind of write"""
+
+    blueprints = (trade_bp,)
+
+    def setUp(self):
+        super().setUp()
+        self.trades = [
+            make_trade(1, datetime(2026, 1, 6, 9, 0), 25),
+            make_trade(2, datetime(2026, 1, 6, 10, 0), -10),
+            make_trade(3, datetime(2026, 1, 6, 16, 0), 7),      # after the 3pm close: Jan 7
+            make_trade(4, datetime(2026, 1, 6, 9, 30), 12, acc_id='2'),
+            make_trade(5, datetime(2026, 1, 6, 9, 45), -3, symbol='MESH6'),
+        ]
+        db.session.add_all(self.trades)
+        refresh_daily_pnl_for_trades(self.trades)
+        db.session.commit()
+
+    def assert_rollup_matches_trades(self):
+        expected = defaultdict(lambda: [Decimal(0), 0, 0, 0, Decimal(0), Decimal(0)])
+        for trade in Trade.query.all():
+            row = expected[(trade.acc_id, trade.symbol, trade.trading_day)]
+            row[0] += trade.pnl
+            row[1] += 1
+            row[2] += trade.pnl > 0
+            row[3] += trade.pnl < 0
+            row[4] += max(trade.pnl, 0)
+            row[5] += min(trade.pnl, 0)
+        actual = {
+            (r.acc_id, r.symbol, r.trading_day): [r.pnl, r.trade_count, r.wins, r.losses, r.gross_win, r.gross_loss]
+            for r in DailyPnl.query.all()
+        }
+        self.assertEqual(actual, dict(expected))
+
+    def test_inserts(self):
+        self.assert_rollup_matches_trades()
+        self.assertEqual(db.session.get(DailyPnl, ('1', 'MNQH6', date(2026, 1, 6))).pnl, 15)
+
+        response = self.client.post('/api/trades', json={
+            'id': 't6', 'acc_id': '1', 'symbol': 'MNQH6', 'direction': 'long', 'entry_time': '2026-01-06T11:00:00',
+            'exit_time': '2026-01-06T11:05:00', 'entry_price': 100, 'exit_price': 102, 'quantity': 1, 'pnl': 4,
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assert_rollup_matches_trades()
+        self.assertEqual(db.session.get(DailyPnl, ('1', 'MNQH6', date(2026, 1, 6))).trade_count, 3)
+
+    def test_matcher(self):
+        fills = [
+            {'id': 1, 'orderId': 70, 'accountId': 3, 'contractId': 1, 'action': 'Buy', 'qty': 2, 'price': 100.0,
+             'timestamp': '2026-01-06T17:00:00.000Z'},
+            {'id': 2, 'orderId': 71, 'accountId': 3, 'contractId': 1, 'action': 'Sell', 'qty': 2, 'price': 101.0,
+             'timestamp': '2026-01-06T17:05:00.000Z'},
+        ]
+        with mock.patch('app.ingestion.tradovate.get_contract_info', return_value='MNQH6'):
+            save_tradovate_fills_to_db(fills, account='3')
+            result = process_filled_orders_to_trades(account='3')
+        self.assertEqual(result['trades_created'], 1)
+        self.assert_rollup_matches_trades()
+
+    def test_edits(self):
+        trade = db.session.get(Trade, 't1')
+        trade.pnl = 40
+        refresh_daily_pnl_for_trades([trade])
+        db.session.commit()
+        self.assert_rollup_matches_trades()
+
+        # metadata edits through the API leave the rollup as it is
+        self.assertEqual(self.client.patch('/api/trades/t2', json={'tags': ['fade'], 'notes': 'x'}).status_code, 200)
+        self.assert_rollup_matches_trades()
+
+    def test_trade_moves_day(self):
+        trade = db.session.get(Trade, 't5')
+        trade.exit_time = datetime(2026, 1, 8, 9, 45)
+        refresh_daily_pnl_for_trades([trade])
+        db.session.commit()
+        # MESH6 has no trades left on Jan 6: its row is gone, not left at the old PnL
+        self.assertIsNone(db.session.get(DailyPnl, ('1', 'MESH6', date(2026, 1, 6))))
+        self.assert_rollup_matches_trades()
+
+        trade = db.session.get(Trade, 't3')
+        trade.acc_id = '2'
+        refresh_daily_pnl_for_trades([trade])
+        db.session.commit()
+        self.assert_rollup_matches_trades()
+
+    def test_deletes(self):
+        trade = db.session.get(Trade, 't4')
+        key = (trade.acc_id, trade.symbol, trade.trading_day)
+        db.session.delete(trade)
+        self.assertEqual(refresh_daily_pnl([key]), 1)
+        db.session.commit()
+        self.assertIsNone(db.session.get(DailyPnl, key))
+        self.assert_rollup_matches_trades()
+
+    def test_same_transaction(self):
+        trade = make_trade(9, datetime(2026, 1, 9, 9, 0), 100)
+        db.session.add(trade)
+        refresh_daily_pnl_for_trades([trade])
+        db.session.rollback()
+        self.assertIsNone(db.session.get(DailyPnl, ('1', 'MNQH6', date(2026, 1, 9))))
+        self.assert_rollup_matches_trades()
+
+    def test_rebuild(self):
+        # a rollup that drifted: a stale row, a missing row and a wrong total
+        db.session.add(DailyPnl(acc_id='9', symbol='MNQH6', trading_day=date(2026, 1, 2), pnl=5, trade_count=1))
+        DailyPnl.query.filter_by(acc_id='2').delete()
+        DailyPnl.query.filter_by(symbol='MESH6').update({'pnl': 0})
+        Trade.query.filter_by(id='t1').update({'pnl': 30})
+        db.session.commit()
+
+        self.assertEqual(rebuild_daily_pnl(), 4)
+        db.session.commit()
+        self.assert_rollup_matches_trades()
+
+
+class TestBackfillTradingDays(DatabaseTestCase):
+    """trades.trading_day filled for old rows, and recomputed for all with recompute=True"""
+
+    def setUp(self):
+        super().setUp()
+        db.session.add_all([
+            make_trade(1, datetime(2026, 1, 5, 9, 0)),
+            make_trade(2, datetime(2026, 1, 5, 16, 0)),    # after the 3pm close
+            make_trade(3, datetime(2026, 1, 9, 16, 0)),    # Friday after the close
+        ])
+        db.session.commit()
+
+    def trading_days(self):
+        return {trade_id: day for trade_id, day in db.session.query(Trade.id, Trade.trading_day)}
+
+    def test_fills_missing_days(self):
+        # rows written before the column existed
+        Trade.query.filter(Trade.id.in_(['t1', 't2'])).update({'trading_day': None}, synchronize_session=False)
+        Trade.query.filter_by(id='t3').update({'trading_day': date(2026, 1, 1)}, synchronize_session=False)
+        db.session.commit()
+
+        self.assertEqual(backfill_trading_days(batch_size=1), 2)
+        db.session.commit()
+        self.assertEqual(self.trading_days(), {'t1': date(2026, 1, 5), 't2': date(2026, 1, 6), 't3': date(2026, 1, 1)})
+
+    def test_recompute(self):
+        Trade.query.filter_by(id='t3').update({'trading_day': date(2026, 1, 1)}, synchronize_session=False)
+        db.session.commit()
+        self.assertEqual(backfill_trading_days(recompute=True), 3)
+        db.session.commit()
+        self.assertEqual(self.trading_days()['t3'], date(2026, 1, 10))
+
+        # switching to the CME calendar moves Friday evening to Monday, not Saturday
+        with mock.patch('app.services.session_calendar.TRADING_DAY_CALENDAR', 'CME_EQUITY'):
+            self.assertEqual(backfill_trading_days(recompute=True), 3)
+        db.session.commit()
+        self.assertEqual(self.trading_days(), {'t1': date(2026, 1, 5), 't2': date(2026, 1, 6), 't3': date(2026, 1, 12)})
+        rebuild_daily_pnl()
+        db.session.commit()
+        self.assertEqual(sorted(r.trading_day for r in DailyPnl.query.all()),
+                         [date(2026, 1, 5), date(2026, 1, 6), date(2026, 1, 12)])
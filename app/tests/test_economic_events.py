@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+from datetime import date
+
+import numpy as np
+
+from app.services.economic_events import EventIndex, load_event_index, event_stats
+from app.tests.test_analytics import make_trades
+
+
+class TestEventIndex(unittest.TestCase):
+    """Calendar loading and binary-search overlap of trade and event windows"""
+
+    def test_load_csv(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as f:
+            f.write('Date,Time,Event,Impact,Tag,Timezone\n'
+                    '2026-02-06,8:30 AM,Non-Farm Payrolls,High,NFP,\n'
+                    '2026-01-28,14:00,FOMC Statement,high,,America/Los_Angeles\n'
+                    '2026-03-10,2:00 PM,CPI,high,CPI,UTC\n')
+        try:
+            index = load_event_index(f.name, window_minutes=5)
+        finally:
+            os.unlink(f.name)
+        self.assertEqual(index.tags.tolist(), ['FOMC Statement', 'NFP', 'CPI'])
+        times = [str(t) for t in index.times.astype('datetime64[s]')]
+        # ET -> LA is -3h; UTC -> LA is -7h in March (DST)
+        self.assertEqual(times, ['2026-01-28T14:00:00', '2026-02-06T05:30:00', '2026-03-10T07:00:00'])
+        self.assertEqual(index.impacts.tolist(), ['high'] * 3)
+        self.assertEqual(len(load_event_index('/nonexistent/events.csv')), 0)
+
+    def test_overlap_matches_brute_force(self):
+        rng = np.random.default_rng(2)
+        base = np.datetime64('2026-01-05T00:00', 's')
+        event_times = base + rng.integers(0, 86400 * 30, 200).astype('timedelta64[s]')
+        index = EventIndex(event_times, ['event'] * 200, rng.choice(['CPI', 'FOMC', 'NFP'], 200), ['high'] * 200)
+        entry = base + rng.integers(0, 86400 * 30, 500).astype('timedelta64[s]')
+        exit = entry + rng.integers(0, 3600, 500).astype('timedelta64[s]')
+
+        window = np.timedelta64(300, 's')
+        expected = [
+            sorted({tag for t, tag in zip(index.times.astype('datetime64[s]'), index.tags)
+                    if t - window <= b and t + window >= a})
+            for a, b in zip(entry, exit)
+        ]
+        self.assertEqual(index.tags_for(entry, exit), expected)
+
+    def test_event_stats(self):
+        trades = make_trades([100, -50, 30, 20], [date(2026, 1, 5)] * 4)
+        # trades are 06:30-06:31, 06:31-06:32, ...; windows are inclusive: 06:38 reaches back to 06:33, 06:25 up to 06:30
+        index = EventIndex(np.array(['2026-01-05T06:38', '2026-01-05T06:25', '2026-02-01T06:00'], dtype='datetime64[s]'),
+                           ['CPI', 'Claims', 'CPI'], ['CPI', 'Claims', 'CPI'], ['high', 'low', 'high'])
+        stats = event_stats(index, trades)
+        tags = {row['tag']: row for row in stats['tags']}
+        self.assertEqual((tags['CPI']['trade_count'], tags['CPI']['pnl']), (2, 50))   # trades 2 and 3
+        self.assertEqual((tags['Claims']['trade_count'], tags['Claims']['pnl']), (1, 100))
+        self.assertEqual(stats['no_event']['trade_count'], 1)
+        self.assertEqual([(e['tag'], e['trade_count']) for e in stats['events']], [('CPI', 2), ('Claims', 1)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+from datetime import datetime
+
+import numpy as np
+
+from app.services.bar_store import Bars
+from app.services.excursions import compute_excursions
+
+
+def make_bars(start, highs, lows):
+    times = np.arange(len(highs)) * 60 + int(np.datetime64(start, 's').astype(np.int64))
+    closes = (np.array(highs) + np.array(lows)) / 2
+    return Bars(times, closes, np.array(highs, dtype=float), np.array(lows, dtype=float), closes,
+                np.ones(len(highs), dtype=np.int64))
+
+
+class TestExcursions(unittest.TestCase):
+    """MAE / MFE and efficiency over bar windows"""
+
+    def setUp(self):
+        # 07:00 .. 07:09, high/low ramp with a dip at 07:03
+        highs = [101, 102, 103, 100, 104, 105, 106, 107, 108, 109]
+        lows = [99, 100, 101, 95, 102, 103, 104, 105, 106, 107]
+        self.bars = make_bars('2026-03-02T07:00', highs, lows)
+
+    def compute(self, entries, exits, shorts, entry_prices, exit_prices, point_values):
+        return compute_excursions(self.bars, np.array(entries, dtype='datetime64[s]'),
+                                  np.array(exits, dtype='datetime64[s]'), np.array(shorts),
+                                  np.array(entry_prices, dtype=float), np.array(exit_prices, dtype=float),
+                                  np.array(point_values, dtype=float))
+
+    def test_long_and_short(self):
+        result = self.compute(
+            [datetime(2026, 3, 2, 7, 1, 30), datetime(2026, 3, 2, 7, 1, 30)],
+            [datetime(2026, 3, 2, 7, 5), datetime(2026, 3, 2, 7, 5)],
+            [False, True], [101, 101], [104, 104], [2, 2])
+        # bars 07:01-07:04: high 104, low 95
+        self.assertEqual(result['mfe'].tolist(), [(104 - 101) * 2, (101 - 95) * 2])
+        self.assertEqual(result['mae'].tolist(), [(101 - 95) * 2, (104 - 101) * 2])
+        self.assertAlmostEqual(result['entry_efficiency'][0], 3 / 9)
+        self.assertAlmostEqual(result['exit_efficiency'][0], 9 / 9)
+        self.assertAlmostEqual(result['exit_efficiency'][1], 0)
+
+    def test_matches_brute_force_and_no_coverage(self):
+        rng = np.random.default_rng(0)
+        starts = rng.integers(0, 9 * 60, 50)
+        entries = np.datetime64('2026-03-02T07:00') + starts.astype('timedelta64[s]')
+        exits = entries + rng.integers(1, 180, 50).astype('timedelta64[s]')
+        result = self.compute(entries, exits, [False] * 50, [100] * 50, [100] * 50, [1] * 50)
+        for i in range(50):
+            first, last = starts[i] // 60, (starts[i] + (exits[i] - entries[i]).astype(int) - 1) // 60
+            window = slice(first, min(last, 9) + 1)
+            self.assertEqual(result['mfe'][i], max(self.bars.high[window].max(), 100) - 100)
+
+        outside = self.compute([datetime(2026, 3, 3, 7, 0)], [datetime(2026, 3, 3, 7, 5)], [False], [1], [2], [1])
+        self.assertTrue(np.isnan(outside['mae'][0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
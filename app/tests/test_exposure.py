@@ -0,0 +1,67 @@
+import unittest
+
+import numpy as np
+
+from app.services.exposure import TradeIntervals, sweep, exposure_stats, exposure_by_account
+
+
+def make_intervals(rng, n):
+    entry = np.sort(rng.integers(0, 20000, n))
+    quantity = rng.integers(1, 5, n)
+    signed = np.where(rng.random(n) < 0.5, -quantity, quantity)
+    return TradeIntervals(
+        acc_ids=rng.choice(np.array(['1', '2', '3'], dtype=object), n),
+        entry=entry,
+        exit=entry + rng.integers(0, 600, n),   # includes zero-length trades
+        quantity=quantity,
+        signed_quantity=signed,
+        notional=quantity * 2.0 * 20000,
+    )
+
+
+class TestExposure(unittest.TestCase):
+    """Sweep-line exposure against counting open trades at each second"""
+
+    def setUp(self):
+        self.intervals = make_intervals(np.random.default_rng(4), 300)
+
+    def brute_force(self, intervals):
+        """Open contracts held during each second [t, t + 1)."""
+        seconds = np.arange(intervals.entry.min(), intervals.exit.max() + 1)
+        open_ = (intervals.entry[:, None] <= seconds) & (seconds < intervals.exit[:, None])
+        return (open_ * intervals.quantity[:, None]).sum(axis=0), (open_ * intervals.signed_quantity[:, None]).sum(axis=0)
+
+    def test_levels_match(self):
+        series = sweep(self.intervals)
+        contracts, net = self.brute_force(self.intervals)
+        # level held during each second, from the last event at or before it
+        seconds = np.arange(self.intervals.entry.min(), self.intervals.exit.max() + 1)
+        at = np.searchsorted(series['times'], seconds, side='right') - 1
+        self.assertEqual(series['contracts'][at].tolist(), contracts.tolist())
+        self.assertEqual(series['net_contracts'][at].tolist(), net.tolist())
+        self.assertEqual(series['contracts'][-1], 0)
+
+    def test_stats_and_limits(self):
+        series = sweep(self.intervals)
+        contracts, _ = self.brute_force(self.intervals)
+        stats = exposure_stats(series, max_contracts=6)
+        self.assertEqual(stats['peak_contracts'], contracts.max())
+        self.assertEqual(stats['time_at_peak_contracts_seconds'], (contracts == contracts.max()).sum())
+        self.assertEqual(stats['time_in_market_seconds'], (contracts > 0).sum())
+        self.assertEqual(stats['contracts_limit']['time_over_seconds'], (contracts > 6).sum())
+        self.assertAlmostEqual(stats['peak_notional'], contracts.max() * 40000.0)
+
+    def test_back_to_back_trades_do_not_overlap(self):
+        intervals = TradeIntervals(np.array(['1', '1'], dtype=object), np.array([0, 60]), np.array([60, 120]),
+                                   np.array([2, 2]), np.array([2, -2]), np.array([1.0, 1.0]))
+        self.assertEqual(exposure_stats(sweep(intervals))['peak_contracts'], 2)
+
+    def test_per_account(self):
+        result = exposure_by_account(self.intervals)
+        for account in result['accounts']:
+            contracts, _ = self.brute_force(self.intervals.subset(self.intervals.acc_ids == account['acc_id']))
+            self.assertEqual(account['peak_contracts'], contracts.max())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+
+import numpy as np
+
+from app.services.monte_carlo import simulate, resample_indices
+
+
+class TestMonteCarlo(unittest.TestCase):
+    """Bootstrap risk-of-ruin simulation"""
+
+    def test_block_indices_are_consecutive(self):
+        indices = resample_indices(np.random.default_rng(0), 10, paths=3, horizon=7, block_size=4)
+        self.assertEqual(indices.shape, (3, 7))
+        # within a block, each index follows the previous one (wrapping at the end)
+        self.assertTrue(((indices[:, 1:4] - indices[:, 0:3]) % 10 == 1).all())
+
+    def test_deterministic_outcomes(self):
+        # every trade loses 100: ruin at trade 5 against a 500 trailing limit
+        result = simulate(np.array([-100.0, -100.0]), paths=50, horizon=20, trailing_drawdown=500, target=100)
+        self.assertEqual(result['probability_of_ruin'], 100)
+        self.assertEqual(result['trades_to_ruin']['p50'], 5)
+        self.assertEqual(result['probability_of_target'], 0)
+        self.assertIsNone(result['trades_to_target'])
+        self.assertEqual(result['max_drawdown']['p50'], 2000)
+
+    def test_target_before_ruin_and_seed_reproducible(self):
+        pnl = np.array([150.0, -100.0, 50.0, -20.0])
+        first = simulate(pnl, paths=3000, horizon=100, trailing_drawdown=300, lock_at_start=True, target=500, seed=3)
+        self.assertEqual(first, simulate(pnl, paths=3000, horizon=100, trailing_drawdown=300, lock_at_start=True,
+                                         target=500, seed=3))
+        self.assertLessEqual(first['probability_of_target'] + first['probability_of_ruin'], 100.01)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+from datetime import datetime
+
+from app.db.models import db, Order, OrderLink, Trade
+from app.services.order_graph import (upsert_order_links, get_trade_bracket_context, attach_bracket_context,
+                                      backfill_bracket_context)
+from app.tests.database import DatabaseTestCase
+from app.utils.csv_parser import process_filled_orders_to_trades
+
+
+def bracket(entry_id=100, account=5551001, stop=24600.0, targets=(24700.0,)):
+    """order/list dicts: an entry, its stop and targets as bracket children sharing one OCO group"""
+    orders = [
+        {'id': entry_id, 'accountId': account, 'contractId': 4214197, 'action': 'Buy', 'orderType': 'Market',
+         'ordStatus': 'Filled', 'price': 24650.0},
+        {'id': entry_id + 1, 'accountId': account, 'contractId': 4214197, 'action': 'Sell', 'orderType': 'Stop',
+         'ordStatus': 'Canceled', 'stopPrice': stop, 'parentId': entry_id, 'ocoId': entry_id + 50},
+    ]
+    for i, price in enumerate(targets, start=2):
+        orders.append({'id': entry_id + i, 'accountId': account, 'contractId': 4214197, 'action': 'Sell',
+                       'orderType': 'Limit', 'ordStatus': 'Filled', 'price': price, 'parentId': entry_id,
+                       'ocoId': entry_id + 50})
+    return orders
+
+
+def filled_order(order_id, action, price, fill_time, account='5551001'):
+    return Order(id=f'fill-{order_id}', order_id=str(order_id), account=account, b_s=action, contract='MNQH6',
+                 avg_price=price, filled_qty=1, fill_time=fill_time, status='Filled', is_filled=True,
+                 is_buy=action == 'Buy', is_sell=action == 'Sell')
+
+
+class TestOrderLinks(DatabaseTestCase):
+    """order_links upserts and bracket lookups"""
+
+    def test_upsert_is_incremental(self):
+        self.assertEqual(upsert_order_links(bracket()), {'inserted': 3, 'updated': 0})
+        db.session.commit()
+        self.assertEqual(upsert_order_links(bracket()), {'inserted': 0, 'updated': 0})
+
+        moved = bracket(stop=24610.0)
+        moved[2].pop('price')   # order/list without a price doesn't erase the one we have
+        self.assertEqual(upsert_order_links(moved), {'inserted': 0, 'updated': 1})
+        db.session.commit()
+        self.assertEqual(float(db.session.get(OrderLink, '101').stop_price), 24610.0)
+        self.assertEqual(float(db.session.get(OrderLink, '102').price), 24700.0)
+
+    def test_trade_bracket_context(self):
+        upsert_order_links(bracket() + bracket(entry_id=200, stop=24500.0))
+        db.session.commit()
+        trade = Trade(fills=[{'order_id': '100'}, {'order_id': '102'}], entry_price=24650.0)
+
+        context = get_trade_bracket_context(trade)
+        self.assertEqual(context['entry_order_id'], '100')
+        self.assertEqual([o['order_id'] for o in context['stops']], ['101'])
+        self.assertEqual([o['order_id'] for o in context['targets']], ['102'])
+        self.assertEqual(context['orders']['102']['parent']['order_id'], '100')
+
+        self.assertEqual(get_trade_bracket_context(Trade(fills=[]))['stops'], [])
+
+    def test_nearest_stop_and_target(self):
+        upsert_order_links(bracket(targets=(24720.0, 24690.0)))
+        db.session.commit()
+        trade = Trade(fills=[{'order_id': '100'}], entry_price=24650.0)
+        no_bracket = Trade(fills=[{'order_id': '999'}], entry_price=24650.0)
+        self.assertEqual(attach_bracket_context([trade, no_bracket]), 1)
+        self.assertEqual((trade.stop_price, trade.target_price), (24600.0, 24690.0))
+        self.assertEqual((no_bracket.stop_price, no_bracket.target_price), (None, None))
+
+
+class TestMatcherBrackets(DatabaseTestCase):
+    """Trades carry their entry bracket's stop/target from match time"""
+
+    def setUp(self):
+        super().setUp()
+        upsert_order_links(bracket())
+        db.session.add_all([
+            filled_order(100, 'Buy', 24650.0, datetime(2026, 1, 6, 7, 0)),
+            filled_order(102, 'Sell', 24700.0, datetime(2026, 1, 6, 7, 20)),
+        ])
+        db.session.commit()
+
+    def test_match_attaches_stop_and_target(self):
+        result = process_filled_orders_to_trades(account='5551001')
+        self.assertEqual(result['trades_created'], 1)
+        trade = Trade.query.one()
+        self.assertEqual((float(trade.stop_price), float(trade.target_price)), (24600.0, 24700.0))
+        self.assertEqual(trade.to_dict()['stop_price'], 24600.0)
+
+    def test_backfill(self):
+        process_filled_orders_to_trades(account='5551001')
+        Trade.query.update({'stop_price': None, 'target_price': None})
+        db.session.commit()
+
+        self.assertEqual(backfill_bracket_context(), 1)
+        db.session.commit()
+        trade = Trade.query.one()
+        self.assertEqual((float(trade.stop_price), float(trade.target_price)), (24600.0, 24700.0))
+        self.assertEqual(backfill_bracket_context(), 0)
@@ -0,0 +1,153 @@
+from datetime import datetime, timedelta
+
+from app.api.pnl import pnl_bp
+from app.db.models import db, Trade
+from app.services.daily_pnl import refresh_daily_pnl_for_trades
+from app.services.pnl_cache import response_cache
+from app.tests.database import DatabaseTestCase
+
+
+def make_trade(trade_id, exit_time, pnl, symbol='MNQH6'):
+    return Trade(id=trade_id, acc_id='1', symbol=symbol, direction='LONG', entry_time=exit_time - timedelta(minutes=5),
+                 exit_time=exit_time, entry_price=100, exit_price=101, quantity=1, pnl=pnl, trade_type='day_trade')
+
+
+class PnlApiTestCase(DatabaseTestCase):
+    """
+    Seven trades over six trading days (exit times are LA wall clock):
+
+        2025-12-29  t7 -5
+        2026-01-05  t1 +50, t2 -20 (MESH6)
+        2026-01-06  t3 +30 (exited 16:00 on Jan 5, after the 3pm close)
+        2026-01-07  t4 -15
+        2026-01-12  t5 +40
+        2026-02-02  t6 +10 (MESH6)
+    """
+
+    blueprints = (pnl_bp,)
+
+    def setUp(self):
+        super().setUp()
+        response_cache.clear()
+        self.addCleanup(response_cache.clear)
+        trades = [
+            make_trade('t1', datetime(2026, 1, 5, 9, 0), 50),
+            make_trade('t2', datetime(2026, 1, 5, 10, 0), -20, symbol='MESH6'),
+            make_trade('t3', datetime(2026, 1, 5, 16, 0), 30),
+            make_trade('t4', datetime(2026, 1, 7, 9, 0), -15),
+            make_trade('t5', datetime(2026, 1, 12, 9, 0), 40),
+            make_trade('t6', datetime(2026, 2, 2, 9, 0), 10, symbol='MESH6'),
+            make_trade('t7', datetime(2025, 12, 29, 9, 0), -5),
+        ]
+        db.session.add_all(trades)
+        refresh_daily_pnl_for_trades(trades)
+        db.session.commit()
+
+    def get(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.get_data(as_text=True))
+        return response.get_json()
+
+
+class TestDailyPnl(PnlApiTestCase):
+    """/api/pnl/daily aggregated in SQL, from the rollup or from trades"""
+
+    def test_trading_day_range(self):
+        body = self.get('/api/pnl/daily?start_date=2026-01-01&end_date=2026-01-31')
+        days = [(d['date'], d['pnl'], d['trade_count'], d['winning_trades'], d['losing_trades']) for d in body['data']]
+        self.assertEqual(days, [
+            ('2026-01-05', 30, 2, 1, 1),
+            ('2026-01-06', 30, 1, 1, 0),
+            ('2026-01-07', -15, 1, 0, 1),
+            ('2026-01-12', 40, 1, 1, 0),
+        ])
+        self.assertEqual((body['total_pnl'], body['total_trades']), (85, 5))
+        self.assertEqual([[t['id'] for t in d['trades']] for d in body['data']], [['t1', 't2'], ['t3'], ['t4'], ['t5']])
+
+    def test_unbounded_and_symbol(self):
+        body = self.get('/api/pnl/daily')
+        self.assertEqual((body['total_pnl'], body['total_trades'], len(body['data'])), (90, 7, 6))
+
+        body = self.get('/api/pnl/daily?start_date=2026-01-01&symbol=MESH6')
+        self.assertEqual([(d['date'], d['pnl']) for d in body['data']], [('2026-01-05', -20), ('2026-02-02', 10)])
+        self.assertEqual([t['id'] for d in body['data'] for t in d['trades']], ['t2', 't6'])
+
+    def test_datetime_bounds(self):
+        # exit_time bounds select t1-t3, still bucketed by trading day
+        body = self.get('/api/pnl/daily?start_date=2026-01-05T00:00:00&end_date=2026-01-05T23:59:59')
+        self.assertEqual([(d['date'], d['pnl'], d['trade_count']) for d in body['data']],
+                         [('2026-01-05', 30, 2), ('2026-01-06', 30, 1)])
+        self.assertEqual(body['total_pnl'], 60)
+        self.assertEqual([[t['id'] for t in d['trades']] for d in body['data']], [['t1', 't2'], ['t3']])
+
+
+class TestSummaryAndDayTrades(PnlApiTestCase):
+    """summary=true aggregates, and one day's trades fetched page by page"""
+
+    def test_summary(self):
+        full = self.get('/api/pnl/daily?start_date=2026-01-01&end_date=2026-01-31')
+        for query in ('summary=true', 'include_trades=false'):
+            body = self.get(f'/api/pnl/daily?start_date=2026-01-01&end_date=2026-01-31&{query}')
+            self.assertTrue(all('trades' not in d for d in body['data']))
+            self.assertEqual(body['data'], [{k: v for k, v in d.items() if k != 'trades'} for d in full['data']])
+            self.assertEqual(body['total_pnl'], 85)
+
+        calendar = self.get('/api/trades/calendar?year=2026&month=1&summary=true')['data']
+        self.assertEqual([(d['date'], d['pnl']) for d in calendar],
+                         [('2026-01-05', 30), ('2026-01-06', 30), ('2026-01-07', -15), ('2026-01-12', 40)])
+        self.assertTrue(all('trades' not in d for d in calendar))
+
+    def test_day_trades_pages(self):
+        body = self.get('/api/pnl/daily/2026-01-05/trades?per_page=1')
+        self.assertEqual((body['total'], body['pages'], body['page']), (2, 2, 1))
+        self.assertEqual([t['id'] for t in body['trades']], ['t1'])
+        body = self.get('/api/pnl/daily/2026-01-05/trades?per_page=1&page=2')
+        self.assertEqual([t['id'] for t in body['trades']], ['t2'])
+        self.assertEqual(self.get('/api/pnl/daily/2026-01-05/trades?per_page=1&page=3')['trades'], [])
+
+        # t3 exited on Jan 5 but belongs to the Jan 6 trading day
+        body = self.get('/api/pnl/daily/2026-01-06/trades')
+        self.assertEqual(([t['id'] for t in body['trades']], body['per_page']), (['t3'], 50))
+        body = self.get('/api/pnl/daily/2026-01-05/trades?symbol=MESH6&page=0&per_page=10000')
+        self.assertEqual(([t['id'] for t in body['trades']], body['page'], body['per_page']), (['t2'], 1, 500))
+
+    def test_bad_day(self):
+        self.assertEqual(self.client.get('/api/pnl/daily/2026-13-01/trades').status_code, 400)
+
+
+class TestPeriodPnl(PnlApiTestCase):
+    """Weekly (ISO), monthly and yearly roll-ups of the daily rows"""
+
+    def rows(self, url, *fields):
+        return [tuple(p[f] for f in fields) for p in self.get(url)['data']]
+
+    def test_weekly(self):
+        # 2025-12-29 starts ISO week 1 of 2026
+        self.assertEqual(self.rows('/api/pnl/weekly', 'period', 'start_date', 'end_date', 'pnl', 'trade_count',
+                                   'trading_days'), [
+            ('2026-W01', '2025-12-29', '2026-01-04', -5, 1, 1),
+            ('2026-W02', '2026-01-05', '2026-01-11', 45, 4, 3),
+            ('2026-W03', '2026-01-12', '2026-01-18', 40, 1, 1),
+            ('2026-W06', '2026-02-02', '2026-02-08', 10, 1, 1),
+        ])
+
+    def test_monthly(self):
+        body = self.get('/api/pnl/monthly')
+        self.assertEqual([(p['period'], p['end_date'], p['pnl'], p['trade_count'], p['winning_trades'],
+                           p['losing_trades'], p['gross_win'], p['gross_loss']) for p in body['data']], [
+            ('2025-12', '2025-12-31', -5, 1, 0, 1, 0, -5),
+            ('2026-01', '2026-01-31', 85, 5, 3, 2, 120, -35),
+            ('2026-02', '2026-02-28', 10, 1, 1, 0, 10, 0),
+        ])
+        self.assertEqual((body['total_pnl'], body['total_trades']), (90, 7))
+
+        # bounds are trading days, so January starts on the 6th here
+        self.assertEqual(self.rows('/api/pnl/monthly?start_date=2026-01-06&end_date=2026-01-31', 'period', 'pnl'),
+                         [('2026-01', 55)])
+        self.assertEqual(self.rows('/api/pnl/monthly?symbol=MESH6', 'period', 'pnl'), [('2026-01', -20), ('2026-02', 10)])
+
+    def test_yearly(self):
+        self.assertEqual(self.rows('/api/pnl/yearly', 'period', 'start_date', 'end_date', 'pnl', 'trade_count'), [
+            ('2025', '2025-01-01', '2025-12-31', -5, 1),
+            ('2026', '2026-01-01', '2026-12-31', 95, 6),
+        ])
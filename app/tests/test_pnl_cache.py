@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta
+from unittest import mock
+
+import numpy as np
+
+from app.api.pnl import pnl_bp, _calendar_trades, _daily_pnl
+from app.api.trades import trade_bp
+from app.db.models import db, Trade
+from app.services.daily_pnl import refresh_daily_pnl_for_trades
+from app.services.economic_events import EventIndex, backfill_event_tags
+from app.services.pnl_cache import response_cache
+from app.tests.database import DatabaseTestCase
+
+JANUARY = '/api/trades/calendar?year=2026&month=1'
+
+
+def make_trade(i, exit_time, pnl=10.0, acc_id='1'):
+    return Trade(id=f't{i}', acc_id=acc_id, symbol='MNQH6', direction='LONG', entry_time=exit_time - timedelta(minutes=5),
+                 exit_time=exit_time, entry_price=100, exit_price=101, quantity=1, pnl=pnl, trade_type='day_trade')
+
+
+class TestPnlCache(DatabaseTestCase):
+    """ETags, 304s and the closed-month LRU, invalidated by pnl_versions"""
+
+    blueprints = (pnl_bp, trade_bp)
+
+    def setUp(self):
+        super().setUp()
+        response_cache.clear()
+        self.addCleanup(response_cache.clear)
+        trades = [make_trade(1, datetime(2026, 1, 6, 9, 0), 25), make_trade(2, datetime(2026, 1, 7, 9, 0), -10)]
+        db.session.add_all(trades)
+        refresh_daily_pnl_for_trades(trades)
+        db.session.commit()
+
+    def test_etag_and_not_modified(self):
+        response = self.client.get(JANUARY)
+        self.assertEqual(response.status_code, 200)
+        etag, weak = response.get_etag()
+        self.assertFalse(weak)
+        self.assertEqual(response.headers['Cache-Control'], 'private, no-cache')
+        self.assertEqual([day['pnl'] for day in response.get_json()['data']], [25, -10])
+
+        response = self.client.get(JANUARY, headers={'If-None-Match': f'"{etag}"'})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.get_data(), b'')
+        self.assertEqual(response.get_etag(), (etag, False))
+        # a different request has a different ETag
+        self.assertNotEqual(self.client.get(JANUARY + '&summary=true').get_etag()[0], etag)
+
+    def test_closed_month_replayed(self):
+        with mock.patch('app.api.pnl._calendar_trades', wraps=_calendar_trades) as build:
+            first = self.client.get(JANUARY)
+            second = self.client.get(JANUARY)
+        self.assertEqual(build.call_count, 1)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.get_data(), first.get_data())
+        self.assertEqual(second.get_etag(), first.get_etag())
+
+    def test_writes_change_the_etag(self):
+        etag = self.client.get(JANUARY).get_etag()[0]
+
+        response = self.client.post('/api/trades', json={
+            'id': 't3', 'acc_id': '1', 'symbol': 'MNQH6', 'direction': 'long', 'entry_time': '2026-01-08T08:55:00',
+            'exit_time': '2026-01-08T09:00:00', 'entry_price': 100, 'exit_price': 102, 'quantity': 1, 'pnl': 4,
+        })
+        self.assertEqual(response.status_code, 201)
+        response = self.client.get(JANUARY, headers={'If-None-Match': f'"{etag}"'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.get_json()['data']), 3)
+
+        # notes aren't in the rollup, but they are in the cached trade payloads
+        etag = response.get_etag()[0]
+        self.assertEqual(self.client.patch('/api/trades/t1', json={'notes': 'chased'}).status_code, 200)
+        response = self.client.get(JANUARY, headers={'If-None-Match': f'"{etag}"'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['data'][0]['trades'][0]['notes'], 'chased')
+
+        # another month's write leaves January alone
+        etag = response.get_etag()[0]
+        february = make_trade(4, datetime(2026, 2, 3, 9, 0))
+        db.session.add(february)
+        refresh_daily_pnl_for_trades([february])
+        db.session.commit()
+        self.assertEqual(self.client.get(JANUARY, headers={'If-None-Match': f'"{etag}"'}).status_code, 304)
+
+    def test_backfills_change_the_etag(self):
+        etag = self.client.get(JANUARY).get_etag()[0]
+        index = EventIndex(np.array(['2026-01-06T08:58'], dtype='datetime64[s]'), ['CPI m/m'], ['CPI'], ['high'])
+
+        self.assertEqual(backfill_event_tags(index=index), 1)
+        db.session.commit()
+        response = self.client.get(JANUARY, headers={'If-None-Match': f'"{etag}"'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['data'][0]['trades'][0]['event_tags'], ['CPI'])
+
+        # nothing to re-tag: nothing invalidated
+        etag = response.get_etag()[0]
+        self.assertEqual(backfill_event_tags(index=index), 0)
+        db.session.commit()
+        self.assertEqual(self.client.get(JANUARY, headers={'If-None-Match': f'"{etag}"'}).status_code, 304)
+
+    def test_open_ranges_not_stored(self):
+        url = '/api/pnl/daily?start_date=2026-01-01'   # no end: reaches into the open month
+        with mock.patch('app.api.pnl._daily_pnl', wraps=_daily_pnl) as build:
+            first = self.client.get(url)
+            self.client.get(url)
+            self.assertEqual(build.call_count, 2)
+            self.assertIsNone(response_cache.get(('/api/pnl/daily', (('start_date', '2026-01-01'),))))
+
+            # but still revalidate to 304 while nothing changed
+            response = self.client.get(url, headers={'If-None-Match': f'"{first.get_etag()[0]}"'})
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(build.call_count, 2)
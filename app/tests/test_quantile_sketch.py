@@ -0,0 +1,53 @@
+import unittest
+
+import numpy as np
+
+from app.services.quantile_sketch import TDigest
+
+
+class TestTDigest(unittest.TestCase):
+    """Mergeable t-digest against exact quantiles of the raw values"""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        # fat-tailed, like trade PnL
+        self.values = np.round(rng.standard_t(3, 100000) * 50, 2)
+        self.qs = np.array([0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99])
+
+    def rank_error(self, digest):
+        ranks = np.searchsorted(np.sort(self.values), digest.quantiles(self.qs)) / len(self.values)
+        return np.abs(ranks - self.qs).max()
+
+    def test_accuracy_and_size(self):
+        digest = TDigest.from_values(self.values)
+        self.assertLess(self.rank_error(digest), 0.002)
+        self.assertLessEqual(len(digest.means), digest.compression // 2 + 1)
+        self.assertEqual(digest.count, len(self.values))
+        self.assertEqual((digest.min_value, digest.max_value), (self.values.min(), self.values.max()))
+
+    def test_merge_of_parts(self):
+        parts = [TDigest.from_values(part) for part in np.array_split(self.values, 30)]
+        # merging in a different grouping (e.g. months rolled up to quarters) stays accurate
+        merged = TDigest.merge([TDigest.merge(parts[:7]), TDigest.merge(parts[7:])])
+        self.assertEqual(merged.count, len(self.values))
+        self.assertAlmostEqual(merged.total, self.values.sum(), places=4)
+        self.assertLess(self.rank_error(merged), 0.002)
+
+    def test_small_sets_are_exact(self):
+        digest = TDigest.from_values([5.0, -10.0, 30.0])
+        self.assertEqual(digest.quantiles([0, 0.5, 1]).tolist(), [-10.0, 5.0, 30.0])
+        self.assertEqual(sum(b['count'] for b in digest.histogram(4)), 3)
+        self.assertTrue(np.isnan(TDigest.merge([]).quantiles([0.5])[0]))
+
+    def test_serialization(self):
+        digest = TDigest.from_values(self.values)
+
+        class Row:
+            centroids, total, min_value, max_value = digest.to_bytes(), digest.total, digest.min_value, digest.max_value
+
+        restored = TDigest.from_row(Row)
+        self.assertEqual(restored.quantiles(self.qs).tolist(), digest.quantiles(self.qs).tolist())
+
+
+if __name__ == '__main__':
+    unittest.main()
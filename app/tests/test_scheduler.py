@@ -0,0 +1,197 @@
+import unittest
+from datetime import datetime
+from unittest import mock
+
+import pytz
+
+from app.db.models import db, LinkedAccount, Order
+from app.ingestion import tradovate
+from app.ingestion.scheduler import (RateLimiter, SyncScheduler, _SharedFetch, is_market_hours, render_metrics,
+                                     MARKET_TIMEZONE)
+from app.tests.database import DatabaseTestCase
+from app.tests.tradovate_stub import synthetic_payloads
+
+
+class FakeClock:
+    """Stands in for the time module: sleep() advances monotonic() instead of waiting."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+def pacific(*args):
+    return pytz.timezone(MARKET_TIMEZONE).localize(datetime(*args))
+
+
+class TestRateLimiter(unittest.TestCase):
+    """Token bucket burst and refill"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch('app.ingestion.scheduler.time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_burst_then_rate(self):
+        limiter = RateLimiter(rate=2.0, burst=3)
+        for _ in range(3):
+            limiter.acquire()
+        self.assertEqual(self.clock.slept, [])
+        limiter.acquire()
+        self.assertEqual(self.clock.slept, [0.5])
+
+    def test_refill_is_capped_at_burst(self):
+        limiter = RateLimiter(rate=2.0, burst=3)
+        for _ in range(3):
+            limiter.acquire()
+        self.clock.now += 60   # idle for a minute: back to 3 tokens, not 120
+        for _ in range(3):
+            limiter.acquire()
+        self.assertEqual(self.clock.slept, [])
+        limiter.acquire()
+        self.assertEqual(self.clock.slept, [0.5])
+
+
+class TestMarketHours(unittest.TestCase):
+    """CME Globex open/close edges, Pacific time (2026-01-04 is a Sunday)"""
+
+    def test_edges(self):
+        cases = [
+            (pacific(2026, 1, 4, 14, 59), False),   # Sunday before the open
+            (pacific(2026, 1, 4, 15, 0), True),     # Sunday open
+            (pacific(2026, 1, 7, 13, 59), True),
+            (pacific(2026, 1, 7, 14, 0), False),    # daily maintenance break
+            (pacific(2026, 1, 7, 14, 59), False),
+            (pacific(2026, 1, 7, 15, 0), True),
+            (pacific(2026, 1, 9, 13, 59), True),    # Friday before the close
+            (pacific(2026, 1, 9, 14, 0), False),    # Friday close
+            (pacific(2026, 1, 9, 15, 30), False),   # no Friday evening session
+            (pacific(2026, 1, 10, 12, 0), False),   # Saturday
+        ]
+        for now, expected in cases:
+            self.assertEqual(is_market_hours(now), expected, now.isoformat())
+
+    def test_converts_from_utc(self):
+        # 22:59 UTC on a Sunday in January is 14:59 PST
+        self.assertFalse(is_market_hours(datetime(2026, 1, 4, 22, 59, tzinfo=pytz.UTC)))
+        self.assertTrue(is_market_hours(datetime(2026, 1, 4, 23, 0, tzinfo=pytz.UTC)))
+
+
+class TestNextInterval(unittest.TestCase):
+    """Active interval, idle backoff and its cap"""
+
+    def setUp(self):
+        self.scheduler = SyncScheduler(None, max_workers=1, active_interval=30, idle_interval=120,
+                                       max_interval=1800, closed_interval=900, jitter=0)
+        self.addCleanup(self.scheduler._executor.shutdown)
+        self.open = pacific(2026, 1, 7, 9, 0)
+
+    def test_backoff(self):
+        intervals = [self.scheduler.next_interval(LinkedAccount(consecutive_idle=n), self.open) for n in range(8)]
+        self.assertEqual(intervals, [30, 120, 240, 480, 960, 1800, 1800, 1800])
+
+    def test_closed_market(self):
+        closed = pacific(2026, 1, 10, 12, 0)
+        self.assertEqual(self.scheduler.next_interval(LinkedAccount(consecutive_idle=0), closed), 900)
+
+    def test_jitter(self):
+        self.scheduler.jitter = 0.2
+        intervals = [self.scheduler.next_interval(LinkedAccount(consecutive_idle=0), self.open) for _ in range(200)]
+        self.assertTrue(all(24 <= i <= 36 for i in intervals))
+        self.assertGreater(len(set(intervals)), 1)
+
+
+class TestSharedFetch(unittest.TestCase):
+    """One API call per ttl; failures raise and aren't cached"""
+
+    def test_failures_are_not_cached(self):
+        responses = [None, [{'id': 1}], [{'id': 2}]]
+        fetch = _SharedFetch(lambda: responses.pop(0), ttl=60, name='fill/list')
+        with self.assertRaisesRegex(RuntimeError, 'fill/list'):
+            fetch.get()
+        self.assertEqual(fetch.get(), [{'id': 1}])
+        self.assertEqual(fetch.get(), [{'id': 1}])   # cached within ttl
+        self.assertEqual(fetch.get(), [{'id': 1}])
+        self.assertEqual(len(responses), 1)
+
+
+class TestRenderMetrics(unittest.TestCase):
+    """Prometheus text exposition"""
+
+    def test_format(self):
+        now = datetime(2026, 1, 7, 17, 0, 0)
+        synced = LinkedAccount(account='5551001', last_sync_duration_ms=1250, last_success_at=datetime(2026, 1, 7, 16, 59, 30),
+                               last_fill_at=datetime(2026, 1, 7, 16, 50), consecutive_idle=2, sync_count=40,
+                               error_count=1)
+        never = LinkedAccount(account='5551002')
+        lines = render_metrics([synced, never], now).splitlines()
+
+        self.assertIn('# HELP tradovate_sync_lag_seconds Seconds since the last successful sync', lines)
+        self.assertIn('# TYPE tradovate_sync_errors_total counter', lines)
+        self.assertIn('tradovate_sync_duration_seconds{account="5551001"} 1.25', lines)
+        self.assertIn('tradovate_sync_lag_seconds{account="5551001"} 30.0', lines)
+        self.assertIn('tradovate_fill_lag_seconds{account="5551001"} 600.0', lines)
+        self.assertIn('tradovate_sync_errors_total{account="5551001"} 1', lines)
+        # accounts that never synced export counters but no lag
+        self.assertIn('tradovate_sync_total{account="5551002"} 0', lines)
+        self.assertFalse(any(line.startswith('tradovate_sync_lag_seconds{account="5551002"}') for line in lines))
+        for line in lines:
+            self.assertRegex(line, r'^(# (HELP|TYPE) \w+ .+|\w+\{account="\d+"\} [\d.]+)$')
+
+
+class TestSyncAccounting(DatabaseTestCase):
+    """A failed fetch counts as an error, not as an idle sync"""
+
+    def setUp(self):
+        super().setUp()
+        db.session.add(LinkedAccount(account='5551001', consecutive_idle=1))
+        db.session.commit()
+        self.scheduler = SyncScheduler(self.app, max_workers=1, jitter=0)
+        self.addCleanup(self.scheduler._executor.shutdown)
+
+    def sync(self, fills, orders=()):
+        self.scheduler._fills = _SharedFetch(lambda: fills, ttl=0, name='fill/list')
+        self.scheduler._orders = _SharedFetch(lambda: None if orders is None else list(orders), ttl=0, name='order/list')
+        self.scheduler._sync('5551001')
+        db.session.expire_all()
+        return db.session.get(LinkedAccount, '5551001')
+
+    def test_failed_fetch(self):
+        state = self.sync(None)
+        self.assertEqual((state.sync_count, state.error_count, state.consecutive_idle), (1, 1, 1))
+        self.assertIsNone(state.last_success_at)
+        self.assertIn('fill/list', state.last_error)
+
+    def test_new_fills_then_idle(self):
+        payloads = synthetic_payloads(20)
+        with mock.patch('app.ingestion.tradovate.get_contract_info',
+                        side_effect=lambda cid: payloads['contracts'][str(cid)]['name']):
+            state = self.sync(payloads['fills'], payloads['orders'])
+            self.assertEqual((state.error_count, state.consecutive_idle), (0, 0))
+            self.assertIsNotNone(state.last_success_at)
+            state = self.sync(payloads['fills'], payloads['orders'])
+        self.assertEqual((state.sync_count, state.error_count, state.consecutive_idle), (2, 0, 1))
+
+    def test_failed_order_fetch_still_saves_fills(self):
+        payloads = synthetic_payloads(20)
+        with mock.patch('app.ingestion.tradovate.get_contract_info',
+                        side_effect=lambda cid: payloads['contracts'][str(cid)]['name']):
+            state = self.sync(payloads['fills'], None)
+        self.assertEqual((state.error_count, state.consecutive_idle), (0, 0))
+        self.assertIsNone(state.last_error)
+        self.assertGreater(Order.query.filter_by(account='5551001').count(), 0)
+
+    def test_run_once_installs_rate_limiter(self):
+        self.addCleanup(setattr, tradovate, 'rate_limiter', None)
+        tradovate.rate_limiter = None
+        with mock.patch('app.ingestion.tradovate.authenticate', return_value=False):
+            self.assertEqual(self.scheduler.run_once(), [])
+        self.assertIs(tradovate.rate_limiter, self.scheduler.rate_limiter)
@@ -0,0 +1,49 @@
+import unittest
+from datetime import date, datetime
+
+from app.services.session_calendar import get_calendar, calendar_for_symbol, product_root, cme_holidays
+
+
+class TestSessionCalendar(unittest.TestCase):
+    """Trading day lookups against the precomputed session calendars"""
+
+    def test_legacy_matches_3pm_cutoff(self):
+        calendar = get_calendar('LEGACY')
+        self.assertEqual(calendar.trading_day(datetime(2026, 1, 15, 15, 0)), date(2026, 1, 15))
+        self.assertEqual(calendar.trading_day(datetime(2026, 1, 15, 15, 0, 1)), date(2026, 1, 16))
+        # every calendar day is a trading day
+        self.assertEqual(calendar.trading_day(datetime(2026, 1, 17, 9, 0)), date(2026, 1, 17))
+        self.assertEqual(calendar.bounds(date(2026, 1, 15), date(2026, 1, 15)),
+                         (datetime(2026, 1, 14, 15, 0), datetime(2026, 1, 15, 15, 0)))
+
+    def test_cme_weekends_and_holidays_roll_forward(self):
+        calendar = calendar_for_symbol('MNQH6')
+        self.assertIn(date(2026, 1, 19), cme_holidays(2026))  # MLK day
+        # Friday after the roll and the Sunday evening session belong to Tuesday (Monday is MLK)
+        self.assertEqual(calendar.trading_day(datetime(2026, 1, 16, 15, 30)), date(2026, 1, 20))
+        self.assertEqual(calendar.trading_day(datetime(2026, 1, 18, 16, 0)), date(2026, 1, 20))
+        self.assertEqual(calendar.trading_day(datetime(2026, 1, 19, 8, 30)), date(2026, 1, 20))
+
+    def test_cme_dst_and_early_close(self):
+        calendar = get_calendar('CME_EQUITY')
+        # 5pm CT is 3pm PT on both sides of the March DST switch
+        self.assertEqual(calendar.session_end(date(2026, 3, 6)), datetime(2026, 3, 6, 15, 0))
+        self.assertEqual(calendar.session_end(date(2026, 3, 9)), datetime(2026, 3, 9, 15, 0))
+        # day after Thanksgiving closes at 12:15 CT
+        self.assertEqual(calendar.session_close(date(2026, 11, 27)), datetime(2026, 11, 27, 10, 15))
+
+    def test_vectorized_matches_bisect(self):
+        calendar = get_calendar('CME_EQUITY')
+        timestamps = [datetime(2026, 1, 16, 15, 30), None, datetime(2026, 3, 9, 7, 0), datetime(2031, 6, 2, 9, 0)]
+        days = calendar.trading_days(timestamps).tolist()
+        self.assertEqual(days, [calendar.trading_day(ts) if ts else None for ts in timestamps])
+
+    def test_product_root(self):
+        self.assertEqual(product_root('MNQH6'), 'MNQ')
+        self.assertEqual(product_root('/MES'), 'MES')
+        self.assertEqual(product_root('MGCG26'), 'MGC')
+        self.assertEqual(calendar_for_symbol('MGCG6').name, 'CME_COMMODITY')
+
+
+if __name__ == '__main__':
+    unittest.main()
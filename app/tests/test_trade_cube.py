@@ -0,0 +1,114 @@
+import random
+import unittest
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+from app.db.models import db, Trade, DailyCube, DailyTagCube
+from app.services.daily_pnl import refresh_daily_pnl_for_trades, rebuild_daily_pnl
+from app.services.trade_cube import query_cube, rebuild_cube
+from app.tests.database import DatabaseTestCase
+
+
+def make_trade(i, acc_id='1', symbol='MNQH6', direction='LONG', pnl=10.0, day=date(2026, 1, 6), strategy=None,
+               trade_type='day_trade', tags=None, quantity=1):
+    exit_time = datetime.combine(day, datetime.min.time()) + timedelta(hours=7, minutes=i % 400)
+    return Trade(id=f't{i}', acc_id=acc_id, symbol=symbol, direction=direction, entry_time=exit_time - timedelta(minutes=5),
+                 exit_time=exit_time, entry_price=100, exit_price=101, quantity=quantity, pnl=pnl, strategy=strategy,
+                 trade_type=trade_type, tags=tags)
+
+
+class TestCubeValidation(unittest.TestCase):
+    """Unknown dimensions are rejected before any query"""
+
+    def test_unknown_dimensions(self):
+        with self.assertRaisesRegex(ValueError, 'hour'):
+            query_cube(['account', 'hour'])
+        with self.assertRaisesRegex(ValueError, 'day'):
+            query_cube(['account'], {'day': ['2026-01-06']})   # a grouping, not a filter, dimension
+
+
+class TestTradeCube(DatabaseTestCase):
+    """Cube roll-ups against aggregating the trades directly"""
+
+    def test_matches_direct_aggregation(self):
+        rng = random.Random(3)
+        trades = [
+            make_trade(i, acc_id=rng.choice(['1', '2']), symbol=rng.choice(['MNQH6', 'MNQM6', 'MESH6']),
+                       direction=rng.choice(['LONG', 'SHORT']), pnl=round(rng.uniform(-100, 100), 2),
+                       day=date(2026, 1, 5) + timedelta(days=rng.randrange(60)), strategy=rng.choice([None, 'orb', 'vwap']),
+                       quantity=rng.randint(1, 3))
+            for i in range(300)
+        ]
+        db.session.add_all(trades)
+        db.session.commit()
+        rebuild_cube()
+
+        expected = defaultdict(lambda: [0.0, 0, 0, 0])
+        for t in trades:
+            if t.trading_day > date(2026, 2, 15):
+                continue
+            cell = expected[(t.strategy, t.direction)]
+            cell[0] += float(t.pnl)
+            cell[1] += 1
+            cell[2] += t.pnl > 0
+            cell[3] += t.quantity
+
+        cells = query_cube(['strategy', 'direction'], end_day=date(2026, 2, 15))
+        self.assertEqual(len(cells), len(expected))
+        for cell in cells:
+            pnl, count, wins, quantity = expected[(cell['strategy'], cell['direction'])]
+            self.assertAlmostEqual(cell['pnl'], pnl, places=2)
+            self.assertEqual((cell['trade_count'], cell['winning_trades'], cell['quantity']), (count, wins, quantity))
+
+        total = query_cube([])[0]
+        self.assertEqual(total['trade_count'], 300)
+        self.assertAlmostEqual(total['pnl'], sum(float(t.pnl) for t in trades), places=2)
+
+    def test_root_mapping(self):
+        db.session.add_all([
+            make_trade(1, symbol='MNQH6', pnl=10), make_trade(2, symbol='MNQM6', pnl=20),
+            make_trade(3, symbol='MESH6', pnl=-5), make_trade(4, symbol='MGCG6', pnl=7),
+        ])
+        db.session.commit()
+        rebuild_cube()
+
+        by_root = {c['root']: (c['pnl'], c['trade_count']) for c in query_cube(['root'])}
+        self.assertEqual(by_root, {'MES': (-5, 1), 'MGC': (7, 1), 'MNQ': (30, 2)})
+        nq = query_cube(['symbol'], {'root': ['mnq']})
+        self.assertEqual([c['symbol'] for c in nq], ['MNQH6', 'MNQM6'])
+
+    def test_tags(self):
+        db.session.add_all([
+            make_trade(1, pnl=10, tags=['a', 'b']),
+            make_trade(2, pnl=20, tags=['a']),
+            make_trade(3, pnl=-5, tags='a'),      # not an array: untagged
+            make_trade(4, pnl=-7, tags=None),
+            make_trade(5, pnl=3, tags=[]),
+            make_trade(6, pnl=4, tags=['a', 'a', 'b']),   # repeated tags count once
+        ])
+        db.session.commit()
+        rebuild_cube()
+
+        by_tag = {c['tag']: (c['pnl'], c['trade_count']) for c in query_cube(['tag'])}
+        self.assertEqual(by_tag, {'a': (34, 3), 'b': (14, 2), None: (-9, 3)})
+        self.assertEqual(query_cube([], {'tag': ['b']})[0]['trade_count'], 2)
+        # without tags the plain cube counts every trade once
+        self.assertEqual(query_cube([])[0]['trade_count'], 6)
+
+    def test_maintained_with_daily_pnl(self):
+        trade = make_trade(1, pnl=10, tags=['a'])
+        db.session.add(trade)
+        refresh_daily_pnl_for_trades([trade])
+        db.session.commit()
+        self.assertEqual(query_cube(['tag'])[0]['pnl'], 10)
+
+        trade.tags = ['b']
+        refresh_daily_pnl_for_trades([trade])
+        db.session.commit()
+        self.assertEqual([c['tag'] for c in query_cube(['tag'])], ['b'])
+
+        Trade.query.delete()
+        rebuild_daily_pnl()
+        db.session.commit()
+        self.assertEqual((DailyCube.query.count(), DailyTagCube.query.count()), (0, 0))
+        self.assertEqual(query_cube([]), [])
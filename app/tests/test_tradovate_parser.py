@@ -0,0 +1,89 @@
+from decimal import Decimal
+from unittest import mock
+
+from app.db.models import db, DailyPnl, Order, OrderFill, Trade
+from app.tests.database import DatabaseTestCase
+from app.utils.contract_multipliers import get_contract_multiplier
+from app.utils.csv_parser import process_filled_orders_to_trades
+from app.utils.tradovate_parser import save_tradovate_fills_to_db
+
+ACCOUNT = '5551001'
+
+
+def fill(fill_id, order_id, action, qty, price, timestamp):
+    return {'id': fill_id, 'orderId': order_id, 'accountId': int(ACCOUNT), 'contractId': 4214197,
+            'action': action, 'qty': qty, 'price': price, 'timestamp': timestamp}
+
+
+class TestCoalescedFills(DatabaseTestCase):
+    """Partial fills of one orderId saved across syncs with coalesce=True / False"""
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch('app.ingestion.tradovate.get_contract_info', return_value='MNQH6')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.first = [fill(1, 7, 'Buy', 3, 100.25, '2026-01-06T15:00:01.000Z')]
+        self.second = [fill(1, 7, 'Buy', 3, 100.25, '2026-01-06T15:00:01.000Z'),   # re-sent by fill/list
+                       fill(2, 7, 'Buy', 1, 100.50, '2026-01-06T15:00:05.000Z')]
+
+    def save(self, fills, coalesce=True):
+        saved, errors = save_tradovate_fills_to_db(fills, account=ACCOUNT, coalesce=coalesce)
+        self.assertEqual(errors, [])
+        return saved
+
+    def test_vwap_across_syncs(self):
+        self.save(self.first)
+        self.save(self.second)
+
+        order = Order.query.one()
+        self.assertEqual(order.id, 'order-7')
+        self.assertEqual(order.filled_qty, 4)
+        self.assertEqual(order.avg_price, Decimal('100.3125'))
+        self.assertEqual(order.fill_time.second, 5)
+
+        children = OrderFill.query.order_by(OrderFill.fill_id).all()
+        self.assertEqual([c.fill_id for c in children], ['1', '2'])
+        self.assertEqual({c.order_pk for c in children}, {'order-7'})
+
+    def test_without_coalescing(self):
+        self.save(self.first, coalesce=False)
+        self.save(self.second, coalesce=False)
+
+        # one row per (account, orderId), holding the latest fill
+        order = Order.query.one()
+        self.assertEqual(order.id, 'fill-1')
+        self.assertEqual((order.filled_qty, order.avg_price), (1, Decimal('100.5')))
+        self.assertEqual(OrderFill.query.count(), 0)
+
+    def test_trade_pnl_matches_child_fills(self):
+        self.save(self.second + [fill(3, 8, 'Sell', 4, 101.0, '2026-01-06T15:10:00.000Z')])
+        process_filled_orders_to_trades(account=ACCOUNT)
+
+        trade = Trade.query.one()
+        expected = (101.0 * 4 - (100.25 * 3 + 100.50)) * get_contract_multiplier('MNQH6')
+        self.assertEqual(trade.pnl, Decimal(str(round(expected, 2))))
+
+    def test_grown_orders_refresh_their_trade(self):
+        self.save(self.first + [fill(3, 8, 'Sell', 3, 101.0, '2026-01-06T15:10:00.000Z')])
+        process_filled_orders_to_trades(account=ACCOUNT)
+        trade_id = Trade.query.one().id
+
+        # both orders pick up another partial fill in the next sync
+        self.save(self.second + [fill(3, 8, 'Sell', 3, 101.0, '2026-01-06T15:10:00.000Z'),
+                                 fill(4, 8, 'Sell', 1, 101.5, '2026-01-06T15:10:03.000Z')])
+        result = process_filled_orders_to_trades(account=ACCOUNT)
+        self.assertEqual((result['trades_created'], result['errors']), (0, []))
+
+        trade = Trade.query.one()
+        expected = ((101.0 * 3 + 101.5) - (100.25 * 3 + 100.50)) * get_contract_multiplier('MNQH6')
+        self.assertEqual((trade.id, trade.quantity), (trade_id, 4))
+        self.assertEqual(trade.pnl, Decimal(str(round(expected, 2))))
+        self.assertEqual(trade.exit_time.second, 3)
+        self.assertEqual(DailyPnl.query.one().pnl, trade.pnl)
+
+        # nothing changed since: re-matching leaves the trade alone
+        with mock.patch('app.services.daily_pnl.refresh_daily_pnl_for_trades') as refresh:
+            process_filled_orders_to_trades(account=ACCOUNT)
+        self.assertEqual(refresh.call_args.args[0], [])
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Local Tradovate-compatible stub server.
+
+Serves the endpoints app/ingestion/tradovate.py calls, from either a recorded
+session or synthetic payloads, so ingestion can be exercised offline:
+
+    POST /auth/accesstokenrequest
+    GET  /fill/list
+    GET  /fill/deps?masterid=<orderId>
+    GET  /order/list?ordStatus=<status>
+    GET  /contract/item/<contractId>
+
+Latency and error rate are configurable to mimic a slow or flaky broker.
+
+Usage:
+    # serve 5,000 synthetic fills on port 5055
+    python -m app.tests.tradovate_stub --fills 5000 --port 5055
+
+    # record the real demo account once, then replay it
+    python -m app.tests.tradovate_stub --record recording.json
+    python -m app.tests.tradovate_stub --replay recording.json
+
+    # point the backend at it
+    TRADOVATE_BASE_URL=http://localhost:5055 python -m app.main
+"""
+
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+
+from flask import Flask, request, jsonify
+from werkzeug.serving import make_server
+
+STUB_TOKEN = "stub-access-token"
+
+# contractId -> contract item, shaped like Tradovate's contract/item response
+SYNTHETIC_CONTRACTS = {
+    4214197: {"id": 4214197, "name": "MNQH6", "contractMaturityId": 1, "price": 24650.0, "tick": 0.25},
+    4214201: {"id": 4214201, "name": "MESH6", "contractMaturityId": 2, "price": 6850.0, "tick": 0.25},
+    4214305: {"id": 4214305, "name": "MGCG6", "contractMaturityId": 3, "price": 2950.0, "tick": 0.1},
+}
+
+
+def synthetic_payloads(num_fills: int = 1000, accounts=(5551001,), seed: int = 42) -> dict:
+    """
+    Build fills, orders and contracts for num_fills fills.
+
+    Fills come in round trips (entry then exit on the same contract) so the
+    matcher produces trades. Every entry gets a bracket: a stop and a target
+    order sharing an ocoId, both children of the entry via parentId.
+    """
+    rng = random.Random(seed)
+    contract_ids = list(SYNTHETIC_CONTRACTS.keys())
+
+    fills = []
+    orders = []
+    fill_id = 375750000000
+    order_id = 375760000000
+    ts = datetime(2026, 1, 5, 6, 30)
+
+    for i in range(max(num_fills // 2, 0)):
+        account_id = accounts[i % len(accounts)]
+        contract_id = contract_ids[i % len(contract_ids)]
+        contract = SYNTHETIC_CONTRACTS[contract_id]
+        tick = contract["tick"]
+
+        is_long = rng.random() < 0.5
+        qty = rng.randint(1, 3)
+        entry_price = contract["price"] + rng.randint(-200, 200) * tick
+        exit_price = entry_price + rng.randint(-40, 40) * tick
+        entry_time = ts + timedelta(seconds=rng.randint(30, 600))
+        exit_time = entry_time + timedelta(seconds=rng.randint(30, 3600))
+        ts = exit_time
+
+        entry_action, exit_action = ("Buy", "Sell") if is_long else ("Sell", "Buy")
+        entry_order_id, stop_order_id, target_order_id = order_id, order_id + 1, order_id + 2
+        order_id += 3
+        oco_id = entry_order_id + 900000
+
+        orders.append({
+            "id": entry_order_id, "accountId": account_id, "contractId": contract_id,
+            "action": entry_action, "ordStatus": "Filled", "orderType": "Market",
+            "timestamp": entry_time.isoformat() + "Z"
+        })
+        for oid, order_type, price, status in (
+            (stop_order_id, "Stop", entry_price - 20 * tick if is_long else entry_price + 20 * tick, "Canceled"),
+            (target_order_id, "Limit", exit_price, "Filled"),
+        ):
+            orders.append({
+                "id": oid, "accountId": account_id, "contractId": contract_id,
+                "action": exit_action, "ordStatus": status, "orderType": order_type,
+                "price": price, "parentId": entry_order_id, "ocoId": oco_id,
+                "timestamp": entry_time.isoformat() + "Z"
+            })
+
+        for oid, action, price, when in (
+            (entry_order_id, entry_action, entry_price, entry_time),
+            (target_order_id, exit_action, exit_price, exit_time),
+        ):
+            fills.append({
+                "id": fill_id, "orderId": oid, "contractId": contract_id, "accountId": account_id,
+                "timestamp": when.isoformat(timespec="milliseconds") + "Z",
+                "tradeDate": {"year": when.year, "month": when.month, "day": when.day},
+                "action": action, "qty": qty, "price": price,
+                "active": True, "finallyPaired": 0, "external": False
+            })
+            fill_id += 1
+
+    return {
+        "fills": fills,
+        "orders": orders,
+        "contracts": {str(k): v for k, v in SYNTHETIC_CONTRACTS.items()}
+    }
+
+
+def record_payloads(path: str) -> dict:
+    """Fetch fills, orders and their contracts from the real API and save them for replay."""
+    from app.ingestion import tradovate
+
+    if not tradovate.authenticate():
+        raise RuntimeError("Tradovate authentication failed")
+
+    fills = tradovate.get_fills()
+    if fills is None:
+        raise RuntimeError("Fetching fills from Tradovate failed")
+    orders = tradovate.get_orders_list() or []
+
+    contracts = {}
+    for contract_id in {f.get("contractId") for f in fills if f.get("contractId")}:
+        response = tradovate.requests.get(
+            f"{tradovate.BASE_URL}/contract/item/{contract_id}",
+            headers=tradovate.get_headers(), timeout=5
+        )
+        if response.status_code == 200:
+            contracts[str(contract_id)] = response.json()
+
+    payloads = {"fills": fills, "orders": orders, "contracts": contracts}
+    with open(path, "w") as f:
+        json.dump(payloads, f)
+    print(f"Recorded {len(fills)} fills, {len(orders)} orders, {len(contracts)} contracts to {path}")
+    return payloads
+
+
+def load_payloads(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def create_stub_app(payloads: dict, latency_ms: float = 0.0, jitter_ms: float = 0.0,
+                    error_rate: float = 0.0, seed: int = 0) -> Flask:
+    """
+    Args:
+        payloads: dict with 'fills', 'orders' and 'contracts' (keyed by contractId string)
+        latency_ms: base delay added to every response
+        jitter_ms: uniform random extra delay on top of latency_ms
+        error_rate: probability (0-1) that a request returns HTTP 500
+        seed: seed for latency/error randomness, so runs are reproducible
+    """
+    stub = Flask(__name__)
+    rng = random.Random(seed)
+    rng_lock = threading.Lock()
+    stub.config["request_counts"] = {}
+
+    fills = payloads.get("fills", [])
+    orders = payloads.get("orders", [])
+    contracts = payloads.get("contracts", {})
+
+    fills_by_order = {}
+    for fill in fills:
+        fills_by_order.setdefault(fill.get("orderId"), []).append(fill)
+
+    @stub.before_request
+    def simulate_network():
+        counts = stub.config["request_counts"]
+        counts[request.endpoint] = counts.get(request.endpoint, 0) + 1
+
+        with rng_lock:
+            delay = latency_ms + (rng.uniform(0, jitter_ms) if jitter_ms else 0.0)
+            fail = error_rate > 0 and rng.random() < error_rate
+        if delay:
+            time.sleep(delay / 1000.0)
+        if fail:
+            return jsonify({"errorText": "Simulated server error"}), 500
+
+        if request.endpoint != "auth" and request.headers.get("Authorization") != f"Bearer {STUB_TOKEN}":
+            return jsonify({"errorText": "Access is denied"}), 401
+
+    @stub.route("/auth/accesstokenrequest", methods=["POST"], endpoint="auth")
+    def auth():
+        body = request.get_json(silent=True) or {}
+        return jsonify({
+            "accessToken": STUB_TOKEN,
+            "expirationTime": (datetime.utcnow() + timedelta(minutes=80)).isoformat() + "Z",
+            "userId": 1,
+            "name": body.get("name", "stub")
+        })
+
+    @stub.route("/fill/list", methods=["GET"], endpoint="fill_list")
+    def fill_list():
+        return jsonify(fills)
+
+    @stub.route("/fill/deps", methods=["GET"], endpoint="fill_deps")
+    def fill_deps():
+        master_id = request.args.get("masterid", type=int)
+        return jsonify(fills_by_order.get(master_id, []))
+
+    @stub.route("/order/list", methods=["GET"], endpoint="order_list")
+    def order_list():
+        ord_status = request.args.get("ordStatus")
+        if ord_status:
+            return jsonify([o for o in orders if o.get("ordStatus") == ord_status])
+        return jsonify(orders)
+
+    @stub.route("/contract/item/<int:contract_id>", methods=["GET"], endpoint="contract_item")
+    def contract_item(contract_id):
+        contract = contracts.get(str(contract_id))
+        if not contract:
+            return jsonify({"errorText": f"Contract {contract_id} not found"}), 404
+        return jsonify(contract)
+
+    return stub
+
+
+class StubServer:
+    """Run a stub app on a background thread (threaded, so concurrent clients overlap)."""
+
+    def __init__(self, stub: Flask, host: str = "127.0.0.1", port: int = 0):
+        self.stub = stub
+        self._server = make_server(host, port, stub, threaded=True)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self._server.host}:{self._server.port}"
+
+    @property
+    def request_counts(self) -> dict:
+        return dict(self.stub.config["request_counts"])
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._thread.join()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Tradovate stub server")
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--fills", type=int, default=1000, help="number of synthetic fills")
+    parser.add_argument("--accounts", type=int, default=1, help="number of synthetic accounts")
+    parser.add_argument("--replay", help="serve a recorded session instead of synthetic data")
+    parser.add_argument("--record", help="record the real API to this file and exit")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    if args.record:
+        record_payloads(args.record)
+    else:
+        if args.replay:
+            payloads = load_payloads(args.replay)
+        else:
+            payloads = synthetic_payloads(args.fills, accounts=tuple(5551001 + i for i in range(args.accounts)))
+        stub = create_stub_app(payloads, args.latency_ms, args.jitter_ms, args.error_rate)
+        print(f"Serving {len(payloads['fills'])} fills on http://localhost:{args.port}")
+        print(f"   TRADOVATE_BASE_URL=http://localhost:{args.port}")
+        stub.run(host="0.0.0.0", port=args.port, threaded=True)
@@ -7,6 +7,7 @@ import io
 import uuid
 from typing import Any, List, Dict, Optional
 from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
 
 def parse_csv_text(csv_text: str) -> List[Dict[str, str]]:
     """
@@ -304,10 +305,30 @@ def save_raw_orders_to_db(csv_text: str, account: str = "default") -> tuple[List
             print(f"⚠️  DEBUG: Could not parse datetime: '{s}'", file=sys.stderr)
             return None
 
+    def _raw_order_id(row: Dict[str, str]) -> Optional[str]:
+        raw_order_id = row.get("orderId") or row.get("Order ID") or row.get("order_id")
+        raw_order_id = str(raw_order_id).strip() if raw_order_id is not None else None
+        # Spreadsheet-mangled ids (3.72955E+11) are lossy and collide, so they can't
+        # identify an order - keep them in raw_csv_data only
+        if not raw_order_id or 'E+' in raw_order_id.upper():
+            return None
+        return raw_order_id
+
+    # Prefetch orders already stored under these (order_id, account) pairs in one query,
+    # e.g. rows saved by a Tradovate sync or an earlier export of the same orders
+    order_keys = {(_raw_order_id(row), row.get('Account', account)) for row in rows}
+    order_keys = {key for key in order_keys if key[0]}
+    existing_by_order_id = {}
+    if order_keys:
+        for existing_order in Order.query.filter(
+            Order.order_id.in_({k[0] for k in order_keys}),
+            Order.account.in_({k[1] for k in order_keys})
+        ).all():
+            existing_by_order_id[(existing_order.order_id, existing_order.account)] = existing_order
+
     for row_num, row in enumerate(rows, start = 2):
         try:
-            raw_order_id = row.get("orderId") or row.get("Order ID") or row.get("order_id")
-            raw_order_id = str(raw_order_id).strip() if raw_order_id is not None else None
+            raw_order_id = _raw_order_id(row)
 
             # Primary key for our DB row (stable per unique row)
             order_row_id = _stable_row_id(row)
@@ -329,6 +350,8 @@ def save_raw_orders_to_db(csv_text: str, account: str = "default") -> tuple[List
             
             # Check if order already exists (idempotency)
             existing = Order.query.filter_by(id=order_row_id).first()
+            if not existing and raw_order_id:
+                existing = existing_by_order_id.get((raw_order_id, row.get('Account', account)))
             if existing:
                 # Update fill_time if it's missing but we have it now
                 updated = False
@@ -405,6 +428,8 @@ def save_raw_orders_to_db(csv_text: str, account: str = "default") -> tuple[List
             
             db.session.add(order)
             saved_orders.append(order)
+            if raw_order_id:
+                existing_by_order_id[(raw_order_id, order.account)] = order
         except Exception as e:
             errors.append(f"Row {row_num}: Error saving order - {str(e)}")
             continue
@@ -434,6 +459,7 @@ def process_filled_orders_to_trades(account: str = None) -> Dict[str, Any]:
         - filled_orders_count: number of filled orders found
         - trades_created: number of trades created
         - errors: list of error messages
+        - warnings: the messages in errors that aren't failures (positions still open)
     """
     import sys
     from app.db.models import Order, Trade, db
@@ -444,8 +470,11 @@ def process_filled_orders_to_trades(account: str = None) -> Dict[str, Any]:
     print(f"🔄 DEBUG: Account filter = {account}", file=sys.stderr)
     
     errors = []
+    warnings = []
     trades_created = 0
     trades_matched = 0  # Count of existing trades that orders were matched to
+    touched_trades: List[Trade] = []  # new or re-priced trades, for the daily_pnl rollup
+    stale_rollup_keys = set()  # rollup rows refreshed trades moved out of (trading_day changed)
     
     # Get all filled orders, sorted by fill_time
     query = Order.query.filter_by(is_filled=True).filter(Order.fill_time.isnot(None))
@@ -515,25 +544,14 @@ def process_filled_orders_to_trades(account: str = None) -> Dict[str, Any]:
                         # Check if trade with this ID already exists (idempotency)
                         existing_trade = Trade.query.filter_by(id=trade.id).first()
                         if existing_trade:
-                            # Trade already exists - just mark orders as matched to existing trade
+                            # Trade already exists - refresh it from its orders, which can change after
+                            # it was matched (a coalesced order that grew with later partial fills), and
+                            # mark orders as matched to it
                             print(f"🔄 DEBUG: Trade {trade.id[:20]}... already exists, skipping creation", file=sys.stderr)
-                            
-                            # Recalculate PnL for existing trade using multiplier (in case it was created before multiplier was added)
-                            from app.utils.contract_multipliers import get_contract_multiplier
-                            multiplier = get_contract_multiplier(existing_trade.symbol)
-                            old_pnl = float(existing_trade.pnl)
-                            
-                            # Recalculate PnL with multiplier
-                            if existing_trade.direction == 'LONG':
-                                new_pnl = (float(existing_trade.exit_price) - float(existing_trade.entry_price)) * existing_trade.quantity * multiplier
-                            else:  # SHORT
-                                new_pnl = (float(existing_trade.entry_price) - float(existing_trade.exit_price)) * existing_trade.quantity * multiplier
-                            
-                            # Only update if PnL changed significantly (more than 1% difference)
-                            if abs(new_pnl - old_pnl) > abs(old_pnl * 0.01):
-                                print(f"💰 DEBUG: Recalculating PnL for existing trade {existing_trade.id[:20]}...", file=sys.stderr)
-                                print(f"  - Old PnL: {old_pnl}, New PnL: {new_pnl} (multiplier: {multiplier})", file=sys.stderr)
-                                existing_trade.pnl = new_pnl
+                            if _refresh_trade_from(existing_trade, trade, stale_rollup_keys):
+                                print(f"💰 DEBUG: Refreshed existing trade {existing_trade.id[:20]}... from its orders "
+                                      f"(qty={existing_trade.quantity}, pnl={existing_trade.pnl})", file=sys.stderr)
+                                touched_trades.append(existing_trade)
                             
                             trades_matched += 1
                             for o in current_trade_orders:
@@ -543,6 +561,7 @@ def process_filled_orders_to_trades(account: str = None) -> Dict[str, Any]:
                         else:
                             # New trade - create it
                             db.session.add(trade)
+                            touched_trades.append(trade)
                             trades_created += 1
                             # Mark orders as matched
                             for o in current_trade_orders:
@@ -603,6 +622,7 @@ def process_filled_orders_to_trades(account: str = None) -> Dict[str, Any]:
                 f"position={net_position}, {len(current_trade_orders)} orders unmatched"
             )
             errors.append(error_msg)
+            warnings.append(error_msg)
             print(f"⚠️  DEBUG: {error_msg}", file=sys.stderr)
     
     print(f"\n🔄 DEBUG: Matching complete:", file=sys.stderr)
@@ -610,8 +630,17 @@ def process_filled_orders_to_trades(account: str = None) -> Dict[str, Any]:
     print(f"  - Trades matched (existing): {trades_matched}", file=sys.stderr)
     print(f"  - Errors: {len(errors)}", file=sys.stderr)
     
-    # Commit all trades
+    # Commit all trades (with their daily_pnl rollup rows, in the same transaction)
     try:
+        from app.services.daily_pnl import refresh_daily_pnl_for_trades, refresh_daily_pnl
+        from app.services.excursions import update_trade_excursions
+        from app.services.economic_events import tag_trade_events
+        from app.services.order_graph import attach_bracket_context
+        update_trade_excursions(touched_trades)
+        tag_trade_events(touched_trades)
+        attach_bracket_context(touched_trades)
+        refresh_daily_pnl_for_trades(touched_trades)
+        refresh_daily_pnl(stale_rollup_keys)
         db.session.commit()
         print(f"✅ DEBUG: Committed {trades_created} trades to database", file=sys.stderr)
     except Exception as e:
@@ -624,10 +653,49 @@ def process_filled_orders_to_trades(account: str = None) -> Dict[str, Any]:
         'filled_orders_count': filled_count,
         'trades_created': trades_created,
         'trades_matched': trades_matched,  # Existing trades that orders were matched to
-        'errors': errors
+        'errors': errors,
+        'warnings': warnings
     }
 
 
+def _fill_signature(fills) -> List[tuple]:
+    """What a trade's fills say about its executions (ignores matching flags)."""
+    return [(f.get('id'), f.get('filled_qty'), f.get('avg_price'), f.get('fill_time')) for f in fills or []]
+
+
+def _refresh_trade_from(existing: Trade, rebuilt: Trade, stale_rollup_keys: set) -> bool:
+    """
+    Copy prices, size, times and fills of a trade rebuilt from its orders onto the
+    stored trade when they differ (compared at the columns' cent precision).
+    User-edited fields (trade_type, tags, notes) are kept. Adds the rollup key the
+    trade leaves to stale_rollup_keys when its trading day moves.
+
+    Returns:
+        True if the trade changed
+    """
+    def cents(value):
+        # as Postgres stores Numeric(10,2): half away from zero
+        return Decimal(str(value)).quantize(Decimal('0.01'), ROUND_HALF_UP) if value is not None else None
+
+    changed = (
+        existing.quantity != rebuilt.quantity
+        or cents(existing.entry_price) != cents(rebuilt.entry_price)
+        or cents(existing.exit_price) != cents(rebuilt.exit_price)
+        or cents(existing.pnl) != cents(rebuilt.pnl)
+        or existing.entry_time != rebuilt.entry_time
+        or existing.exit_time != rebuilt.exit_time
+        or _fill_signature(existing.fills) != _fill_signature(rebuilt.fills)
+    )
+    if not changed:
+        return False
+
+    if existing.trading_day != rebuilt.trading_day and existing.trading_day is not None:
+        stale_rollup_keys.add((existing.acc_id, existing.symbol, existing.trading_day))
+    for field in ('quantity', 'entry_price', 'exit_price', 'pnl', 'entry_time', 'exit_time', 'fills', 'is_scaled'):
+        setattr(existing, field, getattr(rebuilt, field))
+    return True
+
+
 def _create_trade_from_orders(orders: List[Order], account: str, contract: str) -> Optional[Trade]:
     """
     Helper: Create a Trade object from a list of orders.
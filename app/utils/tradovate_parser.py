@@ -4,12 +4,14 @@ Transforms tradovate data into Order and Trade model cooming from tradovate.py i
 from datetime import datetime
 from typing import List, Dict, Tuple
 
-from app.db.models import db, Order
+from sqlalchemy.exc import IntegrityError
+
+from app.db.models import db, Order, OrderFill
 
 
 #process_filled_orders_to_trades(account=account) use this 
 
-def save_tradovate_fills_to_db(fills, account = "default"):
+def save_tradovate_fills_to_db(fills, account = "default", coalesce = False):
     # 1. Loop through Tradovate fills
     # 2. Transform each fill → Order model
     # 3. Save to database
@@ -53,82 +55,147 @@ def save_tradovate_fills_to_db(fills, account = "default"):
     each tradovate fill is one order row
     pk is fill-<fill_id>
     order id is order id
+
+    with coalesce=True, partial fills of the same orderId become one order row
+    (pk order-<orderId>, summed qty, VWAP price, last fill time) and the
+    individual fills are kept in order_fills
     """
 
-    saved_orders: List[Order] = []
-    errors: List[str] = []
+    if not fills:
+        return [], []
 
+    # A concurrent import (CSV or another Tradovate sync) can insert one of our
+    # (account, order_id) rows between prefetch and commit. The unique index turns
+    # that into an IntegrityError - re-stage once so the row is picked up as an update.
+    for attempt in (1, 2):
+        saved_orders, errors = _stage_tradovate_fills(fills, account, coalesce)
+        try:
+            db.session.commit()
+            return saved_orders, errors
+        except IntegrityError as e:
+            db.session.rollback()
+            if attempt == 1:
+                import sys
+                print(f"🔄 DEBUG: Overlapping orders inserted concurrently, retrying Tradovate save: {str(e)}", file=sys.stderr)
+                continue
+            errors.insert(0, f"Database error committing Tradovate fills: {str(e)}")
+            return [], errors
+        except Exception as e:
+            db.session.rollback()
+            errors.insert(0, f"Database error committing Tradovate fills: {str(e)}")
+            # If commit fails, nothing was actually saved
+            return [], errors
 
-    if not fills:
-       return saved_orders, errors
 
-    def _parse_timestamp(ts: str) -> datetime | None:
-        if not ts:
-            return None
+def _parse_timestamp(ts: str) -> datetime | None:
+    if not ts:
+        return None
+    try:
+        # Example: "2026-02-17T08:39:53.889Z"
+        # Remove trailing 'Z' if present
+        if ts.endswith("Z"):
+            ts = ts[:-1]
+        # Try with microseconds first, then without
         try:
-            # Example: "2026-02-17T08:39:53.889Z"
-            # Remove trailing 'Z' if present
-            if ts.endswith("Z"):
-                ts = ts[:-1]
-            # Try with microseconds first, then without
-            try:
-                return datetime.fromisoformat(ts)
-            except ValueError:
-                # Fallback if there are no fractional seconds
-                return datetime.strptime(ts, "%Y-%m-%dT%H:%M:%S")
-        except Exception:
-            return None
+            return datetime.fromisoformat(ts)
+        except ValueError:
+            # Fallback if there are no fractional seconds
+            return datetime.strptime(ts, "%Y-%m-%dT%H:%M:%S")
+    except Exception:
+        return None
 
+
+def _stage_tradovate_fills(fills, account: str, coalesce: bool = False) -> Tuple[List[Order], List[str]]:
+    """
+    Add/update Order rows for fills in the session without committing.
+
+    Existing rows are prefetched in two set-based queries (by primary key and by
+    (order_id, account)) instead of two lookups per fill.
+    """
+    saved_orders: List[Order] = []
+    errors: List[str] = []
+
+    # Pass 1: validate fills and collect the keys we need to look up
+    pending = []
     for idx, fill in enumerate(fills, start=1):
+        fill_id = fill.get("id")
+        if fill_id is None:
+            errors.append(f"Fill at index {idx}: missing 'id' field")
+            continue
+
+        action = fill.get("action", "").capitalize()
+        if action not in ("Buy", "Sell"):
+            errors.append(f"Fill {fill_id}: invalid action '{action}'")
+            continue
+
+        order_pk = f"fill-{fill_id}"
+        order_id = str(fill.get("orderId")) if fill.get("orderId") is not None else None
+        account_id = str(fill.get("accountId")) if fill.get("accountId") is not None else account
+        pending.append((idx, fill, order_pk, order_id, account_id, action))
+
+    new_child_fills: List[OrderFill] = []
+    if coalesce:
+        pending, new_child_fills = _coalesce_pending_fills(pending)
+
+    # Pass 2: prefetch existing rows into dict indexes
+    order_pks = {order_pk for _, _, order_pk, _, _, _ in pending}
+    order_keys = {(order_id, account_id) for _, _, _, order_id, account_id, _ in pending if order_id and account_id}
+
+    # 1. by primary key (fill-{fill_id}) - for idempotent Tradovate re-imports
+    existing_by_pk: Dict[str, Order] = {}
+    if order_pks:
+        for order in Order.query.filter(Order.id.in_(order_pks)).all():
+            existing_by_pk[order.id] = order
+
+    # 2. by (order_id, account) - to detect CSV/Tradovate overlap
+    existing_by_order_id: Dict[Tuple[str, str], Order] = {}
+    if order_keys:
+        rows = Order.query.filter(
+            Order.order_id.in_({k[0] for k in order_keys}),
+            Order.account.in_({k[1] for k in order_keys})
+        ).all()
+        for order in rows:
+            key = (order.order_id, order.account)
+            if key in order_keys:
+                existing_by_order_id[key] = order
+
+    # contractId -> symbol, so each contract is resolved against the API once per batch
+    contract_symbols: Dict[int, str | None] = {}
+
+    def _contract_symbol(contract_id):
+        if contract_id not in contract_symbols:
+            from app.ingestion.tradovate import get_contract_info
+            contract_symbols[contract_id] = get_contract_info(contract_id)
+        return contract_symbols[contract_id]
+
+    # Pass 3: apply updates in place and collect inserts
+    new_orders: List[Order] = []
+    for idx, fill, order_pk, order_id, account_id, action in pending:
         try:
             fill_id = fill.get("id")
-            if fill_id is None:
-                errors.append(f"Fill at index {idx}: missing 'id' field")
-                continue
-            
-            order_pk = f"fill-{fill_id}"
-            order_id = str(fill.get("orderId")) if fill.get("orderId") is not None else None
-            action = fill.get("action", "").capitalize()
             qty = fill.get("qty")
             price = fill.get("price")
-            timestamp = fill.get("timestamp")
-
-            account_id = str(fill.get("accountId")) if fill.get("accountId") is not None else account
-
-            # basic validations
-            if action not in ("Buy", "Sell"):
-                errors.append(f"Fill {fill_id}: invalid action '{action}'")
-                continue
-
-            fill_time = _parse_timestamp(timestamp)
+            fill_time = _parse_timestamp(fill.get("timestamp"))
 
             is_buy = action == "Buy"
             is_sell = action == "Sell"
 
-            # Check for existing order in this priority:
-            # 1. Check by primary key (fill-{fill_id}) - for idempotent Tradovate re-imports
-            existing_by_pk = Order.query.get(order_pk)
-            
-            # 2. Check by (order_id, account) - to detect CSV/Tradovate overlap
-            existing_by_order_id = None
-            if order_id and account_id:
-                existing_by_order_id = Order.query.filter_by(
-                    order_id=order_id,
-                    account=account_id
-                ).first()
-            
             # Determine which existing order to use (prefer CSV order if both exist)
-            existing = existing_by_order_id if existing_by_order_id else existing_by_pk
-            
+            existing = existing_by_order_id.get((order_id, account_id)) or existing_by_pk.get(order_pk)
+
             if existing:
                 # Order already exists - update it
                 order = existing
-                
+
                 # Update fields if they're missing or changed
                 updated = False
                 if not order.fill_time and fill_time:
                     order.fill_time = fill_time
                     updated = True
+                elif coalesce and fill_time and order.fill_time != fill_time:
+                    # a coalesced order is stamped with its latest fill
+                    order.fill_time = fill_time
+                    updated = True
                 if order.avg_price != price:
                     order.avg_price = price
                     updated = True
@@ -139,28 +206,26 @@ def save_tradovate_fills_to_db(fills, account = "default"):
                     order.status = "Filled"
                     order.is_filled = True
                     updated = True
-                
-                
+
                 # Update contract if missing
                 if not order.contract:
                     contract_id = fill.get("contractId")
                     if contract_id:
-                        from app.ingestion.tradovate import get_contract_info
-                        contract_symbol = get_contract_info(contract_id)
+                        contract_symbol = _contract_symbol(contract_id)
                         if contract_symbol:
                             order.contract = contract_symbol
                             updated = True
-                
+
                 # Update Tradovate-specific fields
                 if not order.raw_csv_data or order.text != "Tradovate import":
                     order.raw_csv_data = fill
                     order.text = "Tradovate import"
                     updated = True
-                
+
                 if updated:
                     import sys
                     print(f"🔄 DEBUG: Updated existing order {order.id[:30]}... (order_id={order_id}, account={account_id})", file=sys.stderr)
-                
+
                 saved_orders.append(order)
             else:
                 # Create new order
@@ -168,17 +233,10 @@ def save_tradovate_fills_to_db(fills, account = "default"):
                 order.order_id = order_id
                 order.account = account_id
                 order.b_s = action  # "Buy" or "Sell"
-                
+
                 # Extract contract symbol from Tradovate fill
                 contract_id = fill.get("contractId")
-                contract_symbol = None
-                
-                if contract_id:
-                    # Look up contract symbol from Tradovate API
-                    from app.ingestion.tradovate import get_contract_info
-                    contract_symbol = get_contract_info(contract_id)
-                
-                order.contract = contract_symbol
+                order.contract = _contract_symbol(contract_id) if contract_id else None
                 order.product = None
                 order.avg_price = price
                 order.filled_qty = qty
@@ -192,22 +250,98 @@ def save_tradovate_fills_to_db(fills, account = "default"):
                 order.is_filled = True
                 order.is_buy = is_buy
                 order.is_sell = is_sell
-                
-                db.session.add(order)
+
+                # later fills in this batch for the same order/pk update this row
+                existing_by_pk[order_pk] = order
+                if order_id and account_id:
+                    existing_by_order_id[(order_id, account_id)] = order
+
+                new_orders.append(order)
                 saved_orders.append(order)
 
         except Exception as e:
             errors.append(f"Fill at index {idx} (id={fill.get('id')}): Error saving order - {str(e)}")
             continue
 
-    # Commit all changes in one transaction (moved outside the loop)
-    try:
-        db.session.commit()
-    except Exception as e:
-        db.session.rollback()
-        errors.insert(0, f"Database error committing Tradovate fills: {str(e)}")
-        # If commit fails, nothing was actually saved
-        return [], errors
+    db.session.add_all(new_orders)
+
+    # child fills point at whichever row their order resolved to (new, Tradovate or CSV)
+    for child in new_child_fills:
+        order = existing_by_order_id.get((child.order_id, child.account))
+        child.order_pk = order.id if order else None
+    db.session.add_all(new_child_fills)
 
     return saved_orders, errors
-    
+
+
+def _coalesce_pending_fills(pending):
+    """
+    Collapse validated fills into one entry per (orderId, account).
+
+    Child fills already stored for these orders are prefetched in one query and
+    merged with the new ones, so a VWAP that grows across syncs stays exact.
+    Fills without an orderId pass through unchanged.
+
+    Returns:
+        (pending entries with aggregated fill dicts, new OrderFill rows to add)
+    """
+    groups: Dict[Tuple[str, str], list] = {}
+    passthrough = []
+    for entry in pending:
+        _, _, _, order_id, account_id, _ = entry
+        if order_id and account_id:
+            groups.setdefault((order_id, account_id), []).append(entry)
+        else:
+            passthrough.append(entry)
+
+    stored: Dict[Tuple[str, str], Dict[str, OrderFill]] = {}
+    if groups:
+        rows = OrderFill.query.filter(
+            OrderFill.order_id.in_({k[0] for k in groups}),
+            OrderFill.account.in_({k[1] for k in groups})
+        ).all()
+        for child in rows:
+            stored.setdefault((child.order_id, child.account), {})[child.fill_id] = child
+
+    coalesced = []
+    new_children: List[OrderFill] = []
+    for (order_id, account_id), entries in groups.items():
+        children = stored.get((order_id, account_id), {})
+
+        # (qty, price, fill_time) for every execution of this order, deduped by fill id
+        executions = {
+            fill_id: (child.qty or 0, float(child.price or 0), child.fill_time)
+            for fill_id, child in children.items()
+        }
+        for _, fill, _, _, _, _ in entries:
+            fill_id = str(fill.get("id"))
+            fill_time = _parse_timestamp(fill.get("timestamp"))
+            qty = fill.get("qty") or 0
+            price = float(fill.get("price") or 0)
+            if fill_id not in children and fill_id not in executions:
+                new_children.append(OrderFill(
+                    fill_id=fill_id, order_id=order_id, account=account_id,
+                    qty=qty, price=price, fill_time=fill_time
+                ))
+            executions[fill_id] = (qty, price, fill_time)
+
+        total_qty = sum(qty for qty, _, _ in executions.values())
+        vwap = sum(qty * price for qty, price, _ in executions.values()) / total_qty if total_qty else None
+        fill_times = [t for _, _, t in executions.values() if t]
+        last_time = max(fill_times) if fill_times else None
+
+        idx, first_fill, _, _, _, action = entries[0]
+        aggregated = {
+            "id": first_fill.get("id"),
+            "orderId": first_fill.get("orderId"),
+            "accountId": first_fill.get("accountId"),
+            "contractId": first_fill.get("contractId"),
+            "action": first_fill.get("action"),
+            "qty": total_qty,
+            "price": vwap,
+            "timestamp": last_time.isoformat() if last_time else first_fill.get("timestamp"),
+            "fillIds": sorted(executions.keys()),
+        }
+        coalesced.append((idx, aggregated, f"order-{order_id}", order_id, account_id, action))
+
+    return passthrough + coalesced, new_children
@@ -37,8 +37,15 @@ export interface DailyPnL {
   date: string;
   pnl: number;
   trades: Trade[];
+  // Aggregates from summary mode - trades stays empty until the day is opened
+  tradeCount?: number;
+  winningTrades?: number;
+  losingTrades?: number;
 }
 
+// Number of trades on a day, whether or not its trades have been loaded
+export const getTradeCount = (day: DailyPnL): number => day.tradeCount ?? day.trades.length;
+
 export interface TradingRule {
   id: string;
   title: string;
@@ -93,14 +100,15 @@ export const transformBackendTradeToFrontend = (backendTrade: any): Trade => {
 };
 
 // Fetch calendar data from backend
-const fetchCalendarData = async (year: number, month: number): Promise<DailyPnL[]> => {
+// summary=true returns per-day aggregates only; use fetchDayTrades when a day is opened
+const fetchCalendarData = async (year: number, month: number, summary: boolean = true): Promise<DailyPnL[]> => {
   try {
     // Calculate the last day of the month
     const daysInMonth = new Date(year, month, 0).getDate();
     const startDate = `${year}-${month.toString().padStart(2, '0')}-01`;
     const endDate = `${year}-${month.toString().padStart(2, '0')}-${daysInMonth.toString().padStart(2, '0')}`;
     
-    const response = await fetch(`${API_URL}/api/pnl/daily?start_date=${startDate}&end_date=${endDate}`);
+    const response = await fetch(`${API_URL}/api/pnl/daily?start_date=${startDate}&end_date=${endDate}&summary=${summary}`);
     
     if (!response.ok) {
       throw new Error(`Failed to fetch calendar data: ${response.statusText}`);
@@ -112,7 +120,10 @@ const fetchCalendarData = async (year: number, month: number): Promise<DailyPnL[
     const dailyData: DailyPnL[] = (data.data || []).map((day: any) => ({
       date: day.date,
       pnl: day.pnl || 0,
-      trades: (day.trades || []).map(transformBackendTradeToFrontend)
+      trades: (day.trades || []).map(transformBackendTradeToFrontend),
+      tradeCount: day.trade_count,
+      winningTrades: day.winning_trades,
+      losingTrades: day.losing_trades
     }));
     
     return dailyData;
@@ -122,6 +133,24 @@ const fetchCalendarData = async (year: number, month: number): Promise<DailyPnL[
   }
 };
 
+// Fetch all trades for one trading day, page by page
+export const fetchDayTrades = async (date: string): Promise<Trade[]> => {
+  const trades: Trade[] = [];
+  let page = 1;
+  let pages = 1;
+  do {
+    const response = await fetch(`${API_URL}/api/pnl/daily/${date}/trades?page=${page}&per_page=200`);
+    if (!response.ok) {
+      throw new Error(`Failed to fetch trades for ${date}: ${response.statusText}`);
+    }
+    const data = await response.json();
+    trades.push(...(data.trades || []).map(transformBackendTradeToFrontend));
+    pages = data.pages || 1;
+    page++;
+  } while (page <= pages);
+  return trades;
+};
+
 // Mock data for demonstration (kept as fallback)
 const generateMockData = (year: number, month: number): DailyPnL[] => {
   const data: DailyPnL[] = [];
@@ -272,19 +301,22 @@ export default function App() {
     timezone: 'America/New_York'
   });
 
+  // Only the dashboard analyzes individual trades; other pages draw from day summaries
+  const needsTrades = currentPage === 'dashboard';
+
   // Helper function to load calendar data (avoid duplication)
   const loadCalendarData = async (year: number, month: number) => {
     setIsLoading(true);
     try {
       // Fetch current month and previous month (for calendar display)
-      const currentMonthData = await fetchCalendarData(year, month);
+      const currentMonthData = await fetchCalendarData(year, month, !needsTrades);
       
       // Also fetch previous month for calendar overflow days
       let prevMonthData: DailyPnL[] = [];
       if (month === 1) {
-        prevMonthData = await fetchCalendarData(year - 1, 12);
+        prevMonthData = await fetchCalendarData(year - 1, 12, !needsTrades);
       } else {
-        prevMonthData = await fetchCalendarData(year, month - 1);
+        prevMonthData = await fetchCalendarData(year, month - 1, !needsTrades);
       }
       
       // Filter previous month to only last 6 days (for calendar overflow)
@@ -309,10 +341,11 @@ export default function App() {
               uniqueTrades.set(trade.id, trade);
             }
           });
+          // Summary days carry no trades - keep the backend's pnl for them
           uniqueByDate.set(day.date, {
             ...day,
             trades: Array.from(uniqueTrades.values()),
-            pnl: Array.from(uniqueTrades.values()).reduce((sum, t) => sum + t.pnl, 0)
+            pnl: uniqueTrades.size > 0 ? Array.from(uniqueTrades.values()).reduce((sum, t) => sum + t.pnl, 0) : day.pnl
           });
         } else {
           // If duplicate date exists, merge trades and deduplicate
@@ -325,6 +358,7 @@ export default function App() {
             uniqueByDate.set(day.date, {
               ...existing,
               trades: allTrades,
+              tradeCount: allTrades.length,
               pnl: allTrades.reduce((sum, t) => sum + t.pnl, 0)
             });
           }
@@ -332,7 +366,7 @@ export default function App() {
       });
       
       const finalData = Array.from(uniqueByDate.values());
-      console.log(`Loaded ${finalData.length} unique trading days with ${finalData.reduce((sum, d) => sum + d.trades.length, 0)} total trades`);
+      console.log(`Loaded ${finalData.length} unique trading days with ${finalData.reduce((sum, d) => sum + getTradeCount(d), 0)} total trades`);
       setTradeData(finalData);
     } catch (error) {
       console.error('Error loading trade data:', error);
@@ -344,7 +378,7 @@ export default function App() {
   // Fetch data when component mounts or month changes
   useEffect(() => {
     loadCalendarData(currentYear, currentMonth);
-  }, [currentYear, currentMonth]);
+  }, [currentYear, currentMonth, needsTrades]);
 
   const handleMonthChange = (year: number, month: number) => {
     // Just update state - useEffect will handle the data loading
@@ -364,7 +398,14 @@ export default function App() {
     const newData = tradeData.map(day => {
       if (day.date === date) {
         const newPnL = updatedTrades.reduce((sum, t) => sum + t.pnl, 0);
-        return { ...day, trades: updatedTrades, pnl: newPnL };
+        return {
+          ...day,
+          trades: updatedTrades,
+          pnl: newPnL,
+          tradeCount: updatedTrades.length,
+          winningTrades: updatedTrades.filter(t => t.pnl > 0).length,
+          losingTrades: updatedTrades.filter(t => t.pnl < 0).length
+        };
       }
       return day;
     });
@@ -1,5 +1,5 @@
 import { ChevronLeft, ChevronRight } from 'lucide-react';
-import { DailyPnL } from '../App';
+import { DailyPnL, getTradeCount } from '../App';
 import React from 'react';
 
 interface TradeCalendarProps {
@@ -48,7 +48,7 @@ export function TradeCalendar({ data, currentYear, currentMonth, onDateClick, on
       }
     }
     const totalPnL = weekDays.reduce((sum, d) => sum + d.pnl, 0);
-    const totalTrades = weekDays.reduce((sum, d) => sum + d.trades.length, 0);
+    const totalTrades = weekDays.reduce((sum, d) => sum + getTradeCount(d), 0);
     return { pnl: totalPnL, trades: totalTrades, weekNum };
   };
 
@@ -221,7 +221,7 @@ export function TradeCalendar({ data, currentYear, currentMonth, onDateClick, on
                               {pnl >= 0 ? '+' : ''}${Math.abs(pnl).toLocaleString('en-US', { minimumFractionDigits: 2, maximumFractionDigits: 2 })}
                             </span>
                             <span className={`text-[10px] mt-0.5 ${theme === 'dark' ? 'text-[#B0B8C8]' : 'text-gray-500'}`}>
-                              {dailyData.trades.length} trade{dailyData.trades.length !== 1 ? 's' : ''}
+                              {getTradeCount(dailyData)} trade{getTradeCount(dailyData) !== 1 ? 's' : ''}
                             </span>
                           </>
                         )}
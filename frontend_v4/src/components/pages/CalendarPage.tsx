@@ -1,7 +1,7 @@
 import { useState } from 'react';
 import { TradeCalendar } from '../TradeCalendar';
 import { TradeDetailModal } from '../TradeDetailModal';
-import { DailyPnL, Trade } from '../../App';
+import { DailyPnL, Trade, fetchDayTrades, getTradeCount } from '../../App';
 
 interface CalendarPageProps {
   tradeData: DailyPnL[];
@@ -25,9 +25,25 @@ export function CalendarPage({
   const textClass = theme === 'dark' ? 'text-[#E6EDF3]' : 'text-gray-900';
   const textSecondaryClass = theme === 'dark' ? 'text-[#9BA4B5]' : 'text-gray-600';
 
+  // Open a day, loading its trades first if the calendar only has its summary
+  const openDate = async (day: DailyPnL) => {
+    if (day.trades.length >= getTradeCount(day)) {
+      setSelectedDate(day);
+      return;
+    }
+    try {
+      const trades = await fetchDayTrades(day.date);
+      onUpdateTrades(day.date, trades);
+      setSelectedDate({ ...day, trades, tradeCount: trades.length });
+    } catch (error) {
+      console.error('Error loading trades for day:', error);
+      setSelectedDate(day);
+    }
+  };
+
   // Get all dates with trades, sorted chronologically
   const datesWithTrades = tradeData
-    .filter(day => day.trades.length > 0)
+    .filter(day => getTradeCount(day) > 0)
     .sort((a, b) => new Date(a.date).getTime() - new Date(b.date).getTime());
 
   // Navigate to previous/next date with trades
@@ -40,7 +56,7 @@ export function CalendarPage({
     const newIndex = direction === 'prev' ? currentIndex - 1 : currentIndex + 1;
     
     if (newIndex >= 0 && newIndex < datesWithTrades.length) {
-      setSelectedDate(datesWithTrades[newIndex]);
+      openDate(datesWithTrades[newIndex]);
     }
   };
 
@@ -51,7 +67,7 @@ export function CalendarPage({
         data={tradeData}
         currentYear={currentYear}
         currentMonth={currentMonth}
-        onDateClick={setSelectedDate}
+        onDateClick={openDate}
         onMonthChange={onMonthChange}
         theme={theme}
       />
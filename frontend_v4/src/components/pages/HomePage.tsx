@@ -1,6 +1,6 @@
 import { useState, useEffect, useMemo } from 'react';
 import { Calendar, BarChart3, Copy, Bot, Users, Link, TrendingUp, TrendingDown } from 'lucide-react';
-import { PageType, DailyPnL, Trade, transformBackendTradeToFrontend } from '../../App';
+import { PageType, DailyPnL, Trade, transformBackendTradeToFrontend, getTradeCount } from '../../App';
 
 const API_URL = 'http://localhost:5001';
 
@@ -34,9 +34,10 @@ export function HomePage({ theme, onNavigate, data = [] }: HomePageProps) {
       };
     }
 
-    const allTrades = data.flatMap((day: DailyPnL) => day.trades || []);
+    // Day summaries carry the counts, so this works before any trades are loaded
+    const totalTrades = data.reduce((sum: number, day: DailyPnL) => sum + getTradeCount(day), 0);
 
-    if (allTrades.length === 0){
+    if (totalTrades === 0){
       return {
         totalPnL: 0,
         winRate: 0,
@@ -44,11 +45,13 @@ export function HomePage({ theme, onNavigate, data = [] }: HomePageProps) {
       };
     }
 
-    const totalPnL = allTrades.reduce((sum: number, trade: Trade) => sum + trade.pnl, 0);
+    const totalPnL = data.reduce((sum: number, day: DailyPnL) => sum + day.pnl, 0);
 
-    const winningTrades = allTrades.filter((trade: Trade) => trade.pnl > 0);
-    const winRate = (winningTrades.length / allTrades.length) * 100;
-    const totalTrades = allTrades.length;
+    const winningTrades = data.reduce(
+      (sum: number, day: DailyPnL) => sum + (day.winningTrades ?? day.trades.filter((trade: Trade) => trade.pnl > 0).length),
+      0
+    );
+    const winRate = (winningTrades / totalTrades) * 100;
     
     return {
       totalPnL,
@@ -14,6 +14,7 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from flask import Flask
 from app.db.models import db, Trade
 from app.utils.contract_multipliers import get_contract_multiplier
+from app.services.daily_pnl import refresh_daily_pnl_for_trades
 
 def recalculate_all_pnl():
     """
@@ -46,6 +47,7 @@ def recalculate_all_pnl():
         
         updated_count = 0
         unchanged_count = 0
+        updated_trades = []
         
         for trade in all_trades:
             # Get multiplier for this contract
@@ -63,6 +65,7 @@ def recalculate_all_pnl():
             # Update if PnL changed
             if abs(new_pnl - old_pnl) > 0.01:  # More than 1 cent difference
                 trade.pnl = new_pnl
+                updated_trades.append(trade)
                 updated_count += 1
                 print(f"  ✓ {trade.symbol} {trade.direction}: ${old_pnl:.2f} → ${new_pnl:.2f} (multiplier: {multiplier})")
             else:
@@ -70,6 +73,8 @@ def recalculate_all_pnl():
         
         # Commit all changes
         if updated_count > 0:
+            # keep the daily_pnl rollup in step with the new PnL values
+            refresh_daily_pnl_for_trades(updated_trades)
             db.session.commit()
             print(f"\n✅ Updated {updated_count} trades")
             print(f"   {unchanged_count} trades unchanged (already correct)")
@@ -13,7 +13,8 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from flask import Flask
-from app.db.models import db, Trade, Order
+from app.db.models import db, Trade, Order, OrderFill
+from app.services.daily_pnl import rebuild_daily_pnl
 
 def wipe_database():
     """
@@ -58,11 +59,17 @@ def wipe_database():
         Trade.query.delete()
         print(f"  ✓ Deleted {trades_count} trades")
         
-        # Step 2: Delete all orders
+        # Step 2: Delete all orders (and the child fills of coalesced ones)
         print(f"\n🗑️  Deleting all orders...")
         Order.query.delete()
+        OrderFill.query.delete()
         print(f"  ✓ Deleted {orders_count} orders")
         
+        # Step 3: Rebuild everything derived from trades - daily PnL rollup, analytics
+        # cube and quantile sketches - and invalidate cached PnL responses
+        rebuild_daily_pnl()
+        print(f"  ✓ Cleared daily PnL rollup, analytics cube and sketches")
+        
         # Commit deletions
         db.session.commit()
         print(f"\n✅ Database wiped clean!")